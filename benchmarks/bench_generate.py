@@ -0,0 +1,115 @@
+"""
+Throughput and memory benchmark for puzzle generation.
+
+For every variant and board size, times a fixed-seed run of --count calls to
+_generate_complete_board() and to generate_puzzle_board() (once per --blanks value),
+and reports puzzles per second. As in bench_solve.py, each case runs in its own child
+process with a timeout, and (unless --no-memory is given) once more under tracemalloc
+for peak memory.
+
+Examples:
+    python benchmarks/bench_generate.py --output baseline.json
+    python benchmarks/bench_generate.py --variants sudoku,king --sizes 9x9 --count 10
+    python benchmarks/bench_generate.py --output new.json --compare baseline.json
+"""
+
+import argparse
+import random
+import sys
+from typing import Any, Dict, List, Optional
+
+from bench_solve import VARIANTS, add_report_arguments, make_sudoku, report, run_case
+
+# board size -> (minirows, minicols)
+SIZES = {
+    '4x4': (2, 2),
+    '6x6': (2, 3),
+    '9x9': (3, 3),
+    '12x12': (3, 4),
+    '16x16': (4, 4),
+}
+BLANK_PROPORTIONS = [0.3, 0.5, 0.7]
+# shapes with no complete board at all, so nothing to generate
+NO_BOARDS = {('king', '4x4'), ('nonconsec', '4x4')}
+
+
+def run_complete_case(variant: str, minirows: int, minicols: int, count: int, seed: int) -> Dict[str, Any]:
+    random.seed(seed)
+    puzzle = make_sudoku(variant, minirows, minicols)
+    for _ in range(count):
+        puzzle._generate_complete_board()
+    return {'nodes': None}
+
+
+def run_puzzle_case(variant: str, minirows: int, minicols: int, count: int, seed: int,
+                    blank_proportion: float) -> Dict[str, Any]:
+    random.seed(seed)
+    puzzle = make_sudoku(variant, minirows, minicols)
+    blank_count = 0
+    for _ in range(count):
+        puzzle.generate_puzzle_board(blank_proportion)
+        blank_count += puzzle.blank_count
+    return {'nodes': None, 'mean_blank_count': blank_count / count}
+
+
+def build_cases(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    cases = []
+    for variant in args.variants:
+        for size in args.sizes:
+            (minirows, minicols) = SIZES[size]
+            if (variant == 'diagonal' and minirows != minicols) or (variant, size) in NO_BOARDS:
+                continue
+            name = '{}-{}'.format(variant, size)
+            cases.append({'suite': 'complete', 'name': name, 'func': run_complete_case,
+                          'args': (variant, minirows, minicols, args.count, args.seed)})
+            for blank_proportion in args.blanks:
+                cases.append({'suite': 'puzzle', 'name': '{}-blank{}'.format(name, blank_proportion),
+                              'func': run_puzzle_case,
+                              'args': (variant, minirows, minicols, args.count, args.seed, blank_proportion)})
+    return cases
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--variants', default=','.join(VARIANTS),
+                        help='comma-separated subset of: ' + ', '.join(VARIANTS))
+    parser.add_argument('--sizes', default=','.join(SIZES),
+                        help='comma-separated subset of: ' + ', '.join(SIZES))
+    parser.add_argument('--blanks', default=','.join(str(b) for b in BLANK_PROPORTIONS),
+                        help='blank_proportion values for generate_puzzle_board()')
+    parser.add_argument('--count', type=int, default=5, help='puzzles generated per case')
+    parser.add_argument('--seed', type=int, default=0, help='random seed of every case')
+    parser.add_argument('--timeout', type=float, default=30.0, help='per-case timeout in seconds')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc run')
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+    args.variants = [v for v in args.variants.split(',') if v]
+    args.sizes = [s for s in args.sizes.split(',') if s]
+    args.blanks = [float(b) for b in args.blanks.split(',') if b]
+    for variant in args.variants:
+        if variant not in VARIANTS:
+            parser.error('unknown variant: {}'.format(variant))
+    for size in args.sizes:
+        if size not in SIZES:
+            parser.error('unknown size: {}'.format(size))
+    if args.count < 1:
+        parser.error('--count must be >= 1')
+
+    results = []
+    for case in build_cases(args):
+        r = run_case(case['func'], case['args'], args.timeout, not args.no_memory)
+        r = dict({'suite': case['suite'], 'name': case['name']}, **r)
+        r['puzzles_per_second'] = args.count / r['time'] if r['status'] == 'ok' and r['time'] > 0 else None
+        results.append(r)
+        print('{:<9} {:<30} {:<8} {:>10} {:>12} {:>12}'.format(
+            r['suite'], r['name'], r['status'],
+            '-' if r['time'] is None else '{:.4f}s'.format(r['time']),
+            '-' if r['puzzles_per_second'] is None else '{:.2f}/s'.format(r['puzzles_per_second']),
+            '-' if r['peak_memory'] is None else '{:.1f}KiB'.format(r['peak_memory'] / 1024)),
+            flush=True)
+
+    return report(results, args, count=args.count, seed=args.seed)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Import-time benchmark for the ktaypuzzles modules.
+
+Each module is imported in a fresh interpreter (repeated --repeat times) and the
+median time of the import statement itself is reported. The run fails if a module
+takes longer than --max-seconds, or if importing it loads one of the heavy optional
+dependencies (cvxpy, matplotlib) that should only be loaded on first use.
+
+Examples:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --repeat 20 --output import_times.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'ktaypuzzles.sudoku',
+    'ktaypuzzles.diagonalsudoku',
+    'ktaypuzzles.kingsudoku',
+    'ktaypuzzles.knightsudoku',
+    'ktaypuzzles.nonconsecsudoku',
+    'ktaypuzzles.shikaku',
+    'ktaypuzzles.svg',
+]
+HEAVY_MODULES = ['cvxpy', 'matplotlib']
+
+_PROBE = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(','.join(m for m in {heavy!r} if m in sys.modules))
+'''
+
+
+def time_import(module: str) -> Dict[str, object]:
+    """
+    Import `module` in a new interpreter, returning the import time in seconds and
+    the heavy modules that ended up in sys.modules.
+    """
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=REPO_ROOT).decode()
+    elapsed, heavy = output.splitlines()[:2]
+    return {'time': float(elapsed), 'heavy': [m for m in heavy.split(',') if m]}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=10, help='imports per module (default 10)')
+    parser.add_argument('--max-seconds', type=float, default=0.25,
+                        help='fail if the median import time exceeds this (default 0.25)')
+    parser.add_argument('--output', help='write results to this JSON file')
+    args = parser.parse_args(argv)
+
+    results = []
+    failures = []
+    for module in MODULES:
+        runs = [time_import(module) for _ in range(args.repeat)]
+        times = [run['time'] for run in runs]
+        heavy = sorted(set(m for run in runs for m in run['heavy']))
+        r = {'module': module, 'median': statistics.median(times), 'min': min(times),
+             'max': max(times), 'heavy': heavy}
+        results.append(r)
+        print('{:<30} median {:.4f}s  min {:.4f}s  max {:.4f}s{}'.format(
+            module, r['median'], r['min'], r['max'],
+            '  loads ' + ', '.join(heavy) if heavy else ''), flush=True)
+        if heavy:
+            failures.append('{} loads {}'.format(module, ', '.join(heavy)))
+        if r['median'] > args.max_seconds:
+            failures.append('{} median import time {:.4f}s > {}s'.format(
+                module, r['median'], args.max_seconds))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=1)
+
+    if failures:
+        print('\nImport-time check failed:')
+        for line in failures:
+            print('  ' + line)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""
+Reproducible benchmark suite for the solvers and generators.
+
+Every case runs in its own child process so that a pathological instance can be
+cut off with a timeout, and so that peak memory is not polluted by earlier cases.
+Each case is first run once for wall-clock time and search nodes, then (unless
+--no-memory is given) once more under tracemalloc for peak memory.
+
+Examples:
+    python benchmarks/bench_solve.py --output baseline.json
+    python benchmarks/bench_solve.py --suites shikaku --shikaku 1-50
+    python benchmarks/bench_solve.py --suites shikaku,exactcover --timeout 60
+    python benchmarks/bench_solve.py --output new.json --compare baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from ktaypuzzles.diagonalsudoku import DiagonalSudoku, _DiagonalSudokuSolver
+from ktaypuzzles.kingsudoku import KingSudoku, _KingSudokuSolver
+from ktaypuzzles.knightsudoku import KnightSudoku, _KnightSudokuSolver
+from ktaypuzzles.nonconsecsudoku import NonConsecSudoku, _NonConsecSudokuSolver
+from ktaypuzzles.shikaku import Shikaku, _ShikakuSolver
+from ktaypuzzles.sudoku import Sudoku, _SudokuSolver
+from ktaypuzzles.templatesolve import get_templates, template_solve
+
+SUDOKU_CORPUS = os.path.join(REPO_ROOT, 'benchmarks', 'sudoku_corpus.json')
+SHIKAKU_DIR = os.path.join(REPO_ROOT, 'shikaku-puzzles')
+SUITES = ['sudoku', 'ip', 'template', 'generate', 'shikaku', 'exactcover']
+
+# variant name -> (puzzle class, solver class)
+VARIANTS = {
+    'sudoku': (Sudoku, _SudokuSolver),
+    'diagonal': (DiagonalSudoku, _DiagonalSudokuSolver),
+    'king': (KingSudoku, _KingSudokuSolver),
+    'knight': (KnightSudoku, _KnightSudokuSolver),
+    'nonconsec': (NonConsecSudoku, _NonConsecSudokuSolver),
+}
+
+# (variant, minirows, minicols) combinations used by the generate suite
+GENERATE_SHAPES = [
+    ('sudoku', 2, 2), ('sudoku', 2, 3), ('sudoku', 3, 3),
+    ('diagonal', 2, 2), ('diagonal', 3, 3),
+    ('king', 2, 3), ('king', 3, 3),
+    ('knight', 2, 3), ('knight', 3, 3),
+    ('nonconsec', 2, 3), ('nonconsec', 3, 3),
+]
+
+
+def make_sudoku(variant: str, minirows: int = 3, minicols: Optional[int] = None,
+                board: Optional[List[List[int]]] = None) -> Sudoku:
+    """
+    Construct a puzzle of the given variant. DiagonalSudoku only takes minirows.
+    """
+    puzzle_class = VARIANTS[variant][0]
+    if puzzle_class is DiagonalSudoku:
+        return DiagonalSudoku(minirows, board=board)
+    return puzzle_class(minirows, minicols, board=board)
+
+
+def load_sudoku_corpus(path: str = SUDOKU_CORPUS) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_shikaku_board(path: str) -> List[List[int]]:
+    """
+    Read a board in the shikaku-puzzles/ format: number of rows, number of columns,
+    then one line per row with '-' for empty cells.
+    """
+    with open(path) as f:
+        lines = [line.split() for line in f.read().splitlines() if line.strip()]
+    rows = int(lines[0][0])
+    return [[0 if x == '-' else int(x) for x in line] for line in lines[2:2+rows]]
+
+
+def parse_range(spec: str, upper: int) -> List[int]:
+    """
+    Parse '1-20,35,40-41' into a sorted list of integers. 'all' selects 1..upper.
+    """
+    if spec == 'all':
+        return list(range(1, upper + 1))
+    numbers = set()
+    for part in spec.split(','):
+        if '-' in part:
+            lo, hi = part.split('-')
+            numbers.update(range(int(lo), int(hi) + 1))
+        elif part:
+            numbers.add(int(part))
+    return sorted(numbers)
+
+
+# -----------------------------------------------------------------------------
+# Case functions. Each runs in the child process and returns a dict of metrics.
+# -----------------------------------------------------------------------------
+def run_sudoku_case(entry: Dict[str, Any], engine: str) -> Dict[str, Any]:
+    puzzle = make_sudoku(entry['variant'], entry['minirows'], entry['minicols'], entry['board'])
+    solver = VARIANTS[entry['variant']][1](puzzle)
+    if engine == 'ip':
+        solution = solver.ip_solve()
+        return {'nodes': None, 'solutions': 0 if solution is None else 1}
+    if engine == 'template':
+        get_templates()  # built once per process, so not timed
+        start = time.perf_counter()
+        solution_list = template_solve(puzzle)
+        return {'nodes': None, 'solutions': len(solution_list), 'time': time.perf_counter() - start}
+    solution_list = solver.backtracking_solve()
+    return {'nodes': solver.nodes, 'solutions': len(solution_list)}
+
+
+def run_generate_case(variant: str, minirows: int, minicols: int, seed: int) -> Dict[str, Any]:
+    random.seed(seed)
+    puzzle = make_sudoku(variant, minirows, minicols)
+    puzzle.generate_puzzle_board()
+    return {'nodes': None, 'blank_count': puzzle.blank_count}
+
+
+def run_shikaku_case(path: str, engine: str) -> Dict[str, Any]:
+    solver = _ShikakuSolver(Shikaku(load_shikaku_board(path)))
+    if engine == 'exactcover':
+        solution_list = solver.exact_cover_solve()
+    else:
+        solution_list = solver.backtracking_solve()
+    return {'nodes': solver.nodes, 'solutions': len(solution_list)}
+
+
+def _child(conn, func: Callable, args: tuple, measure_memory: bool) -> None:
+    try:
+        start = time.perf_counter()
+        metrics = func(*args)
+        # a case may time only part of its work itself
+        metrics.setdefault('time', time.perf_counter() - start)
+        conn.send(('ok', metrics))
+        if measure_memory:
+            tracemalloc.start()
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            conn.send(('memory', peak))
+    except Exception as e:
+        conn.send(('error', '{}: {}'.format(type(e).__name__, e)))
+    finally:
+        conn.close()
+
+
+def run_case(func: Callable, args: tuple, timeout: float, measure_memory: bool) -> Dict[str, Any]:
+    """
+    Run func(*args) in a child process. Returns a dict with status ('ok', 'timeout' or
+    'error'), time, nodes and peak_memory (bytes, None if not measured).
+    """
+    result = {'status': 'timeout', 'time': None, 'nodes': None, 'peak_memory': None}
+    parent_conn, child_conn = mp.Pipe(duplex=False)
+    process = mp.Process(target=_child, args=(child_conn, func, args, measure_memory))
+    deadline = time.perf_counter() + timeout
+    process.start()
+    child_conn.close()
+    expected = 2 if measure_memory else 1
+    while expected > 0:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0 or not parent_conn.poll(remaining):
+            break
+        try:
+            kind, payload = parent_conn.recv()
+        except EOFError:
+            break
+        if kind == 'ok':
+            result.update(payload)
+            result['status'] = 'ok'
+        elif kind == 'memory':
+            result['peak_memory'] = payload
+        else:
+            result['status'] = 'error'
+            result['error'] = payload
+            break
+        expected -= 1
+    if process.is_alive():
+        process.terminate()
+    process.join()
+    return result
+
+
+# -----------------------------------------------------------------------------
+# Suite construction
+# -----------------------------------------------------------------------------
+def build_cases(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    cases = []
+    corpus = load_sudoku_corpus()
+    if 'sudoku' in args.suites:
+        for entry in corpus:
+            cases.append({'suite': 'sudoku', 'name': entry['name'], 'func': run_sudoku_case,
+                          'args': (entry, 'backtracking')})
+    if 'ip' in args.suites:
+        for entry in corpus:
+            if entry['variant'] == 'sudoku':
+                cases.append({'suite': 'ip', 'name': entry['name'], 'func': run_sudoku_case,
+                              'args': (entry, 'ip')})
+    if 'template' in args.suites:
+        for entry in corpus:
+            if entry['variant'] == 'sudoku' and entry['minirows'] == entry['minicols'] == 3:
+                cases.append({'suite': 'template', 'name': entry['name'], 'func': run_sudoku_case,
+                              'args': (entry, 'template')})
+    if 'generate' in args.suites:
+        for (variant, minirows, minicols) in GENERATE_SHAPES:
+            for seed in args.seeds:
+                name = '{}-{}x{}-seed{}'.format(variant, minirows, minicols, seed)
+                cases.append({'suite': 'generate', 'name': name, 'func': run_generate_case,
+                              'args': (variant, minirows, minicols, seed)})
+    for engine in ('shikaku', 'exactcover'):
+        if engine not in args.suites:
+            continue
+        num_files = len([f for f in os.listdir(SHIKAKU_DIR) if f.endswith('.txt')])
+        for i in parse_range(args.shikaku, num_files):
+            path = os.path.join(SHIKAKU_DIR, '{:03d}.txt'.format(i))
+            board = load_shikaku_board(path)
+            name = '{:03d}-{}x{}'.format(i, len(board), len(board[0]))
+            cases.append({'suite': engine, 'name': name, 'func': run_shikaku_case,
+                          'args': (path, engine)})
+    return cases
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float,
+            min_time: float) -> List[str]:
+    """
+    Compare results against a baseline JSON file. A case regresses if it now fails or
+    times out where it used to succeed, or if its time grew by more than `threshold`
+    times (ignoring cases faster than `min_time` seconds in both runs).
+    """
+    old = {(r['suite'], r['name']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        before = old.get((r['suite'], r['name']))
+        if before is None or before['status'] != 'ok':
+            continue
+        label = '{}/{}'.format(r['suite'], r['name'])
+        if r['status'] != 'ok':
+            regressions.append('{}: status ok -> {}'.format(label, r['status']))
+        elif r['time'] > before['time'] * threshold and r['time'] > min_time:
+            regressions.append('{}: time {:.4f}s -> {:.4f}s ({:.2f}x)'.format(
+                label, before['time'], r['time'], r['time'] / before['time']))
+    return regressions
+
+
+def add_report_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the --output, --compare, --threshold and --min-time options used by report().
+    """
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='time ratio above which a case is flagged (default 1.25)')
+    parser.add_argument('--min-time', type=float, default=0.01,
+                        help='ignore time regressions on cases faster than this (seconds)')
+
+
+def report(results: List[Dict[str, Any]], args: argparse.Namespace, **meta: Any) -> int:
+    """
+    Write the results, with the revision, platform and timeout of the run (and `meta`), to
+    args.output, and check them against the baseline in args.compare, if given. Returns the
+    exit status: 1 if there are regressions, else 0.
+    """
+    data = {
+        'meta': dict({
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'timeout': args.timeout,
+        }, **meta),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_time)
+        if regressions:
+            print('\n{} regression(s) against {}:'.format(len(regressions), args.compare))
+            for line in regressions:
+                print('  ' + line)
+            return 1
+        print('\nNo regressions against {}.'.format(args.compare))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--suites', default=','.join(SUITES),
+                        help='comma-separated subset of: ' + ', '.join(SUITES))
+    parser.add_argument('--shikaku', default='all',
+                        help="instances of shikaku-puzzles/ to run, e.g. '1-50,400' (default: all)")
+    parser.add_argument('--seeds', default='0,1,2', help='random seeds for the generate suite')
+    parser.add_argument('--timeout', type=float, default=10.0, help='per-case timeout in seconds')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc run')
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+    args.suites = [s for s in args.suites.split(',') if s]
+    args.seeds = [int(s) for s in args.seeds.split(',') if s]
+    for suite in args.suites:
+        if suite not in SUITES:
+            parser.error('unknown suite: {}'.format(suite))
+
+    results = []
+    for case in build_cases(args):
+        r = run_case(case['func'], case['args'], args.timeout, not args.no_memory)
+        r = dict({'suite': case['suite'], 'name': case['name']}, **r)
+        results.append(r)
+        print('{:<10} {:<28} {:<8} {:>10} {:>10} {:>12}'.format(
+            r['suite'], r['name'], r['status'],
+            '-' if r['time'] is None else '{:.4f}s'.format(r['time']),
+            '-' if r['nodes'] is None else r['nodes'],
+            '-' if r['peak_memory'] is None else '{:.1f}KiB'.format(r['peak_memory'] / 1024)),
+            flush=True)
+
+    return report(results, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Union
+
+from .search import SearchCancelled, cancel_scope
+from .shikaku import Shikaku, State
+from .sudoku import Board, Sudoku
+
+"""
+asyncio front end for the solvers and generators.
+
+The searches run in a thread pool so the event loop stays responsive. Each call can be
+given a timeout: when it expires (or the awaiting task is cancelled), the search in the
+worker thread is stopped at its next node via search.cancel_scope(), so a pathological
+board does not keep holding a worker. At most `max_concurrent` searches run at once;
+further calls wait for a free slot.
+
+Note that the searches are pure Python, so they share the GIL: concurrency here keeps
+the event loop and other requests responsive, it does not add CPU throughput.
+"""
+Puzzle = Union[Sudoku, Shikaku]
+
+
+class AsyncSolver:
+
+    def __init__(self, max_concurrent: int = 4):
+        """
+        :param max_concurrent: Maximum number of searches running at the same time.
+        """
+        assert max_concurrent >= 1, 'max_concurrent must be >= 1'
+        self.max_concurrent = max_concurrent
+        self._executor = ThreadPoolExecutor(max_concurrent, thread_name_prefix='ktaypuzzles')
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def solve(self, puzzle: Puzzle, timeout: Optional[float] = None) -> Union[List[Board], State]:
+        """
+        Run puzzle.solve() in a worker thread and return its result. The puzzle's
+        `solution` and `is_solved` attributes are updated as with solve().
+
+        :raises asyncio.TimeoutError: If the search did not finish within `timeout` seconds.
+        The search is stopped and the puzzle is left unchanged.
+        """
+        return await self._run(puzzle.solve, timeout)
+
+    async def generate(self, puzzle: Sudoku, blank_proportion: Optional[float] = None,
+                       timeout: Optional[float] = None) -> None:
+        """
+        Run puzzle.generate_puzzle_board() in a worker thread. If blank_proportion is not
+        given, the default of the puzzle's class is used.
+
+        :raises asyncio.TimeoutError: If generation did not finish within `timeout` seconds.
+        The search is stopped and the puzzle is left unchanged.
+        """
+        if blank_proportion is None:
+            return await self._run(puzzle.generate_puzzle_board, timeout)
+        return await self._run(lambda: puzzle.generate_puzzle_board(blank_proportion), timeout)
+
+    async def _run(self, func: Callable[[], Any], timeout: Optional[float]) -> Any:
+        async with self._semaphore:
+            event = threading.Event()
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, _run_in_scope, func, event)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                # stop the search, and keep holding the slot until the worker has noticed
+                event.set()
+                await asyncio.wait([future])
+                raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    async def __aenter__(self) -> 'AsyncSolver':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.shutdown()
+
+
+def _run_in_scope(func: Callable[[], Any], event: threading.Event) -> Any:
+    with cancel_scope(event):
+        try:
+            return func()
+        except SearchCancelled:
+            return None
@@ -0,0 +1,243 @@
+import multiprocessing as mp
+import threading
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .puzzlebank import VARIANTS, make_puzzle
+from .search import (COMPLETED, NO_SOLUTION, NODE_LIMIT, TIME_LIMIT, SearchBudget,
+                     SearchBudgetExhausted, SearchCancelled, cancel_scope)
+from .shikaku import Shikaku
+from .sudoku import Board, EMPTY, Sudoku
+
+"""
+Batch solving and generation of puzzles described by JSON-compatible dicts.
+
+solve_many() handles a whole list of requests in one call, so that when it runs in a worker
+process the cost of sending work between processes is paid once per batch rather than once
+per puzzle. Each request is a dict:
+
+    {"op": "solve", "variant": "sudoku", "minirows": 3, "minicols": 3, "board": [[...], ...],
+     "max_solutions": 2, "max_seconds": 5}
+    {"op": "generate", "variant": "king", "minirows": 3, "blank_proportion": 0.7, "max_seconds": 30}
+    {"op": "solve", "variant": "shikaku", "board": [[...], ...]}
+
+variant is one of puzzlebank.VARIANTS or "shikaku"; minicols, max_solutions (default 1),
+max_seconds (default no limit) and blank_proportion (default: that of the variant) are
+optional. Empty cells are 0 (or null). Responses are dicts too:
+
+    solve: {"status": ..., "solutions": [...]}, where status is one of search.COMPLETED,
+        search.NO_SOLUTION, search.TIME_LIMIT or SOLUTION_LIMIT. Sudoku solutions are boards,
+        Shikaku solutions are lists of [r1, r2, c1, c2] rectangles, one per anchor.
+    generate: {"board": [[...]], "solution": [[...]]}, or {"status": search.TIME_LIMIT}.
+    invalid request: {"error": message}
+"""
+SOLUTION_LIMIT = 'solution_limit'  # search stopped after max_solutions solutions
+SOLVED = 'solved'  # solve_boards_shared() found a solution (uniqueness is not checked)
+
+Request = Dict[str, Any]
+Response = Dict[str, Any]
+
+
+def solve_many(requests: List[Request]) -> List[Response]:
+    """
+    Handle a batch of requests, returning one response per request, in order. A request that
+    fails gets an error response; it does not affect the rest of the batch.
+    """
+    return [solve_one(request) for request in requests]
+
+
+def solve_one(request: Request) -> Response:
+    try:
+        op = request.get('op', 'solve')
+        if op == 'solve':
+            return _solve(request)
+        elif op == 'generate':
+            return _generate(request)
+        return {'error': 'Unknown op {!r}'.format(op)}
+    except (AssertionError, KeyError, TypeError, ValueError) as e:
+        return {'error': '{}: {}'.format(type(e).__name__, e)}
+
+
+def puzzle_from_request(request: Request, board: Optional[Board] = None) -> Union[Sudoku, Shikaku]:
+    variant = request.get('variant', 'sudoku')
+    if variant == 'shikaku':
+        return Shikaku(request['board'])
+    if variant not in VARIANTS:
+        raise ValueError('Unknown variant {!r}'.format(variant))
+    return make_puzzle(variant, request['minirows'], request.get('minicols'), board)
+
+
+def solution_to_json(solution: Any) -> Any:
+    """
+    Convert a Sudoku board (EMPTY as 0) or a Shikaku state (rectangles as [r1, r2, c1, c2])
+    to plain lists.
+    """
+    if len(solution) > 0 and not isinstance(solution[0], list):
+        return [[rect.r1, rect.r2, rect.c1, rect.c2] for rect in solution]
+    return [[cell if cell is not EMPTY else 0 for cell in row] for row in solution]
+
+
+def _solve(request: Request) -> Response:
+    puzzle = puzzle_from_request(request, request.get('board'))
+    if isinstance(puzzle, Sudoku) and not puzzle.is_valid_board:
+        return {'status': NO_SOLUTION, 'solutions': []}
+    max_solutions = request.get('max_solutions', 1)
+    assert max_solutions >= 1, 'max_solutions must be >= 1'
+    status, solutions = _search(puzzle, max_solutions, request.get('max_seconds'))
+    return {'status': status, 'solutions': [solution_to_json(solution) for solution in solutions]}
+
+
+def _search(puzzle: Union[Sudoku, Shikaku], max_solutions: int,
+            max_seconds: Optional[float]) -> Tuple[str, List[Any]]:
+    solver = puzzle._get_solver()
+    solver.budget = SearchBudget(max_seconds=max_seconds)
+    solver.budget.start()
+    solutions = []
+    try:
+        for solution in solver.iter_solutions():
+            solutions.append(solution)
+            if len(solutions) >= max_solutions:
+                # the search is stopped here, so further solutions are unknown
+                return SOLUTION_LIMIT, solutions
+    except SearchBudgetExhausted as e:
+        return e.status, solutions
+    return (COMPLETED if len(solutions) > 0 else NO_SOLUTION), solutions
+
+
+def _generate(request: Request) -> Response:
+    puzzle = puzzle_from_request(request)
+    if isinstance(puzzle, Shikaku):
+        raise ValueError('Generating shikaku puzzles is not supported')
+    blank_proportion = request.get('blank_proportion')
+    event = threading.Event()
+    max_seconds = request.get('max_seconds')
+    timer = threading.Timer(max_seconds, event.set) if max_seconds is not None else None
+    if timer is not None:
+        timer.start()
+    try:
+        with cancel_scope(event):
+            if blank_proportion is None:
+                puzzle.generate_puzzle_board()
+            else:
+                puzzle.generate_puzzle_board(blank_proportion)
+            solution = next(puzzle._get_solver().iter_solutions())
+    except SearchCancelled:
+        return {'status': TIME_LIMIT}
+    finally:
+        if timer is not None:
+            timer.cancel()
+    return {'board': solution_to_json(puzzle.board), 'solution': solution_to_json(solution)}
+
+
+"""
+Shared-memory batches. For many small boards, pickling Sudoku objects and solution lists
+to and from worker processes costs more than solving them. solve_boards_shared() instead
+copies all the boards into one NumPy array in shared memory, and the workers write their
+solutions and statuses into shared output arrays in place. The only things sent to a
+worker are the names of the shared blocks (once, when it starts) and ranges of board
+indices.
+"""
+# status codes of the shared status array: SHARED_STATUSES[code], or UNSET_STATUS for a board
+# that no worker has solved yet
+SHARED_STATUSES = (SOLVED, NO_SOLUTION, TIME_LIMIT, NODE_LIMIT)
+UNSET_STATUS = -1
+
+# state of each worker process of solve_boards_shared()
+_shared_blocks: List[shared_memory.SharedMemory] = []
+_shared_arrays: Tuple[Any, ...] = ()
+_shared_spec: Tuple[str, int, Optional[int], Optional[float]] = ('sudoku', 3, None, None)
+
+
+def _attach_shared(names: Tuple[str, str, str], shape: Tuple[int, int, int],
+                   spec: Tuple[str, int, Optional[int], Optional[float]]) -> None:
+    global _shared_blocks, _shared_arrays, _shared_spec
+    import numpy as np
+    _shared_blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    _shared_arrays = _views(np, _shared_blocks, shape)
+    _shared_spec = spec
+
+
+def _views(np: Any, blocks: List[shared_memory.SharedMemory], shape: Tuple[int, int, int]) -> Tuple[Any, ...]:
+    boards = np.ndarray(shape, dtype=np.uint8, buffer=blocks[0].buf)
+    solutions = np.ndarray(shape, dtype=np.uint8, buffer=blocks[1].buf)
+    statuses = np.ndarray(shape[:1], dtype=np.int8, buffer=blocks[2].buf)
+    return boards, solutions, statuses
+
+
+def _solve_shared_range(bounds: Tuple[int, int]) -> None:
+    boards, solutions, statuses = _shared_arrays
+    variant, minirows, minicols, max_seconds = _shared_spec
+    for i in range(*bounds):
+        board = [[cell if cell else EMPTY for cell in row] for row in boards[i].tolist()]
+        puzzle = make_puzzle(variant, minirows, minicols, board)
+        if puzzle.is_valid_board:
+            status, found = _search(puzzle, 1, max_seconds)
+        else:
+            status, found = NO_SOLUTION, []
+        if len(found) > 0:
+            solutions[i] = found[0]
+            status = SOLVED
+        statuses[i] = SHARED_STATUSES.index(status)
+
+
+def solve_boards_shared(variant: str, minirows: int, boards: Sequence[Any], minicols: Optional[int] = None,
+                        processes: Optional[int] = None, chunk_size: int = 16,
+                        max_seconds: Optional[float] = None) -> Tuple[Any, List[str]]:
+    """
+    Solve many boards of the same variant and shape over a process pool, passing boards and
+    solutions through shared memory.
+
+    :param boards: A sequence of boards (lists of lists, EMPTY or 0 for empty cells) or a NumPy
+        array of shape (n, size, size) with 0 for empty cells.
+    :param processes: Number of worker processes (default: number of CPUs).
+    :param chunk_size: Number of boards a worker takes at a time.
+    :param max_seconds: Time limit per board.
+    :return: A pair (solutions, statuses): solutions is a uint8 NumPy array of shape
+        (n, size, size) holding the first solution found for each board (all zeros if there is
+        none), and statuses[i] is the status of board i: SOLVED if a solution was found, else
+        search.NO_SOLUTION or search.TIME_LIMIT.
+    :raises RuntimeError: If some board was left unsolved, which only happens if a worker
+        fails.
+    """
+    # numpy is only needed by this function, so only load it here
+    import numpy as np
+    size = make_puzzle(variant, minirows, minicols).size
+    assert size < 256, 'Boards must fit in uint8'
+    assert chunk_size >= 1, 'chunk_size must be >= 1'
+    n = len(boards)
+    if n == 0:
+        return np.zeros((0, size, size), dtype=np.uint8), []
+    processes = processes if processes else mp.cpu_count()
+    assert processes >= 1, 'processes must be >= 1'
+
+    shape = (n, size, size)
+    cells = n * size * size
+    blocks = [shared_memory.SharedMemory(create=True, size=cells),
+              shared_memory.SharedMemory(create=True, size=cells),
+              shared_memory.SharedMemory(create=True, size=n)]
+    shared_boards = shared_solutions = shared_statuses = None
+    try:
+        shared_boards, shared_solutions, shared_statuses = _views(np, blocks, shape)
+        if isinstance(boards, np.ndarray):
+            shared_boards[:] = boards
+        else:
+            for i, board in enumerate(boards):
+                shared_boards[i] = [[cell if cell is not EMPTY else 0 for cell in row] for row in board]
+        shared_solutions[:] = 0
+        shared_statuses[:] = UNSET_STATUS
+
+        ranges = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+        names = tuple(block.name for block in blocks)
+        with mp.Pool(min(processes, len(ranges)), initializer=_attach_shared,
+                     initargs=(names, shape, (variant, minirows, minicols, max_seconds))) as pool:
+            for _ in pool.imap_unordered(_solve_shared_range, ranges):
+                pass
+        if (shared_statuses == UNSET_STATUS).any():
+            raise RuntimeError('{} boards were not solved'.format(int((shared_statuses == UNSET_STATUS).sum())))
+        return shared_solutions.copy(), [SHARED_STATUSES[code] for code in shared_statuses]
+    finally:
+        # the views must be dropped before the blocks can be closed
+        shared_boards = shared_solutions = shared_statuses = None
+        for block in blocks:
+            block.close()
+            block.unlink()
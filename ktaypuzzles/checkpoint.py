@@ -0,0 +1,220 @@
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .puzzlebank import get_variant_name, make_puzzle
+from .search import check_cancelled
+from .sudoku import Board, EMPTY, Sudoku
+
+"""
+Checkpoint and resume for long enumerations of Sudoku solutions.
+
+CheckpointedSearch enumerates (or counts) the solutions of any Sudoku variant by the same
+backtracking as _SudokuSolver, but with an explicit stack instead of recursion, and saves
+its position to a JSON file every `interval` seconds. The position is the path from the
+root to the next node to visit: for each level, the cell branched on, the value being
+explored and the values still to try. Ties between equally constrained cells are broken by
+position and values are tried in increasing order, so the candidates at every node depend
+only on the path; they are recomputed when the search resumes rather than stored. A
+checkpoint therefore stays small however long the search has run, and can be resumed on
+another machine with the same version of the package.
+
+Solutions found after the last checkpoint are found again when the search resumes from it.
+split_checkpoint() divides the remaining work of a checkpoint into independent checkpoints,
+so that a long enumeration can be continued in parallel; the counts of the parts add up.
+"""
+VERSION = 1
+
+Cell = Tuple[int, int]
+
+
+class CheckpointedSearch:
+
+    def __init__(self, sudoku: Sudoku, checkpoint_path: str, interval: float = 60.0):
+        """
+        Start a new search of the solutions of `sudoku` (any Sudoku variant), saving
+        checkpoints to checkpoint_path.
+
+        :param interval: Seconds between checkpoints.
+        """
+        assert interval >= 0, 'interval must be >= 0'
+        self.sudoku = sudoku
+        self.checkpoint_path = checkpoint_path
+        self.interval = interval
+        self.solutions = 0  # number of solutions found, including before the last resume
+        self.nodes = 0  # number of search nodes visited, including before the last resume
+        self.is_complete = False
+        self._path: List[Tuple[Cell, int, List[int]]] = []
+
+    @classmethod
+    def resume(cls, checkpoint_path: str, interval: float = 60.0) -> 'CheckpointedSearch':
+        """
+        Continue the search saved in checkpoint_path (from this or another machine).
+        Checkpoints keep being written to the same file.
+
+        :raises ValueError: If the file is not a checkpoint of this version.
+        """
+        with open(checkpoint_path) as f:
+            state = json.load(f)
+        if state.get('version') != VERSION:
+            raise ValueError('{} is not a checkpoint of version {}'.format(checkpoint_path, VERSION))
+        board = [[cell if cell != 0 else EMPTY for cell in row] for row in state['board']]
+        search = cls(make_puzzle(state['variant'], state['minirows'], state['minicols'], board),
+                     checkpoint_path, interval)
+        search.solutions = state['solutions']
+        search.nodes = state['nodes']
+        search.is_complete = state['is_complete']
+        search._path = [((r, c), value, pending) for (r, c, value, pending) in state['path']]
+        return search
+
+    def _get_state(self) -> Dict[str, Any]:
+        return {
+            'version': VERSION,
+            'variant': get_variant_name(self.sudoku),
+            'minirows': self.sudoku.minirows,
+            'minicols': self.sudoku.minicols,
+            'board': [[cell if cell is not EMPTY else 0 for cell in row] for row in self.sudoku.board],
+            'solutions': self.solutions,
+            'nodes': self.nodes,
+            'is_complete': self.is_complete,
+            'path': [[r, c, value, pending] for ((r, c), value, pending) in self._path],
+        }
+
+    def save(self) -> None:
+        """
+        Write the current position to the checkpoint file. The file is replaced atomically,
+        so a crash while saving leaves the previous checkpoint intact.
+        """
+        temp_path = self.checkpoint_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self._get_state(), f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def iter_solutions(self) -> Iterator[Board]:
+        """
+        Yield the remaining solutions one at a time, saving a checkpoint every `interval`
+        seconds and when the search is complete. The search can be stopped between solutions
+        and continued later with resume().
+        """
+        if self.is_complete:
+            return
+        sudoku = self.sudoku
+        board = Sudoku._copy_board(sudoku.board)
+        candidates_dict: Dict[Cell, Set[int]] = {}
+        if sudoku.is_valid_board:
+            for (r,c) in Sudoku._get_empty_cells(board):
+                candidates_dict[(r,c)] = sudoku._get_candidates_for_cell(r, c, board)
+        if not sudoku.is_valid_board or not sudoku._propagate(candidates_dict, list(candidates_dict), {}):
+            self._finish()
+            return
+
+        # replay the path of the checkpoint, if any: frames hold [cell, value, pending, undo]
+        frames: List[List[Any]] = []
+        for (cell, value, pending) in self._path:
+            undo = self._apply(board, candidates_dict, cell, value)
+            assert undo is not None, 'Checkpoint does not match the search'
+            frames.append([cell, value, list(pending), undo])
+
+        last_save = time.monotonic()
+        while True:
+            # visit the node at the end of the path
+            check_cancelled()
+            self.nodes += 1
+            if len(candidates_dict) == 0:
+                self.solutions += 1
+                yield Sudoku._copy_board(board)
+            elif min(len(v) for v in candidates_dict.values()) > 0:
+                cell = min(candidates_dict, key=lambda k: (len(candidates_dict[k]), k))
+                values = sorted(candidates_dict[cell])
+                frames.append([cell, None, values, None])
+
+            # move to the next node to visit, backtracking as needed
+            while len(frames) > 0:
+                frame = frames[-1]
+                if frame[3] is not None:
+                    self._undo(board, candidates_dict, frame[0], frame[3])
+                    frame[3] = None
+                if len(frame[2]) == 0:
+                    frames.pop()
+                    continue
+                frame[1] = frame[2].pop(0)
+                frame[3] = self._apply(board, candidates_dict, frame[0], frame[1])
+                if frame[3] is not None:
+                    break
+                # dead end: _apply() has already undone the assignment
+            if len(frames) == 0:
+                self._finish()
+                return
+
+            if time.monotonic() - last_save >= self.interval:
+                self._path = [(cell, value, list(pending)) for (cell, value, pending, _) in frames]
+                self.save()
+                last_save = time.monotonic()
+
+    def count(self) -> int:
+        """
+        Run the search to the end and return the total number of solutions (including those
+        found before the last resume).
+        """
+        for _ in self.iter_solutions():
+            pass
+        return self.solutions
+
+    def _finish(self) -> None:
+        self.is_complete = True
+        self._path = []
+        self.save()
+
+    def _apply(self, board: Board, candidates_dict: Dict[Cell, Set[int]], cell: Cell,
+               value: int) -> Optional[Dict[Cell, Set[int]]]:
+        """
+        Place `value` in `cell`. Returns what is needed to undo it, or None (with the
+        assignment already undone) if it leaves some cell without candidates.
+        """
+        undo = {cell: candidates_dict.pop(cell)}
+        board[cell[0]][cell[1]] = value
+        if self.sudoku._assign(candidates_dict, cell, value, undo):
+            return undo
+        self._undo(board, candidates_dict, cell, undo)
+        return None
+
+    @staticmethod
+    def _undo(board: Board, candidates_dict: Dict[Cell, Set[int]], cell: Cell,
+              undo: Dict[Cell, Set[int]]) -> None:
+        board[cell[0]][cell[1]] = EMPTY
+        candidates_dict.update(undo)
+
+
+def split_checkpoint(checkpoint_path: str, output_paths: List[str]) -> List[str]:
+    """
+    Divide the remaining work of a checkpoint into independent checkpoints, written to (some
+    of) output_paths, which can then be resumed in parallel. The values still to try at the
+    shallowest level of the search that has any are shared out among the parts; the first part
+    also keeps the rest of the checkpoint, along with its solution and node counts (the other
+    parts start from 0, so the counts of the parts add up). Returns the paths written, which
+    are fewer than requested if there are not enough values to share out.
+    """
+    assert len(output_paths) >= 1, 'output_paths must not be empty'
+    search = CheckpointedSearch.resume(checkpoint_path)
+    path = search._path
+    level = next((i for i in range(len(path)) if len(path[i][2]) > 0), None)
+    if search.is_complete or level is None:
+        parts = 1
+    else:
+        parts = min(len(output_paths), 1 + len(path[level][2]))
+
+    # part k > 0 explores pending[k-1], pending[k-1+parts], ... at `level`
+    states = [search._get_state() for _ in range(parts)]
+    if parts > 1:
+        (cell, _, pending) = path[level]
+        states[0]['path'][level][3] = pending[parts-1::parts]
+        for k in range(1, parts):
+            values = pending[k-1::parts]
+            prefix = [[r, c, value, []] for ((r, c), value, _) in path[:level]]
+            states[k]['path'] = prefix + [[cell[0], cell[1], values[0], values[1:]]]
+            states[k]['solutions'] = states[k]['nodes'] = 0
+    for (state, output_path) in zip(states, output_paths):
+        with open(output_path, 'w') as f:
+            json.dump(state, f)
+    return output_paths[:parts]
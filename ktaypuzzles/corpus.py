@@ -0,0 +1,235 @@
+import mmap
+import random
+import struct
+from typing import Any, Iterable, List, Optional
+
+from .puzzlebank import make_puzzle
+from .sudoku import Board, EMPTY, Sudoku
+
+"""
+Binary puzzle corpora, read through mmap.
+
+A corpus file is a 32-byte header followed by fixed-width records, one per puzzle. The
+header holds the magic bytes b'KTPZ', the format version, the variant (its id in
+VARIANT_IDS), minirows, minicols, a flags byte and the number of records. A record
+is the board, row by row, optionally followed by its solution, with 0 for empty cells. Cells
+take one byte each, or, for boards of size 15 or less written with packed=True, half a byte
+(two cells per byte, the first in the high nibble).
+
+Because records have a fixed width, record i is found at offset 32 + i * record_size, so
+Corpus gives O(1) access by index without parsing text or loading the file: the operating
+system pages in only the records that are read. Shuffling, sampling and sharding work on
+indices alone. For bulk work, Corpus.boards and Corpus.solutions are zero-copy NumPy views
+of the mapped file.
+"""
+MAGIC = b'KTPZ'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBBB3xQ12x')  # magic, version, variant, minirows, minicols, flags, count
+HEADER_SIZE = HEADER.size
+# ids of the variants (keys of puzzlebank.VARIANTS) in corpus files; they are part of the
+# format, so a new variant gets a new id and existing ids never change
+VARIANT_IDS = {'sudoku': 0, 'diagonal': 1, 'king': 2, 'knight': 3, 'nonconsec': 4}
+VARIANT_NAMES = dict((variant_id, variant) for (variant, variant_id) in VARIANT_IDS.items())
+
+FLAG_SOLUTIONS = 1
+FLAG_PACKED = 2
+
+
+def _cells_size(size: int, packed: bool) -> int:
+    return (size * size + 1) // 2 if packed else size * size
+
+
+def _encode(board: Any, size: int, packed: bool) -> bytes:
+    if hasattr(board, 'tobytes'):  # NumPy array, with 0 for empty cells
+        assert board.shape == (size, size), 'Board must be {0}x{0}'.format(size)
+        if not packed:
+            return board.astype('uint8', copy=False).tobytes()
+        cells = board.ravel().tolist()
+    else:
+        cells = [0 if cell is EMPTY else int(cell) for row in board for cell in row]
+    assert len(cells) == size * size, 'Board must be {0}x{0}'.format(size)
+    if not packed:
+        return bytes(cells)
+    if len(cells) % 2:
+        cells.append(0)
+    return bytes(cells[i] << 4 | cells[i + 1] for i in range(0, len(cells), 2))
+
+
+def _decode(data: bytes, size: int, packed: bool) -> Board:
+    if packed:
+        cells = [nibble for byte in data for nibble in (byte >> 4, byte & 0xF)]
+    else:
+        cells = list(data)
+    return [[cell if cell else EMPTY for cell in cells[r * size:(r + 1) * size]] for r in range(size)]
+
+
+def unpack_cells(packed: Any, size: int) -> Any:
+    """
+    Unpack a NumPy array of nibble-packed records of shape (..., (size*size+1)//2) into a new
+    uint8 array of shape (..., size, size).
+    """
+    import numpy as np
+    cells = np.empty(packed.shape[:-1] + (2 * packed.shape[-1],), dtype=np.uint8)
+    cells[..., 0::2] = packed >> 4
+    cells[..., 1::2] = packed & 0xF
+    return cells[..., :size * size].reshape(packed.shape[:-1] + (size, size))
+
+
+def write_corpus(path: str, variant: str, minirows: int, boards: Iterable[Any], minicols: Optional[int] = None,
+                 solutions: Optional[Iterable[Any]] = None, packed: bool = False) -> int:
+    """
+    Write boards (and their solutions, if given) to a corpus file at `path`. Boards are
+    written as they come, so `boards` can be a generator.
+
+    :param variant: A key of puzzlebank.VARIANTS.
+    :param boards: Boards as lists of lists (EMPTY or 0 for empty cells) or NumPy arrays.
+    :param solutions: One solution per board, in the same order.
+    :param packed: Store two cells per byte. Only for boards of size 15 or less.
+    :return: The number of records written.
+    """
+    assert variant in VARIANT_IDS, 'Variant {!r} has no corpus id'.format(variant)
+    minicols = minicols if minicols else minirows
+    size = make_puzzle(variant, minirows, minicols).size
+    assert not packed or size <= 15, 'Packed records need boards of size 15 or less'
+    assert size < 256, 'Boards must fit in one byte per cell'
+    flags = (FLAG_SOLUTIONS if solutions is not None else 0) | (FLAG_PACKED if packed else 0)
+    solution_iter = iter(solutions) if solutions is not None else None
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(bytes(HEADER_SIZE))
+        for board in boards:
+            record = _encode(board, size, packed)
+            if solution_iter is not None:
+                solution = next(solution_iter, None)
+                assert solution is not None, 'There must be one solution per board'
+                record += _encode(solution, size, packed)
+            f.write(record)
+            count += 1
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, VARIANT_IDS[variant], minirows, minicols, flags, count))
+    return count
+
+
+class Corpus:
+
+    def __init__(self, path: str):
+        """
+        Open the corpus file at `path` (written by write_corpus()) for reading.
+
+        :raises ValueError: If the file is not a corpus, has an unknown variant id, or is shorter
+            than its header says.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER_SIZE:
+            self._mmap.close()
+            raise ValueError('{} is not a puzzle corpus'.format(path))
+        (magic, version, variant, self.minirows, self.minicols, flags, self.count) = \
+            HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError('{} is not a puzzle corpus (version {})'.format(path, VERSION))
+        if variant not in VARIANT_NAMES:
+            self._mmap.close()
+            raise ValueError('{} has an unknown variant id {}'.format(path, variant))
+        self.variant = VARIANT_NAMES[variant]
+        self.size = self.minirows * self.minicols
+        self.has_solutions = bool(flags & FLAG_SOLUTIONS)
+        self.packed = bool(flags & FLAG_PACKED)
+        self._board_size = _cells_size(self.size, self.packed)
+        self.record_size = self._board_size * (2 if self.has_solutions else 1)
+        if len(self._mmap) < HEADER_SIZE + self.count * self.record_size:
+            self._mmap.close()
+            raise ValueError('{} is truncated'.format(path))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> Sudoku:
+        """
+        Return puzzle i (negative indices count from the end), with its solution set if the
+        corpus has solutions.
+        """
+        i = self._check_index(i)
+        puzzle = make_puzzle(self.variant, self.minirows, self.minicols, self.get_board(i))
+        if self.has_solutions:
+            puzzle.solution = self.get_solution(i)
+        return puzzle
+
+    def _check_index(self, i: int) -> int:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError('corpus index out of range')
+        return i
+
+    def get_board(self, i: int) -> Board:
+        """
+        Return board i as a list of lists, with EMPTY for empty cells.
+        """
+        offset = HEADER_SIZE + self._check_index(i) * self.record_size
+        return _decode(self._mmap[offset:offset + self._board_size], self.size, self.packed)
+
+    def get_solution(self, i: int) -> Board:
+        """
+        Return the solution of board i.
+
+        :raises ValueError: If the corpus has no solutions.
+        """
+        if not self.has_solutions:
+            raise ValueError('{} has no solutions'.format(self.path))
+        offset = HEADER_SIZE + self._check_index(i) * self.record_size + self._board_size
+        return _decode(self._mmap[offset:offset + self._board_size], self.size, self.packed)
+
+    def _view(self, start: int) -> Any:
+        import numpy as np
+        if self.packed:
+            shape, strides = (self.count, self._board_size), (self.record_size, 1)
+        else:
+            shape, strides = (self.count, self.size, self.size), (self.record_size, self.size, 1)
+        return np.ndarray(shape, dtype=np.uint8, buffer=self._mmap, offset=HEADER_SIZE + start,
+                          strides=strides)
+
+    @property
+    def boards(self) -> Any:
+        """
+        Read-only uint8 NumPy view of all boards, of shape (count, size, size) with 0 for empty
+        cells, or of shape (count, (size*size+1)//2) for packed corpora (see unpack_cells()).
+        No data is copied. Views must be deleted before the corpus is closed.
+        """
+        return self._view(0)
+
+    @property
+    def solutions(self) -> Any:
+        """
+        Read-only uint8 NumPy view of all solutions, shaped as boards.
+
+        :raises ValueError: If the corpus has no solutions.
+        """
+        if not self.has_solutions:
+            raise ValueError('{} has no solutions'.format(self.path))
+        return self._view(self._board_size)
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[int]:
+        """
+        Return the indices of k distinct random puzzles. sample(len(corpus)) is a shuffle.
+        """
+        return random.Random(seed).sample(range(self.count), k)
+
+    def shard(self, index: int, num_shards: int) -> range:
+        """
+        Return the indices of shard `index` out of `num_shards` contiguous shards of
+        (nearly) equal size.
+        """
+        assert 0 <= index < num_shards, 'index must be in [0, num_shards)'
+        return range(index * self.count // num_shards, (index + 1) * self.count // num_shards)
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> 'Corpus':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,151 @@
+from typing import Dict, List, Optional, Tuple
+
+from .search import check_cancelled
+from .sudoku import EMPTY, Sudoku
+
+"""
+Counting the solutions of a standard Sudoku without building them.
+
+The board is filled row by row, and a band (minirows consecutive rows) at a time: all that
+matters to the rows below a partly filled board is which digits each column already holds,
+and, within a band, which digits each box already holds. The number of completions is
+therefore memoized on those masks, so two partial boards that agree on them are only
+counted once. At band boundaries, the box masks are empty and the state shrinks to the
+column masks.
+
+Rows with givens are moved to the top first (permuting bands, and rows within a band, does
+not change the number of solutions). Below the last given, the count is also invariant under
+relabeling digits, permuting columns within a stack and permuting stacks, so states are
+reduced to a canonical representative of their symmetry class before the memo lookup.
+Givens are reserved in the column and box masks from the start, so that they prune the rows
+above them.
+
+This is far faster than enumerating the solutions of boards with many of them (all 28,200,960
+6x6 grids are counted in about a second), and with `limit`, it stops as soon as that many
+are found, for uniqueness checks.
+"""
+State = Tuple[int, ...]
+
+
+def count_completions(sudoku: Sudoku, limit: Optional[int] = None) -> int:
+    """
+    Return the number of solutions of a (standard) Sudoku of any shape, or `limit` if there
+    are at least that many.
+    """
+    assert type(sudoku) is Sudoku, 'The counting engine only applies to standard Sudoku'
+    assert limit is None or limit >= 1, 'limit must be >= 1'
+    if not sudoku.is_valid_board:
+        return 0
+    return _Counter(sudoku, limit).count()
+
+
+class _Counter:
+
+    def __init__(self, sudoku: Sudoku, limit: Optional[int]):
+        self.size = size = sudoku.size
+        self.minirows, self.minicols = sudoku.minirows, sudoku.minicols
+        self.num_stacks = size // self.minicols
+        self.limit = limit
+        self.memo: Dict[Tuple[int, ...], int] = {}
+
+        # rows with the most givens first, keeping the bands together
+        board = [[cell if cell is not EMPTY else 0 for cell in row] for row in sudoku.board]
+        num_givens = [sum(1 for cell in row if cell) for row in board]
+        bands = [list(range(start, start + self.minirows)) for start in range(0, size, self.minirows)]
+        for band in bands:
+            band.sort(key=lambda r: -num_givens[r])
+        bands.sort(key=lambda band: -sum(num_givens[r] for r in band))
+        self.rows = [board[r] for band in bands for r in band]
+        self.free_from = max([i + 1 for i in range(size) if any(self.rows[i])], default=0)
+
+        # givens, reserved in the masks (bit v-1 for digit v) from the start
+        self.cols = [0] * size
+        self.band_boxes = [[0] * self.num_stacks for _ in bands]
+        for (r, row) in enumerate(self.rows):
+            for (c, value) in enumerate(row):
+                if value:
+                    self.cols[c] |= 1 << (value - 1)
+                    self.band_boxes[r // self.minirows][c // self.minicols] |= 1 << (value - 1)
+
+    def count(self) -> int:
+        return self._count_rows(0, self.cols, self.band_boxes[0])
+
+    def _count_rows(self, r: int, cols: List[int], boxes: List[int]) -> int:
+        """
+        Number of ways to fill rows r, r+1, ... given the digits already in each column and
+        in each box of the current band.
+        """
+        if r == self.size:
+            return 1
+        if r >= self.free_from:
+            key = (r,) + self._canonical(cols, boxes)
+        else:
+            key = (r,) + tuple(cols) + tuple(boxes)
+        if key in self.memo:
+            return self.memo[key]
+        check_cancelled()
+
+        row = self.rows[r]
+        empty = [c for c in range(self.size) if not row[c]]
+        used = sum(1 << (value - 1) for value in row if value)
+        full = (1 << self.size) - 1
+        # most constrained cells first
+        empty.sort(key=lambda c: bin(full & ~(used | cols[c] | boxes[c // self.minicols])).count('1'))
+        if (r + 1) % self.minirows == 0 and r + 1 < self.size:
+            next_boxes = self.band_boxes[(r + 1) // self.minirows]
+        else:
+            next_boxes = None
+        total = self._fill_row(r, empty, 0, used, cols[:], boxes[:], next_boxes)
+        self.memo[key] = total
+        return total
+
+    def _fill_row(self, r: int, empty: List[int], i: int, used: int, cols: List[int], boxes: List[int],
+                  next_boxes: Optional[List[int]]) -> int:
+        if i == len(empty):
+            return self._count_rows(r + 1, cols, boxes if next_boxes is None else next_boxes)
+        c = empty[i]
+        b = c // self.minicols
+        options = ((1 << self.size) - 1) & ~(used | cols[c] | boxes[b])
+        total = 0
+        while options:
+            bit = options & -options
+            options ^= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+            total += self._fill_row(r, empty, i + 1, used | bit, cols, boxes, next_boxes)
+            cols[c] ^= bit
+            boxes[b] ^= bit
+            if self.limit is not None and total >= self.limit:
+                return self.limit
+        return total
+
+    def _canonical(self, cols: List[int], boxes: List[int]) -> State:
+        """
+        A representative of the symmetry class of a state with no givens left: digits are
+        relabeled in order of first appearance once columns and stacks are sorted.
+        """
+        stacks = self._sort_stacks(cols, boxes)
+        relabel = [0] * self.size
+        next_label = 0
+        for mask in stacks:
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                d = bit.bit_length() - 1
+                if not relabel[d]:
+                    next_label += 1
+                    relabel[d] = next_label
+        masks = []
+        for mask in cols + boxes:
+            new_mask = 0
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                new_mask |= 1 << (relabel[bit.bit_length() - 1] - 1)
+            masks.append(new_mask)
+        return self._sort_stacks(masks[:self.size], masks[self.size:])
+
+    def _sort_stacks(self, cols: List[int], boxes: List[int]) -> State:
+        C = self.minicols
+        stacks = sorted((boxes[s],) + tuple(sorted(cols[s * C:(s + 1) * C])) for s in range(self.num_stacks))
+        return tuple(mask for stack in stacks for mask in stack)
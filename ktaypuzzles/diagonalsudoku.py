@@ -1,6 +1,6 @@
 import random
 from overrides import override
-from typing import Iterable, Optional, Union, Set, Tuple
+from typing import Iterable, List, Optional, Union, Set, Tuple
 
 from .sudoku import Board, EMPTY, Sudoku, _SudokuSolver
 
@@ -89,6 +89,10 @@ class DiagonalSudoku(Sudoku):
         self.is_solved = len(solution_board) > 0
         self.solution = solution_board[0] if self.is_solved else None
         return solution_board
+
+    @override
+    def _get_solver(self) -> '_DiagonalSudokuSolver':
+        return _DiagonalSudokuSolver(self)
     
     @override
     def generate_puzzle_board(self, blank_proportion: float = 0.5) -> Board:
@@ -96,7 +100,7 @@ class DiagonalSudoku(Sudoku):
         Generate a new random sudoku puzzle and save in self.board. We do so in the following way:
         1. Generate a complete board with _generate_complete_board().
         2. Randomly remove `blank_proportion` of the cells.
-        3. Use backtracking_solve() to check if the solution is unique. If not, keeping adding
+        3. Use count_solutions(limit=2) to check if the solution is unique. If not, keeping adding
            cells back until the solution is unique.
         """
         assert blank_proportion > 0 and blank_proportion < 1, 'blank_proportion must be in (0,1)'
@@ -109,13 +113,9 @@ class DiagonalSudoku(Sudoku):
         for (r,c) in cells_to_remove:
             puzzle_board[r][c] = EMPTY
 
-        # get solutions for this board, then keeping adding cells until solution is unique
-        sudoku_solver = _DiagonalSudokuSolver(DiagonalSudoku(self.minirows, puzzle_board))
-        solution_list = sudoku_solver.backtracking_solve()
-        while len(solution_list) > 1:
-            r,c = cells_to_remove.pop()
-            puzzle_board[r][c] = complete_board[r][c]
-            solution_list = [board for board in solution_list if board[r][c] == complete_board[r][c]]
+        # add cells back (last removed first) until the solution is unique
+        self._add_back_until_unique(puzzle_board, complete_board, cells_to_remove,
+                                    lambda board: DiagonalSudoku(self.minirows, board))
 
         self.board = puzzle_board
         self.is_valid_board = True
@@ -135,6 +135,15 @@ class DiagonalSudoku(Sudoku):
             if r+c == self.size-1 else set()
         return basic_neighbors | l2r_neighbors | r2l_neighbors
 
+    @override
+    def _get_units(self) -> List[List[Tuple[int, int]]]:
+        """
+        Return the rows, columns and boxes, and the two main diagonals.
+        """
+        diagonals = [[(i, i) for i in range(self.size)],
+                     [(i, self.size-1-i) for i in range(self.size)]]
+        return super()._get_units() + diagonals
+
     @override
     def __str__(self) -> str:
         """
@@ -0,0 +1,84 @@
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional
+
+from .search import SearchBudget, check_cancelled
+
+"""
+Exact cover by Knuth's Algorithm X.
+
+An exact cover problem has columns (constraints that must each be satisfied exactly once) and
+rows (choices, each satisfying some of the columns). A solution is a set of rows that covers
+every column exactly once. Algorithm X picks the column with the fewest rows left, tries each
+of them, and removes the columns it covers along with every row that conflicts with it.
+
+As in Dancing Links, rows and columns are removed in place and restored in reverse order
+when backtracking, so nothing is copied. Instead of linked lists, each column holds a dict
+(used as an ordered set) of its remaining rows, which is faster in Python; the order in which
+rows are tried therefore stays deterministic.
+"""
+
+
+class ExactCover:
+
+    def __init__(self, columns: Iterable[Hashable], rows: Dict[Hashable, List[Hashable]]):
+        """
+        :param columns: All the columns, each of which must be covered exactly once.
+        :param rows: Dict {row key: list of the columns that the row covers}.
+        """
+        self.rows = {key: list(row_columns) for (key, row_columns) in rows.items()}
+        self.columns: Dict[Hashable, Dict[Hashable, None]] = {column: {} for column in columns}
+        for (key, row_columns) in self.rows.items():
+            for column in row_columns:
+                assert column in self.columns, 'Row {} covers unknown column {}'.format(key, column)
+                self.columns[column][key] = None
+        self.nodes = 0  # number of search nodes visited by iter_solutions()
+        self.budget: Optional[SearchBudget] = None
+
+    def iter_solutions(self) -> Iterator[List[Hashable]]:
+        """
+        Yield the exact covers one at a time, each as a list of row keys. The search is
+        suspended between solutions.
+        """
+        self.nodes = 0
+        yield from self._search([])
+
+    def _search(self, partial: List[Hashable]) -> Iterator[List[Hashable]]:
+        self.nodes += 1
+        check_cancelled()
+        if self.budget is not None:
+            self.budget.check(self.nodes)
+        if len(self.columns) == 0:
+            yield list(partial)
+            return
+        # branch on the most constrained column (a column with no rows left is a dead end)
+        column = min(self.columns, key=lambda col: len(self.columns[col]))
+        for row in list(self.columns[column]):
+            partial.append(row)
+            removed = self._select(row)
+            yield from self._search(partial)
+            self._deselect(row, removed)
+            partial.pop()
+
+    def _select(self, row: Hashable) -> List[Dict[Hashable, None]]:
+        """
+        Remove the columns covered by `row`, and the rows that cover any of them from the
+        other columns. Returns the removed columns, for _deselect().
+        """
+        removed = []
+        for column in self.rows[row]:
+            for other_row in self.columns[column]:
+                for other_column in self.rows[other_row]:
+                    if other_column != column:
+                        del self.columns[other_column][other_row]
+            removed.append(self.columns.pop(column))
+        return removed
+
+    def _deselect(self, row: Hashable, removed: List[Dict[Hashable, None]]) -> None:
+        """
+        Undo _select(row).
+        """
+        for column in reversed(self.rows[row]):
+            self.columns[column] = removed.pop()
+            for other_row in self.columns[column]:
+                for other_column in self.rows[other_row]:
+                    if other_column != column:
+                        self.columns[other_column][other_row] = None
@@ -0,0 +1,301 @@
+import copy
+import random
+from overrides import override
+from typing import Dict, Iterable, List, Optional, Union, Set, Tuple
+
+from .sudoku import Board, EMPTY, Sudoku, _SudokuSolver
+
+"""
+Killer sudoku: the board is divided into cages, each with a target sum. The numbers in a cage
+must add up to its target and cannot repeat.
+
+Cage pruning is a table lookup: for every board size, get_cage_table() lists, for each cage
+size and sum, the sets of distinct numbers with that sum, as bitmasks (bit v-1 for number v).
+During the search, the combinations of a cage that contain the numbers already placed in it
+give the numbers its empty cells can still take.
+"""
+Cell = Tuple[int, int]
+Cage = Tuple[int, List[Cell]]  # (target sum, cells)
+
+_cage_tables: Dict[int, Dict[Tuple[int, int], List[int]]] = {}
+
+
+def get_cage_table(size: int) -> Dict[Tuple[int, int], List[int]]:
+    """
+    Return {(number of cells, sum): bitmasks of the sets of distinct numbers in 1..size with
+    that many numbers and that sum}, computed once per board size.
+    """
+    if size not in _cage_tables:
+        table: Dict[Tuple[int, int], List[int]] = {}
+        sums = [0] * (1 << size)
+        counts = [0] * (1 << size)
+        for mask in range(1, 1 << size):
+            low = mask & -mask
+            sums[mask] = sums[mask ^ low] + low.bit_length()
+            counts[mask] = counts[mask ^ low] + 1
+            table.setdefault((counts[mask], sums[mask]), []).append(mask)
+        _cage_tables[size] = table
+    return _cage_tables[size]
+
+
+def _to_mask(values: Iterable[int]) -> int:
+    mask = 0
+    for v in values:
+        mask |= 1 << (v - 1)
+    return mask
+
+
+class KillerSudoku(Sudoku):
+
+    def __init__(self, minirows: int = 3, minicols: Optional[int] = None,
+                 board: Optional[Iterable[Iterable[Union[int, None]]]] = None,
+                 cages: Optional[List[Cage]] = None):
+        """
+        :param cages: List of (target sum, list of (r,c) cells). Cages must not overlap, but
+        need not cover the board.
+        """
+        size = minirows * (minicols if minicols else minirows)
+        assert size <= 16, 'Killer sudoku boards can be at most 16x16'
+        self._set_cages(size, cages if cages else [])
+        # values placed by the current search, see _assign()
+        self._placed: Dict[Cell, int] = {}
+        super().__init__(minirows, minicols, board)
+
+    def _set_cages(self, size: int, cages: List[Cage]) -> None:
+        table = get_cage_table(size)
+        # eliminations depend on the cages
+        self._elimination_cache = {}
+        self.cages = [(total, list(cells)) for (total, cells) in cages]
+        self._cage_of: Dict[Cell, int] = {}
+        self._cage_combinations: List[List[int]] = []
+        for (i, (total, cells)) in enumerate(self.cages):
+            assert 1 <= len(cells) <= size, 'Cages must have 1 to {} cells'.format(size)
+            for (r,c) in cells:
+                assert 0 <= r < size and 0 <= c < size, 'Cage cell {} is off the board'.format((r,c))
+                assert (r,c) not in self._cage_of, 'Cage cell {} is in two cages'.format((r,c))
+                self._cage_of[(r,c)] = i
+            self._cage_combinations.append(table.get((len(cells), total), []))
+
+    @override
+    def validate(self) -> bool:
+        # check basic sudoku
+        if super().validate() is False:
+            return False
+
+        # check cages: no repeated numbers, and the numbers placed must be part of some
+        # combination with the target sum (all of it, if the cage is full)
+        for (i, (_, cells)) in enumerate(self.cages):
+            values = [self.board[r][c] for (r,c) in cells if self.board[r][c] != EMPTY]
+            if len(set(values)) < len(values):
+                return False
+            placed = _to_mask(values)
+            if not any(m & placed == placed for m in self._cage_combinations[i]):
+                return False
+
+        return True
+
+    @override
+    def solve(self) -> Optional[Board]:
+        """
+        Solve the sudoku board. Board is saved as self.solution, and also returned.
+        """
+        sudoku_solver = _KillerSudokuSolver(self)
+        solution_board = sudoku_solver.backtracking_solve()
+        self.is_solved = len(solution_board) > 0
+        self.solution = solution_board[0] if self.is_solved else None
+        return solution_board
+
+    @override
+    def _get_solver(self) -> '_KillerSudokuSolver':
+        return _KillerSudokuSolver(self)
+
+    @override
+    def generate_puzzle_board(self, blank_proportion: float = 1.0) -> Board:
+        """
+        Generate a new random killer sudoku puzzle and save in self.board and self.cages. We do
+        so in the following way:
+        1. Generate a complete board with _generate_complete_board().
+        2. Divide it into random cages of 1 to 4 cells, and take their sums from the board.
+        3. Randomly remove `blank_proportion` of the cells (by default, all of them).
+        4. Use count_solutions(limit=2) to check if the solution is unique. If not, keeping adding
+           cells back until the solution is unique.
+        """
+        assert blank_proportion > 0 and blank_proportion <= 1, 'blank_proportion must be in (0,1]'
+        self._set_cages(self.size, [])
+        complete_board = self._generate_complete_board()
+        cages = self._get_random_cages(complete_board)
+
+        num_cells_to_remove = round(self.size * self.size * blank_proportion)
+        puzzle_board = Sudoku._copy_board(complete_board)
+        cells_to_remove = random.sample([(r,c) for r in range(self.size) for c in range(self.size)],
+                                        num_cells_to_remove)
+        for (r,c) in cells_to_remove:
+            puzzle_board[r][c] = EMPTY
+
+        # add cells back (last removed first) until the solution is unique
+        self._add_back_until_unique(puzzle_board, complete_board, cells_to_remove,
+                                    lambda board: KillerSudoku(self.minirows, self.minicols, board, cages))
+
+        self._set_cages(self.size, cages)
+        self.board = puzzle_board
+        self.is_valid_board = True
+        self.blank_count = len(self._get_empty_cells(self.board))
+        self.is_solved = True if self.blank_count == 0 and self.is_valid_board else False
+        self.solution = self.board if self.is_solved else None
+
+    def _get_random_cages(self, complete_board: Board, max_cells: int = 4) -> List[Cage]:
+        """
+        Divide a complete board into cages of 1 to max_cells orthogonally connected cells with
+        distinct numbers, grown at random.
+        """
+        covered: Set[Cell] = set()
+        cages = []
+        cells = [(r,c) for r in range(self.size) for c in range(self.size)]
+        random.shuffle(cells)
+        for start in cells:
+            if start in covered:
+                continue
+            cage = [start]
+            covered.add(start)
+            target_cells = random.randint(1, max_cells)
+            while len(cage) < target_cells:
+                values = set(complete_board[r][c] for (r,c) in cage)
+                options = [(i,j) for (r,c) in cage for (i,j) in ((r-1,c), (r+1,c), (r,c-1), (r,c+1))
+                           if 0 <= i < self.size and 0 <= j < self.size and (i,j) not in covered
+                           and complete_board[i][j] not in values]
+                if len(options) == 0:
+                    break
+                cell = random.choice(options)
+                cage.append(cell)
+                covered.add(cell)
+            cages.append((sum(complete_board[r][c] for (r,c) in cage), cage))
+        return cages
+
+    @override
+    def _get_neighbors_for_cell(self, r: int, c: int) -> Set[Cell]:
+        """
+        Return cells which are in the same row, column, box or cage as (r,c).
+        """
+        basic_neighbors = super()._get_neighbors_for_cell(r, c)
+        if (r,c) not in self._cage_of:
+            return basic_neighbors
+        (_, cells) = self.cages[self._cage_of[(r,c)]]
+        return basic_neighbors | (set(cells) - {(r,c)})
+
+    @override
+    def _get_candidates_for_cell(self, r: int, c: int, board: Board) -> Set[int]:
+        """
+        Return possible values in (r,c) given the current board. It ignores the value (if present)
+        at (r,c).
+        """
+        candidates = super()._get_candidates_for_cell(r, c, board)
+        if (r,c) not in self._cage_of:
+            return candidates
+        i = self._cage_of[(r,c)]
+        placed = _to_mask(board[i_][j_] for (i_, j_) in self.cages[i][1]
+                          if (i_, j_) != (r,c) and board[i_][j_])
+        allowed = 0
+        for m in self._cage_combinations[i]:
+            if m & placed == placed:
+                allowed |= m & ~placed
+        return set(v for v in candidates if allowed >> (v - 1) & 1)
+
+    @override
+    def _assign(self, candidates_dict: Dict[Cell, Set[int]], cell: Cell, value: int,
+                original_candidates_dict: Dict[Cell, Set[int]]) -> bool:
+        """
+        Also record the value placed, for the cage pruning of _propagate(). A cell that is
+        not in candidates_dict holds either a given or the value it was last assigned.
+        """
+        self._placed[cell] = value
+        if not super()._assign(candidates_dict, cell, value, original_candidates_dict):
+            return False
+        if cell in self._cage_of:
+            return self._prune_cage(candidates_dict, self._cage_of[cell], original_candidates_dict)
+        return True
+
+    @override
+    def _propagate(self, candidates_dict: Dict[Cell, Set[int]], cells: List[Cell],
+                   original_candidates_dict: Dict[Cell, Set[int]]) -> bool:
+        """
+        Prune candidates with the cage-sum tables, in the cages of `cells`.
+        """
+        cages = set(self._cage_of[cell] for cell in cells if cell in self._cage_of)
+        return all(self._prune_cage(candidates_dict, i, original_candidates_dict) for i in cages)
+
+    def _prune_cage(self, candidates_dict: Dict[Cell, Set[int]], i: int,
+                    original_candidates_dict: Dict[Cell, Set[int]]) -> bool:
+        """
+        Keep only the candidates of the empty cells of cage i that belong to some combination
+        containing the numbers placed in it, whose other numbers the empty cells can take.
+        Repeats until nothing changes. Returns False if no combination is left.
+        """
+        cells = self.cages[i][1]
+        empty = [cell for cell in cells if cell in candidates_dict]
+        placed = _to_mask(self.board[r][c] if self.board[r][c] else self._placed[(r,c)]
+                          for (r,c) in cells if (r,c) not in candidates_dict)
+        while True:
+            available = _to_mask(v for cell in empty for v in candidates_dict[cell])
+            allowed = 0
+            for m in self._cage_combinations[i]:
+                if m & placed == placed and m & ~placed & ~available == 0:
+                    allowed |= m & ~placed
+            if bin(allowed).count('1') < len(empty) or (len(empty) == 0 and placed not in self._cage_combinations[i]):
+                return False
+            if available & ~allowed == 0:
+                return True
+            for cell in empty:
+                candidates = candidates_dict[cell]
+                pruned = set(v for v in candidates if allowed >> (v - 1) & 1)
+                if len(pruned) < len(candidates):
+                    original_candidates_dict.setdefault(cell, candidates)
+                    candidates_dict[cell] = pruned
+
+    @override
+    def __str__(self) -> str:
+        """
+        Prints the original board and the cages.
+        """
+        cages = '\n'.join('{:>3}: {}'.format(total, ' '.join('({},{})'.format(r, c) for (r,c) in cells))
+                          for (total, cells) in self.cages)
+        return '''
+----------------------------------
+{}x{} ({}x{}) KILLER SUDOKU PUZZLE
+----------------------------------
+{}
+Cages (sum: cells):
+{}
+        '''.format(self.size, self.size, self.minirows, self.minicols,
+                   Sudoku.get_board_ascii(self.minirows, self.minicols, self.board), cages)
+
+    @override
+    def show_as_image(self, title: str = 'Killer Sudoku', save_path: str = '') -> None:
+        self._get_board_image(self.board, title=title, save_path=save_path)
+
+    @override
+    def show_solution_as_image(self, title: str = 'Killer Sudoku', save_path: str = '') -> None:
+        self._get_board_image(self.solution, self.board, title=title, save_path=save_path)
+
+
+class _KillerSudokuSolver(_SudokuSolver):
+    def __init__(self, sudoku: KillerSudoku):
+        # each search records the values it places on its own copy of the puzzle, so that
+        # searches of the same puzzle do not interfere
+        sudoku = copy.copy(sudoku)
+        sudoku._placed = {}
+        super().__init__(sudoku)
+
+    @override
+    def ip_solve(self) -> Optional[Board]:
+        raise NotImplementedError
+
+
+if __name__ == '__main__':
+
+    random.seed(0)
+    test_sudoku = KillerSudoku(2, 3)
+    test_sudoku.generate_puzzle_board()
+    print(test_sudoku)
+
+    test_sudoku.solve()
+    test_sudoku.show_solution()
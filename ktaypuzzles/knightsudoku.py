@@ -1,6 +1,6 @@
 import random
 from overrides import override
-from typing import Iterable, Optional, Union, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Union, Set, Tuple
 
 from .sudoku import Board, EMPTY, Sudoku, _SudokuSolver
 
@@ -43,6 +43,10 @@ class KnightSudoku(Sudoku):
         self.is_solved = len(solution_board) > 0
         self.solution = solution_board[0] if self.is_solved else None
         return solution_board
+
+    @override
+    def _get_solver(self) -> '_KnightSudokuSolver':
+        return _KnightSudokuSolver(self)
     
     @override
     def generate_puzzle_board(self, blank_proportion: float = 0.65) -> Board:
@@ -50,7 +54,7 @@ class KnightSudoku(Sudoku):
         Generate a new random sudoku puzzle and save in self.board. We do so in the following way:
         1. Generate a complete board with _generate_complete_board().
         2. Randomly remove `blank_proportion` of the cells.
-        3. Use backtracking_solve() to check if the solution is unique. If not, keeping adding
+        3. Use count_solutions(limit=2) to check if the solution is unique. If not, keeping adding
            cells back until the solution is unique.
         """
         assert blank_proportion > 0 and blank_proportion < 1, 'blank_proportion must be in (0,1)'
@@ -63,13 +67,9 @@ class KnightSudoku(Sudoku):
         for (r,c) in cells_to_remove:
             puzzle_board[r][c] = EMPTY
 
-        # get solutions for this board, then keeping adding cells until solution is unique
-        sudoku_solver = _KnightSudokuSolver(KnightSudoku(self.minirows, self.minicols, puzzle_board))
-        solution_list = sudoku_solver.backtracking_solve()
-        while len(solution_list) > 1:
-            r,c = cells_to_remove.pop()
-            puzzle_board[r][c] = complete_board[r][c]
-            solution_list = [board for board in solution_list if board[r][c] == complete_board[r][c]]
+        # add cells back (last removed first) until the solution is unique
+        self._add_back_until_unique(puzzle_board, complete_board, cells_to_remove,
+                                    lambda board: KnightSudoku(self.minirows, self.minicols, board))
 
         self.board = puzzle_board
         self.is_valid_board = True
@@ -98,6 +98,14 @@ class KnightSudoku(Sudoku):
         basic_neighbors = super()._get_neighbors_for_cell(r, c)
         return basic_neighbors | self._get_knight_neighbors(r, c)
     
+    @override
+    def _propagate(self, candidates_dict: Dict[Tuple[int, int], Set[int]], cells: List[Tuple[int, int]],
+                   original_candidates_dict: Dict[Tuple[int, int], Set[int]]) -> bool:
+        """
+        Prune candidates with arc consistency on the knight move constraint.
+        """
+        return self._arc_consistency(candidates_dict, cells, original_candidates_dict)
+
     @override
     def __str__(self) -> str:
         """
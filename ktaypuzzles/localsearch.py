@@ -0,0 +1,254 @@
+import math
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from .logic import LogicSolver
+from .search import COMPLETED, NO_SOLUTION, TIME_LIMIT, check_cancelled
+from .sudoku import Board, EMPTY, Sudoku
+
+"""
+Stochastic local search for very large Sudoku boards.
+
+Backtracking does not finish on 25x25 to 49x49 boards with few givens. This engine does
+simulated annealing instead, over states in which every box already holds each digit
+exactly once: the empty cells of each box are filled with its missing digits, and a move
+swaps two non-given cells of the same box. The cost of a state is the number of repeated
+digits in rows and columns, and a state of cost 0 is a solution.
+
+Cells forced by naked and hidden singles are filled in before the search. The remaining
+candidates of every cell then guide it: boxes start from a random filling that puts digits
+in cells where they are candidates as far as possible, and most moves only swap two digits
+that are candidates of the cells they move to. The rest are unrestricted, so that every
+filling stays reachable.
+
+The temperature starts at the standard deviation of the cost change of random moves, and
+is multiplied by `cooling` after every chain of moves (one move per free cell). When
+`restart_after` chains in a row have not improved on the best cost of the run, the search
+starts again from a new random state. The search is not complete: it finds a solution or
+runs out of time, and cannot prove that none exists. A solution it finds is checked by
+Sudoku.validate() before it is returned (a RuntimeError if it fails, which would be a bug).
+"""
+Cell = Tuple[int, int]
+
+
+@dataclass
+class LocalSearchResult:
+    """
+    Outcome of local_search_solve().
+
+    status: COMPLETED if a solution was found, NO_SOLUTION if the givens are contradictory,
+        TIME_LIMIT if the time ran out first.
+    solution: the solution, if one was found.
+    best_board: the lowest-cost board found (the solution, if found). Boxes are always
+        complete; rows and columns may repeat digits.
+    cost: number of repeated digits in the rows and columns of best_board.
+    restarts: number of restarts from a new random state.
+    moves: number of moves tried.
+    seconds: wall-clock time taken.
+    """
+    status: str
+    solution: Optional[Board] = None
+    best_board: Optional[Board] = None
+    cost: Optional[int] = None
+    restarts: int = 0
+    moves: int = 0
+    seconds: float = 0.0
+
+
+def local_search_solve(sudoku: Sudoku, max_seconds: float = 60.0, restart_after: int = 100,
+                       cooling: float = 0.99, seed: Optional[int] = None) -> LocalSearchResult:
+    """
+    Look for a solution of a (standard) Sudoku of any size with simulated annealing. If one
+    is found, it is saved as sudoku.solution.
+
+    :param max_seconds: Time limit for the whole search, including restarts.
+    :param restart_after: Number of chains without improvement after which the search
+        restarts from a new random state.
+    :param cooling: Factor applied to the temperature after every chain.
+    :param seed: Seed for the random moves, for reproducible runs.
+    """
+    assert type(sudoku) is Sudoku, 'Local search only applies to standard Sudoku'
+    assert max_seconds > 0, 'max_seconds must be > 0'
+    assert restart_after >= 1, 'restart_after must be >= 1'
+    assert 0 < cooling < 1, 'cooling must be in (0,1)'
+    start = time.perf_counter()
+    deadline = start + max_seconds
+    rng = random.Random(seed)
+
+    logic = LogicSolver(sudoku)
+    while not logic.is_contradiction and not logic.is_solved():
+        step = logic._find_naked_single() or logic._find_hidden_single()
+        if step is None:
+            break
+        logic._apply(step)
+    if logic.is_contradiction:
+        return LocalSearchResult(NO_SOLUTION, seconds=time.perf_counter() - start)
+    board = logic.get_board()
+    candidates = dict(((r,c), set(logic.get_candidates(r, c))) for (r,c) in Sudoku._get_empty_cells(board))
+    search = _AnnealingSearch(sudoku, board, candidates, rng)
+
+    result = LocalSearchResult(TIME_LIMIT)
+    while True:
+        search.restart()
+        if result.cost is None or search.cost < result.cost:
+            result.best_board, result.cost = search.get_board(), search.cost
+        temperature = search.initial_temperature()
+        run_best, chains_without_improvement = search.cost, 0
+        while search.cost > 0 and chains_without_improvement < restart_after \
+                and time.perf_counter() < deadline:
+            check_cancelled()
+            search.run_chain(temperature)
+            temperature *= cooling
+            if search.cost < run_best:
+                run_best, chains_without_improvement = search.cost, 0
+                if search.cost < result.cost:
+                    result.best_board, result.cost = search.get_board(), search.cost
+            else:
+                chains_without_improvement += 1
+        if search.cost == 0 or time.perf_counter() >= deadline:
+            break
+        result.restarts += 1
+
+    result.moves = search.moves
+    result.seconds = time.perf_counter() - start
+    if result.cost == 0:
+        checked = Sudoku(sudoku.minirows, sudoku.minicols, board=result.best_board)
+        if not (checked.validate() and checked.blank_count == 0):
+            raise RuntimeError('Local search returned an invalid board')
+        result.status, result.solution = COMPLETED, result.best_board
+        sudoku.is_solved = True
+        sudoku.solution = result.solution
+    return result
+
+
+class _AnnealingSearch:
+
+    # proportion of moves restricted to swapping digits into cells where they are candidates
+    CANDIDATE_MOVES = 0.9
+
+    def __init__(self, sudoku: Sudoku, board: Board, candidates: Dict[Cell, Set[int]],
+                 rng: random.Random):
+        """
+        :param board: The givens (and fixed cells) of the puzzle. Empty cells are EMPTY.
+        :param candidates: The candidates of every empty cell.
+        """
+        self.size = sudoku.size
+        self.givens = board
+        self.candidates = candidates
+        self.rng = rng
+        # free cells and missing digits of every box. Moves only involve boxes with at least
+        # two free cells.
+        self.box_cells: List[List[Cell]] = []
+        self.box_digits: List[List[int]] = []
+        self.num_free = 0
+        for box_r in range(0, self.size, sudoku.minirows):
+            for box_c in range(0, self.size, sudoku.minicols):
+                cells = [(r,c) for r in range(box_r, box_r + sudoku.minirows)
+                         for c in range(box_c, box_c + sudoku.minicols) if board[r][c] is EMPTY]
+                present = set(board[r][c] for r in range(box_r, box_r + sudoku.minirows)
+                              for c in range(box_c, box_c + sudoku.minicols)) - {EMPTY}
+                missing = [v for v in range(1, self.size + 1) if v not in present]
+                self.num_free += len(cells)
+                self.box_cells.append(cells)
+                self.box_digits.append(missing)
+        self.movable_boxes = [i for i in range(len(self.box_cells)) if len(self.box_cells[i]) >= 2]
+        self.moves = 0
+
+    def restart(self) -> None:
+        """
+        Fill the free cells of every box with its missing digits at random, giving each cell
+        (most constrained first) one of its candidates when one is left.
+        """
+        self.board = Sudoku._copy_board(self.givens)
+        for (cells, digits) in zip(self.box_cells, self.box_digits):
+            remaining = set(digits)
+            order = cells[:]
+            self.rng.shuffle(order)
+            order.sort(key=lambda cell: len(self.candidates[cell]))
+            for (r,c) in order:
+                options = sorted(remaining & self.candidates[(r,c)]) or sorted(remaining)
+                value = self.rng.choice(options)
+                remaining.remove(value)
+                self.board[r][c] = value
+        self.row_counts = [[0] * (self.size + 1) for _ in range(self.size)]
+        self.col_counts = [[0] * (self.size + 1) for _ in range(self.size)]
+        for r in range(self.size):
+            for c in range(self.size):
+                self.row_counts[r][self.board[r][c]] += 1
+                self.col_counts[c][self.board[r][c]] += 1
+        self.cost = sum(count - 1 for counts in self.row_counts + self.col_counts
+                        for count in counts if count > 1)
+
+    def get_board(self) -> Board:
+        return Sudoku._copy_board(self.board)
+
+    def initial_temperature(self) -> float:
+        """
+        Standard deviation of the cost change over a sample of random moves (which are undone).
+        """
+        if len(self.movable_boxes) == 0:
+            return 1.0
+        deltas = []
+        for _ in range(min(200, 10 * self.num_free)):
+            (cell1, cell2) = self._random_move()
+            delta = self._swap(cell1, cell2)
+            self._swap(cell1, cell2)
+            deltas.append(delta)
+        return max(statistics.pstdev(deltas), 1e-3)
+
+    def run_chain(self, temperature: float) -> None:
+        """
+        Try one move per free cell, accepting a move that raises the cost by delta with
+        probability exp(-delta / temperature). Stops early at cost 0.
+        """
+        if len(self.movable_boxes) == 0:
+            return
+        for _ in range(self.num_free):
+            (cell1, cell2) = self._random_move()
+            delta = self._swap(cell1, cell2)
+            self.moves += 1
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                self.cost += delta
+                if self.cost == 0:
+                    return
+            else:
+                self._swap(cell1, cell2)
+
+    def _random_move(self) -> Tuple[Cell, Cell]:
+        cells = self.box_cells[self.rng.choice(self.movable_boxes)]
+        (cell1, cell2) = self.rng.sample(cells, 2)
+        if self.rng.random() < self.CANDIDATE_MOVES:
+            (r1, c1) = cell1
+            v1, candidates1 = self.board[r1][c1], self.candidates[cell1]
+            partners = [(r,c) for (r,c) in cells if self.board[r][c] in candidates1
+                        and v1 in self.candidates[(r,c)] and (r,c) != cell1]
+            if len(partners) > 0:
+                cell2 = self.rng.choice(partners)
+        return (cell1, cell2)
+
+    def _swap(self, cell1: Cell, cell2: Cell) -> int:
+        """
+        Swap the digits of two cells of the same box, and return the change in cost.
+        """
+        (r1, c1), (r2, c2) = cell1, cell2
+        v1, v2 = self.board[r1][c1], self.board[r2][c2]
+        self.board[r1][c1], self.board[r2][c2] = v2, v1
+        delta = 0
+        if r1 != r2:
+            delta += _replace(self.row_counts[r1], v1, v2) + _replace(self.row_counts[r2], v2, v1)
+        if c1 != c2:
+            delta += _replace(self.col_counts[c1], v1, v2) + _replace(self.col_counts[c2], v2, v1)
+        return delta
+
+
+def _replace(counts: List[int], old: int, new: int) -> int:
+    """
+    Replace one `old` by `new` in a row or column with digit counts `counts`, and return the
+    change in its number of repeated digits.
+    """
+    counts[old] -= 1
+    counts[new] += 1
+    return (counts[new] > 1) - (counts[old] > 0)
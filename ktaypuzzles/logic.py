@@ -0,0 +1,455 @@
+import itertools
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .sudoku import Board, EMPTY, Sudoku
+
+"""
+Logic-only solving, the way a person would solve a Sudoku: no guessing, only deductions
+from a list of named techniques. Each step applies the easiest technique that makes
+progress, so the list of techniques used grades the difficulty of a puzzle, and single
+steps can be shown as hints.
+
+Candidates are kept as bitmasks (bit v-1 set if v is still possible). The techniques only
+rely on the units of the puzzle (groups of cells in which every number appears exactly
+once, see Sudoku._get_units()) and on what placing a number rules out elsewhere (see
+Sudoku._get_eliminations()), so they respect the extra rules of the variants: the
+diagonals of DiagonalSudoku, the king and knight moves of KingSudoku and KnightSudoku, and
+the neighbours of NonConsecSudoku that cannot hold consecutive numbers.
+"""
+Move = Tuple[int, int, int]  # (row, col, value)
+
+# techniques in increasing order of difficulty, which is also the order they are tried in
+TECHNIQUES = [
+    'Naked Single',
+    'Hidden Single',
+    'Neighbour Forcing',
+    'Pointing',
+    'Claiming',
+    'Naked Pair',
+    'Hidden Pair',
+    'Naked Triple',
+    'Hidden Triple',
+    'Naked Quad',
+    'Hidden Quad',
+    'X-Wing',
+    'XY-Wing',
+    'Swordfish',
+    'XY-Chain',
+]
+
+# longest chain (in cells) tried by the XY-Chain technique
+MAX_CHAIN_LENGTH = 12
+
+
+@dataclass
+class LogicStep:
+    """
+    One deduction: the technique used, the numbers it places and the candidates it removes
+    (as (row, col, value) triples).
+    """
+    technique: str
+    placements: List[Move] = field(default_factory=list)
+    eliminations: List[Move] = field(default_factory=list)
+
+
+@dataclass
+class LogicResult:
+    """
+    Outcome of LogicSolver.solve().
+
+    board: the board after every deduction (EMPTY where logic got stuck).
+    steps: the deductions made, in order.
+    is_solved: True if the board was completed.
+    is_contradiction: True if the puzzle turned out to have no solution.
+    """
+    board: Board
+    steps: List[LogicStep]
+    is_solved: bool
+    is_contradiction: bool
+
+    @property
+    def techniques(self) -> List[str]:
+        """
+        Technique used at each step, in order.
+        """
+        return [step.technique for step in self.steps]
+
+    @property
+    def hardest_technique(self) -> Optional[str]:
+        """
+        The most difficult technique needed, or None if no step was made.
+        """
+        if len(self.steps) == 0:
+            return None
+        return max(self.techniques, key=TECHNIQUES.index)
+
+
+def _bit(value: int) -> int:
+    return 1 << (value - 1)
+
+
+def _digits(mask: int) -> List[int]:
+    return [v + 1 for v in range(mask.bit_length()) if mask >> v & 1]
+
+
+def _count(mask: int) -> int:
+    return bin(mask).count('1')
+
+
+class LogicSolver:
+
+    def __init__(self, sudoku: Sudoku):
+        """
+        Set up the candidates of `sudoku` (any variant) from its current board.
+        """
+        self.sudoku = sudoku
+        self.size = sudoku.size
+        n = self.size
+        # cells are numbered r * size + c
+        self.values = [0] * (n * n)  # placed number, 0 if empty
+        self.candidates = [(1 << n) - 1] * (n * n)
+        self.units = [[r * n + c for (r,c) in unit] for unit in sudoku._get_units()]
+        self.boxes = set(i for i, unit in enumerate(self.units) if len(set(
+            (cell // n // sudoku.minirows, cell % n // sudoku.minicols) for cell in unit)) == 1)
+        self.peers = [set(r * n + c for (r,c) in sudoku._get_neighbors_for_cell(*divmod(cell, n)))
+                      for cell in range(n * n)]
+        self._masks: Dict[Tuple[int, int], Dict[int, int]] = {}
+        self.steps: List[LogicStep] = []
+        self.is_contradiction = not sudoku.is_valid_board
+        for r in range(n):
+            for c in range(n):
+                if sudoku.board[r][c] is not EMPTY:
+                    self._place(r * n + c, sudoku.board[r][c])
+        self._check()
+
+    def solve(self, max_steps: Optional[int] = None) -> LogicResult:
+        """
+        Apply deductions until the board is solved, no technique makes progress, or
+        `max_steps` steps have been made.
+        """
+        taken = 0
+        while max_steps is None or taken < max_steps:
+            if self.step() is None:
+                break
+            taken += 1
+        return self.get_result()
+
+    def step(self) -> Optional[LogicStep]:
+        """
+        Find the easiest deduction, apply it and return it. Returns None if the board is
+        solved, contradictory, or if no technique makes progress.
+        """
+        if self.is_contradiction or self.is_solved():
+            return None
+        for finder in self._get_finders():
+            step = finder()
+            if step is not None:
+                self._apply(step)
+                self.steps.append(step)
+                return step
+        return None
+
+    def get_result(self) -> LogicResult:
+        return LogicResult(self.get_board(), list(self.steps), self.is_solved(), self.is_contradiction)
+
+    def get_board(self) -> Board:
+        n = self.size
+        return [[self.values[r * n + c] or EMPTY for c in range(n)] for r in range(n)]
+
+    def get_candidates(self, r: int, c: int) -> List[int]:
+        return _digits(self.candidates[r * self.size + c])
+
+    def is_solved(self) -> bool:
+        return not self.is_contradiction and all(self.values)
+
+    def _get_finders(self) -> List[Callable[[], Optional[LogicStep]]]:
+        return [
+            self._find_naked_single,
+            self._find_hidden_single,
+            self._find_neighbour_forcing,
+            self._find_locked_candidates,
+            lambda: self._find_naked_subset(2),
+            lambda: self._find_hidden_subset(2),
+            lambda: self._find_naked_subset(3),
+            lambda: self._find_hidden_subset(3),
+            lambda: self._find_naked_subset(4),
+            lambda: self._find_hidden_subset(4),
+            lambda: self._find_fish(2),
+            self._find_xy_wing,
+            lambda: self._find_fish(3),
+            self._find_xy_chain,
+        ]
+
+    def _move(self, cell: int, value: int) -> Move:
+        (r,c) = divmod(cell, self.size)
+        return (r, c, value)
+
+    def _get_masks(self, cell: int, value: int) -> Dict[int, int]:
+        """
+        Return {other cell: mask of the numbers ruled out there} for placing `value` in `cell`.
+        """
+        key = (cell, value)
+        if key not in self._masks:
+            masks = {}
+            for (i, j, v) in self.sudoku._get_eliminations(*divmod(cell, self.size), value):
+                masks[i * self.size + j] = masks.get(i * self.size + j, 0) | _bit(v)
+            self._masks[key] = masks
+        return self._masks[key]
+
+    def _place(self, cell: int, value: int) -> None:
+        self.values[cell] = value
+        self.candidates[cell] = _bit(value)
+        for (other, mask) in self._get_masks(cell, value).items():
+            if self.values[other] == 0:
+                self.candidates[other] &= ~mask
+            elif _bit(self.values[other]) & mask:
+                self.is_contradiction = True
+
+    def _apply(self, step: LogicStep) -> None:
+        n = self.size
+        for (r, c, v) in step.eliminations:
+            self.candidates[r * n + c] &= ~_bit(v)
+        for (r, c, v) in step.placements:
+            self._place(r * n + c, v)
+        self._check()
+
+    def _check(self) -> None:
+        """
+        Flag a contradiction if an empty cell has no candidates, or a unit has no place left
+        for one of its numbers.
+        """
+        if any(self.candidates[cell] == 0 for cell in self._get_unsolved()):
+            self.is_contradiction = True
+        full = (1 << self.size) - 1
+        for unit in self.units:
+            covered = 0
+            for cell in unit:
+                covered |= self.candidates[cell]
+            if covered != full:
+                self.is_contradiction = True
+
+    def _get_unsolved(self) -> List[int]:
+        return [cell for cell in range(self.size * self.size) if self.values[cell] == 0]
+
+    def _get_positions(self, unit: List[int]) -> Dict[int, List[int]]:
+        """
+        Return {value: empty cells of the unit where value is a candidate} for the values
+        not yet placed in the unit.
+        """
+        placed = set(self.values[cell] for cell in unit)
+        return dict((v, [cell for cell in unit if self.values[cell] == 0 and self.candidates[cell] & _bit(v)])
+                    for v in range(1, self.size + 1) if v not in placed)
+
+    def _get_common_eliminations(self, alternatives: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        At least one of the placements (cell, value) in `alternatives` is true. Return the
+        candidates (cell, value) that every one of them rules out.
+        """
+        common = None
+        for (cell, value) in alternatives:
+            masks = self._get_masks(cell, value)
+            if common is None:
+                common = dict(masks)
+            else:
+                common = dict((other, common[other] & masks[other]) for other in common
+                              if other in masks and common[other] & masks[other])
+        return [(other, v) for (other, mask) in common.items() if self.values[other] == 0
+                for v in _digits(self.candidates[other] & mask)]
+
+    def _find_naked_single(self) -> Optional[LogicStep]:
+        for cell in self._get_unsolved():
+            if _count(self.candidates[cell]) == 1:
+                return LogicStep('Naked Single', placements=[self._move(cell, _digits(self.candidates[cell])[0])])
+        return None
+
+    def _find_hidden_single(self) -> Optional[LogicStep]:
+        for unit in self.units:
+            for (v, positions) in self._get_positions(unit).items():
+                if len(positions) == 1:
+                    return LogicStep('Hidden Single', placements=[self._move(positions[0], v)])
+        return None
+
+    def _find_neighbour_forcing(self) -> Optional[LogicStep]:
+        """
+        Every candidate of a cell (or every place left for a number in a unit) rules out the
+        same candidate of another cell. Only the variants with rules between different
+        numbers, like NonConsecSudoku, give such eliminations.
+        """
+        for cell in self._get_unsolved():
+            alternatives = [(cell, v) for v in _digits(self.candidates[cell])]
+            eliminations = self._get_common_eliminations(alternatives)
+            if len(eliminations) > 0:
+                return LogicStep('Neighbour Forcing', eliminations=[self._move(*e) for e in eliminations])
+        for unit in self.units:
+            for (v, positions) in self._get_positions(unit).items():
+                eliminations = [(other, w) for (other, w) in
+                                self._get_common_eliminations([(cell, v) for cell in positions]) if w != v]
+                if len(eliminations) > 0:
+                    return LogicStep('Neighbour Forcing', eliminations=[self._move(*e) for e in eliminations])
+        return None
+
+    def _find_locked_candidates(self) -> Optional[LogicStep]:
+        """
+        The places left for a number in a unit all see the same cells, which therefore cannot
+        hold the number. Called pointing when the unit is a box, claiming otherwise.
+        """
+        for (i, unit) in enumerate(self.units):
+            for (v, positions) in self._get_positions(unit).items():
+                if len(positions) < 2:
+                    continue
+                eliminations = [(other, w) for (other, w) in
+                                self._get_common_eliminations([(cell, v) for cell in positions]) if w == v]
+                if len(eliminations) > 0:
+                    return LogicStep('Pointing' if i in self.boxes else 'Claiming',
+                                     eliminations=[self._move(*e) for e in eliminations])
+        return None
+
+    def _find_naked_subset(self, k: int) -> Optional[LogicStep]:
+        """
+        k empty cells of a unit whose candidates together are k numbers: those numbers go in
+        those cells, so no other cell of the unit can hold them.
+        """
+        name = {2: 'Naked Pair', 3: 'Naked Triple', 4: 'Naked Quad'}[k]
+        for unit in self.units:
+            unsolved = [cell for cell in unit if self.values[cell] == 0]
+            small = [cell for cell in unsolved if _count(self.candidates[cell]) <= k]
+            for subset in itertools.combinations(small, k):
+                union = 0
+                for cell in subset:
+                    union |= self.candidates[cell]
+                if _count(union) != k:
+                    continue
+                eliminations = [self._move(cell, v) for cell in unsolved if cell not in subset
+                                for v in _digits(self.candidates[cell] & union)]
+                if len(eliminations) > 0:
+                    return LogicStep(name, eliminations=eliminations)
+        return None
+
+    def _find_hidden_subset(self, k: int) -> Optional[LogicStep]:
+        """
+        k numbers that can only go in the same k cells of a unit: those cells cannot hold any
+        other number.
+        """
+        name = {2: 'Hidden Pair', 3: 'Hidden Triple', 4: 'Hidden Quad'}[k]
+        for unit in self.units:
+            positions = self._get_positions(unit)
+            small = [v for v in positions if len(positions[v]) <= k]
+            for subset in itertools.combinations(small, k):
+                cells = set(cell for v in subset for cell in positions[v])
+                if len(cells) != k:
+                    continue
+                mask = sum(_bit(v) for v in subset)
+                eliminations = [self._move(cell, v) for cell in sorted(cells)
+                                for v in _digits(self.candidates[cell] & ~mask)]
+                if len(eliminations) > 0:
+                    return LogicStep(name, eliminations=eliminations)
+        return None
+
+    def _find_fish(self, k: int) -> Optional[LogicStep]:
+        """
+        X-Wing (k=2) and Swordfish (k=3): in k rows, a number can only go in the same k
+        columns, so it cannot go anywhere else in those columns (and the same with rows and
+        columns swapped).
+        """
+        name = {2: 'X-Wing', 3: 'Swordfish'}[k]
+        n = self.size
+        for v in range(1, n + 1):
+            for transpose in (False, True):
+                # cell (line, index) of the base lines; the cover lines are the indices
+                cell_of = (lambda line, index: index * n + line) if transpose else \
+                    (lambda line, index: line * n + index)
+                base = []
+                for line in range(n):
+                    cells = [cell_of(line, index) for index in range(n)]
+                    if any(self.values[cell] == v for cell in cells):
+                        continue
+                    indices = frozenset(index for index in range(n) if self.values[cell_of(line, index)] == 0
+                                        and self.candidates[cell_of(line, index)] & _bit(v))
+                    if 2 <= len(indices) <= k:
+                        base.append((line, indices))
+                for subset in itertools.combinations(base, k):
+                    cover = frozenset().union(*[indices for (_, indices) in subset])
+                    if len(cover) != k:
+                        continue
+                    lines = set(line for (line, _) in subset)
+                    eliminations = [self._move(cell_of(line, index), v) for index in sorted(cover)
+                                    for line in range(n) if line not in lines
+                                    and self.values[cell_of(line, index)] == 0
+                                    and self.candidates[cell_of(line, index)] & _bit(v)]
+                    if len(eliminations) > 0:
+                        return LogicStep(name, eliminations=eliminations)
+        return None
+
+    def _get_bivalue_cells(self) -> List[int]:
+        return [cell for cell in self._get_unsolved() if _count(self.candidates[cell]) == 2]
+
+    def _find_xy_wing(self) -> Optional[LogicStep]:
+        """
+        A pivot cell {a,b} sees two wing cells {a,c} and {b,c}. Whichever of a and b the pivot
+        takes, one of the wings is c, so cells that see both wings cannot be c.
+        """
+        bivalue = self._get_bivalue_cells()
+        for pivot in bivalue:
+            (a, b) = _digits(self.candidates[pivot])
+            wings = [cell for cell in bivalue if cell in self.peers[pivot]]
+            for wing_a in wings:
+                if not self.candidates[wing_a] & _bit(a) or self.candidates[wing_a] & _bit(b):
+                    continue
+                c = _digits(self.candidates[wing_a] & ~_bit(a))[0]
+                for wing_b in wings:
+                    if self.candidates[wing_b] != _bit(b) | _bit(c):
+                        continue
+                    eliminations = self._get_common_eliminations([(wing_a, c), (wing_b, c)])
+                    if len(eliminations) > 0:
+                        return LogicStep('XY-Wing', eliminations=[self._move(*e) for e in eliminations])
+        return None
+
+    def _find_xy_chain(self) -> Optional[LogicStep]:
+        """
+        A chain of cells with two candidates each, consecutive cells seeing each other and
+        sharing a candidate. If the first cell is not a, the next cell is forced, and so on
+        until the last cell, which is then a. So one of the two end cells is a, and cells
+        that see both cannot be a.
+        """
+        bivalue = self._get_bivalue_cells()
+        links = dict((cell, [other for other in bivalue if other in self.peers[cell]]) for cell in bivalue)
+        for start in bivalue:
+            for a in _digits(self.candidates[start]):
+                # breadth-first over (cell, number forced in cell if start is not a), so the
+                # shortest chains are tried first and no state is expanded twice
+                frontier = [(start, self.candidates[start] & ~_bit(a))]
+                seen = set(frontier)
+                for length in range(2, MAX_CHAIN_LENGTH + 1):
+                    next_frontier = []
+                    for (cell, on) in frontier:
+                        for other in links[cell]:
+                            if other == start or not self.candidates[other] & on:
+                                continue
+                            state = (other, self.candidates[other] & ~on)
+                            if state in seen:
+                                continue
+                            seen.add(state)
+                            next_frontier.append(state)
+                            if state[1] == _bit(a) and length >= 3:
+                                eliminations = self._get_common_eliminations([(start, a), (other, a)])
+                                if len(eliminations) > 0:
+                                    return LogicStep('XY-Chain',
+                                                     eliminations=[self._move(*e) for e in eliminations])
+                    frontier = next_frontier
+        return None
+
+
+def logic_solve(sudoku: Sudoku, max_steps: Optional[int] = None) -> LogicResult:
+    """
+    Solve `sudoku` (any variant) as far as possible by logic alone. See LogicSolver.
+    """
+    return LogicSolver(sudoku).solve(max_steps)
+
+
+def next_step(sudoku: Sudoku) -> Optional[LogicStep]:
+    """
+    Return the easiest deduction on the current board of `sudoku`, or None if there is
+    none. Useful as a step-by-step hint.
+    """
+    return LogicSolver(sudoku).step()
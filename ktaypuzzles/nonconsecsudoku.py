@@ -47,13 +47,17 @@ class NonConsecSudoku(Sudoku):
         self.solution = solution_board[0] if self.is_solved else None
         return solution_board
 
+    @override
+    def _get_solver(self) -> '_NonConsecSudokuSolver':
+        return _NonConsecSudokuSolver(self)
+
     @override
     def generate_puzzle_board(self, blank_proportion: float = 0.5) -> Board:
         """
         Generate a new random sudoku puzzle and save in self.board. We do so in the following way:
         1. Generate a complete board with _generate_complete_board().
         2. Randomly remove `blank_proportion` of the cells.
-        3. Use backtracking_solve() to check if the solution is unique. If not, keeping adding
+        3. Use count_solutions(limit=2) to check if the solution is unique. If not, keeping adding
            cells back until the solution is unique.
         """
         assert blank_proportion > 0 and blank_proportion < 1, 'blank_proportion must be in (0,1)'
@@ -66,13 +70,9 @@ class NonConsecSudoku(Sudoku):
         for (r,c) in cells_to_remove:
             puzzle_board[r][c] = EMPTY
 
-        # get solutions for this board, then keeping adding cells until solution is unique
-        sudoku_solver = _NonConsecSudokuSolver(NonConsecSudoku(self.minirows, self.minicols, puzzle_board))
-        solution_list = sudoku_solver.backtracking_solve()
-        while len(solution_list) > 1:
-            r,c = cells_to_remove.pop()
-            puzzle_board[r][c] = complete_board[r][c]
-            solution_list = [board for board in solution_list if board[r][c] == complete_board[r][c]]
+        # add cells back (last removed first) until the solution is unique
+        self._add_back_until_unique(puzzle_board, complete_board, cells_to_remove,
+                                    lambda board: NonConsecSudoku(self.minirows, self.minicols, board))
 
         self.board = puzzle_board
         self.is_valid_board = True
@@ -85,8 +85,8 @@ class NonConsecSudoku(Sudoku):
         """
         Generate a random complete sudoku board.
         We do so by randomly filling every cell one-by-one, with backtracking to ensure validity.
-        NOTE: Right now this is pretty slow as backtracking takes a long time to find a valid
-        non-consecutive board. TODO Find a better strategy for generating such a board.
+        NOTE: Arc consistency (see _propagate()) prunes most dead ends early, but a 9x9 board
+        still takes a few seconds. TODO Find a better strategy for generating such a board.
         """
         board = [[EMPTY] * self.size for _ in range(self.size)]
 
@@ -117,11 +117,29 @@ class NonConsecSudoku(Sudoku):
         """
         # get candidates based on basic sudoku
         candidates = super()._get_candidates_for_cell(r, c, board)
-        orthogonal_values = [board[i][j] for (i,j) in self._get_orthogonal_neighbors(r,c) \
-                                 if board[i][j] in list(range(1, self.size+1))]
+        for (i,j) in self._get_orthogonal_neighbors(r,c):
+            if board[i][j]:  # skip EMPTY (or 0)
+                candidates -= {board[i][j]-1, board[i][j], board[i][j]+1}
+
+        return candidates
+
+    @override
+    def _get_eliminations(self, r: int, c: int, value: int) -> List[Tuple[int, int, int]]:
+        """
+        Placing `value` at (r,c) also rules out value-1 and value+1 in orthogonal neighbors.
+        """
+        eliminations = super()._get_eliminations(r, c, value)
+        for (i,j) in self._get_orthogonal_neighbors(r, c):
+            eliminations.extend([(i, j, v) for v in (value-1, value+1) if 1 <= v <= self.size])
+        return eliminations
 
-        return candidates - set(orthogonal_values) - set([x-1 for x in orthogonal_values]) \
-            - set([x+1 for x in orthogonal_values])
+    @override
+    def _propagate(self, candidates_dict: Dict[Tuple[int, int], Set[int]], cells: List[Tuple[int, int]],
+                   original_candidates_dict: Dict[Tuple[int, int], Set[int]]) -> bool:
+        """
+        Prune candidates with arc consistency on the non-consecutive constraint.
+        """
+        return self._arc_consistency(candidates_dict, cells, original_candidates_dict)
 
     @override
     def __str__(self) -> str:
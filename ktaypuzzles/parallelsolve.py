@@ -0,0 +1,158 @@
+import copy
+import multiprocessing as mp
+from typing import Iterator, List, Optional, Tuple
+
+from .sudoku import Board, EMPTY, Sudoku
+
+"""
+Parallel backtracking for a single hard Sudoku (or variant) puzzle.
+
+The top levels of the search tree are expanded in this process, until there are about
+`split_factor` subproblems per worker. Each node is expanded with the same candidates and
+constraint propagation as _SudokuSolver (_get_candidates_for_cell(), then _propagate() and
+_assign() of the variant): the empty cell with the fewest candidates is filled with each of
+them, and children that propagation proves to be dead ends are dropped. Ties are broken by
+position and values are tried in increasing order, so the split is deterministic, but the
+cells and the order of the children may differ from those of _SudokuSolver. Each
+subproblem is a partial board, and is solved independently by a worker of a process pool.
+
+Workers pull the next subproblem from the pool's shared task queue as soon as they are
+idle, so a worker that finishes an easy subtree immediately takes over work that would
+otherwise wait for a busy one. Over-splitting (split_factor) is what keeps this balanced
+when subtrees differ a lot in size.
+"""
+
+def split_search(sudoku: Sudoku, num_subproblems: int, max_depth: Optional[int] = None) -> List[Board]:
+    """
+    Expand the top of the backtracking search tree of `sudoku` level by level until there
+    are at least `num_subproblems` open nodes (or `max_depth` levels have been expanded, or
+    every node is closed). Returns the partial boards of the open nodes, in the order in
+    which a depth-first search of this expansion (see _expand()) would reach them, which is
+    not necessarily the order of _SudokuSolver. Complete boards (solutions found while
+    expanding) are included; dead ends are dropped.
+    """
+    if not sudoku.is_valid_board:
+        return []
+    frontier = [Sudoku._copy_board(sudoku.board)]
+    depth = 0
+    while len(frontier) < num_subproblems and (max_depth is None or depth < max_depth):
+        next_frontier = []
+        expanded = False
+        for board in frontier:
+            children = _expand(sudoku, board)
+            if children is None:
+                # complete board: keep as is
+                next_frontier.append(board)
+            else:
+                next_frontier.extend(children)
+                expanded = True
+        frontier = next_frontier
+        depth += 1
+        if not expanded:
+            break
+    return frontier
+
+
+def _expand(sudoku: Sudoku, board: Board) -> Optional[List[Board]]:
+    """
+    Return the children of a search node, or None if the board is complete. The candidates
+    of the empty cells are computed from the board and narrowed by _propagate(); the cell
+    with the fewest candidates (the first in row-major order on ties) is then filled with
+    each candidate in increasing order through _assign(). Children that _assign() rejects,
+    and every child of a node that propagation proves to be a dead end, are dropped.
+    """
+    node = _subproblem(sudoku, board)
+    candidates_dict = {}
+    for (r,c) in Sudoku._get_empty_cells(board):
+        candidates_dict[(r,c)] = node._get_candidates_for_cell(r, c, board)
+    if len(candidates_dict) == 0:
+        return None
+    if not node._propagate(candidates_dict, list(candidates_dict.keys()), {}) or \
+            min(len(v) for v in candidates_dict.values()) == 0:
+        return []
+    cell = min(candidates_dict, key=lambda k: (len(candidates_dict[k]), k))
+    (r,c) = cell
+    children = []
+    for candidate in sorted(candidates_dict[cell]):
+        child_candidates = dict(candidates_dict)
+        del child_candidates[cell]
+        child = Sudoku._copy_board(board)
+        child[r][c] = candidate
+        node.board = child
+        if node._assign(child_candidates, cell, candidate, {}):
+            children.append(child)
+    return children
+
+
+def _subproblem(sudoku: Sudoku, board: Board) -> Sudoku:
+    sub = copy.copy(sudoku)
+    sub.board = board
+    sub.is_valid_board = True
+    sub.blank_count = sum(cell is EMPTY for row in board for cell in row)
+    return sub
+
+
+def _iter_subproblem(job: Tuple[Sudoku, Board]) -> Iterator[Board]:
+    sudoku, board = job
+    return _subproblem(sudoku, board)._get_solver().iter_solutions()
+
+
+def _all_solutions(job: Tuple[Sudoku, Board]) -> List[Board]:
+    return list(_iter_subproblem(job))
+
+
+def _first_solution(job: Tuple[Sudoku, Board]) -> Optional[Board]:
+    return next(_iter_subproblem(job), None)
+
+
+def _count_solutions(job: Tuple[Sudoku, Board]) -> int:
+    return sum(1 for _ in _iter_subproblem(job))
+
+
+def _jobs(sudoku: Sudoku, processes: Optional[int], split_factor: int) -> Tuple[int, List[Tuple[Sudoku, Board]]]:
+    processes = processes if processes else mp.cpu_count()
+    assert processes >= 1, 'processes must be >= 1'
+    assert split_factor >= 1, 'split_factor must be >= 1'
+    boards = split_search(sudoku, processes * split_factor)
+    return processes, [(sudoku, board) for board in boards]
+
+
+def parallel_solve(sudoku: Sudoku, processes: Optional[int] = None, split_factor: int = 8) -> List[Board]:
+    """
+    Return all solutions of `sudoku` (the same set as backtracking_solve()), searching
+    subtrees in parallel over `processes` worker processes (default: number of CPUs).
+    """
+    processes, jobs = _jobs(sudoku, processes, split_factor)
+    if len(jobs) == 0:
+        return []
+    with mp.Pool(min(processes, len(jobs))) as pool:
+        return [solution for solutions in pool.imap(_all_solutions, jobs) for solution in solutions]
+
+
+def parallel_count(sudoku: Sudoku, processes: Optional[int] = None, split_factor: int = 8) -> int:
+    """
+    Return the number of solutions of `sudoku`, counting subtrees in parallel. Solutions are
+    never sent between processes.
+    """
+    processes, jobs = _jobs(sudoku, processes, split_factor)
+    if len(jobs) == 0:
+        return 0
+    with mp.Pool(min(processes, len(jobs))) as pool:
+        return sum(pool.imap_unordered(_count_solutions, jobs))
+
+
+def parallel_find_first(sudoku: Sudoku, processes: Optional[int] = None,
+                        split_factor: int = 8) -> Optional[Board]:
+    """
+    Return a solution of `sudoku` (whichever worker finds one first), or None if there is
+    none. As soon as a solution is found the remaining workers are terminated.
+    """
+    processes, jobs = _jobs(sudoku, processes, split_factor)
+    if len(jobs) == 0:
+        return None
+    with mp.Pool(min(processes, len(jobs))) as pool:
+        for solution in pool.imap_unordered(_first_solution, jobs):
+            if solution is not None:
+                # leaving the with block terminates the other workers
+                return solution
+    return None
@@ -0,0 +1,356 @@
+import json
+import random
+import sqlite3
+import threading
+from itertools import islice
+from typing import Dict, List, Optional, Tuple, Type, Union
+
+from .diagonalsudoku import DiagonalSudoku
+from .kingsudoku import KingSudoku
+from .knightsudoku import KnightSudoku
+from .logic import TECHNIQUES, logic_solve
+from .nonconsecsudoku import NonConsecSudoku
+from .search import SearchCancelled, cancel_scope
+from .sudoku import Board, EMPTY, Sudoku
+
+"""
+A bank of pre-generated Sudoku puzzles (with their solutions) in a local sqlite file.
+
+Generating a puzzle with a unique solution can take from milliseconds to minutes depending
+on the variant and blank proportion, so puzzles are generated ahead of time, either in bulk
+with fill() or by a background thread started with start_refill(), and served from the bank.
+
+Puzzles are grouped into buckets by variant, shape (minirows x minicols), number of clues
+and difficulty. Within a bucket, puzzles are numbered by a dense slot 0..count-1 (slots
+are renumbered when a puzzle is taken out), so a random puzzle is fetched with a single
+index lookup on a random slot instead of a scan or ORDER BY RANDOM().
+"""
+VARIANTS: Dict[str, Type[Sudoku]] = {
+    'sudoku': Sudoku,
+    'diagonal': DiagonalSudoku,
+    'king': KingSudoku,
+    'knight': KnightSudoku,
+    'nonconsec': NonConsecSudoku,
+}
+
+# difficulty grades, from easiest to hardest
+DIFFICULTIES = ['easy', 'medium', 'hard', 'expert']
+
+# (variant, minirows, minicols, difficulty); difficulty None means any
+RefillTarget = Tuple[str, int, int, Optional[str]]
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS puzzles (
+    variant TEXT NOT NULL,
+    minirows INTEGER NOT NULL,
+    minicols INTEGER NOT NULL,
+    clues INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    board TEXT NOT NULL,
+    solution TEXT NOT NULL,
+    PRIMARY KEY (variant, minirows, minicols, clues, difficulty, slot)
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    variant TEXT NOT NULL,
+    minirows INTEGER NOT NULL,
+    minicols INTEGER NOT NULL,
+    clues INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (variant, minirows, minicols, clues, difficulty)
+);
+'''
+
+
+def get_variant_name(sudoku: Sudoku) -> str:
+    for (name, cls) in VARIANTS.items():
+        if type(sudoku) is cls:
+            return name
+    raise ValueError('Unsupported puzzle type {}'.format(type(sudoku).__name__))
+
+
+def make_puzzle(variant: str, minirows: int, minicols: Optional[int] = None,
+                board: Optional[Board] = None) -> Sudoku:
+    """
+    Create a puzzle of the given variant name (a key of VARIANTS).
+    """
+    assert variant in VARIANTS, 'variant must be one of {}'.format(', '.join(VARIANTS))
+    if variant == 'diagonal':
+        assert minicols is None or minicols == minirows, 'diagonal sudoku must have square boxes'
+        return DiagonalSudoku(minirows, board=board)
+    return VARIANTS[variant](minirows, minicols, board=board)
+
+
+def grade_difficulty(sudoku: Sudoku) -> str:
+    """
+    Grade a puzzle by the hardest technique logic_solve() needs: 'easy' for singles only,
+    'medium' up to subsets, 'hard' for fish, wings and chains, and 'expert' if logic alone
+    does not solve it.
+    """
+    result = logic_solve(sudoku)
+    if not result.is_solved:
+        return 'expert'
+    hardest = result.hardest_technique
+    if hardest is None or hardest in ('Naked Single', 'Hidden Single'):
+        return 'easy'
+    if TECHNIQUES.index(hardest) <= TECHNIQUES.index('Hidden Quad'):
+        return 'medium'
+    return 'hard'
+
+
+def _encode_board(board: Board) -> str:
+    return json.dumps([[cell if cell is not EMPTY else 0 for cell in row] for row in board])
+
+
+def _decode_board(text: str) -> Board:
+    return [[cell if cell != 0 else EMPTY for cell in row] for row in json.loads(text)]
+
+
+class PuzzleBank:
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a puzzle bank stored in the sqlite file at `path`. The bank can be
+        used from several threads.
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+        self._refill_thread: Optional[threading.Thread] = None
+        self._refill_stop = threading.Event()
+        # refill targets given up on, see start_refill()
+        self.unreachable_targets: List[RefillTarget] = []
+        self.refill_error: Optional[Exception] = None  # the error that stopped the refill thread
+
+    def add(self, sudoku: Sudoku, difficulty: Optional[str] = None) -> None:
+        """
+        Add a puzzle to the bank with its solution. The puzzle is always solved (stopping at
+        the second solution) to check that its solution is unique, even if its `solution` is
+        already set. If difficulty is not given, it is graded with grade_difficulty().
+
+        :raises ValueError: If the puzzle does not have exactly one solution, or if its
+        `solution` is set to something else.
+        """
+        self.add_many([sudoku], [difficulty])
+
+    def add_many(self, sudokus: List[Sudoku], difficulties: Optional[List[Optional[str]]] = None) -> None:
+        """
+        Add many puzzles in a single transaction. See add().
+        """
+        rows = []
+        for (i, sudoku) in enumerate(sudokus):
+            solutions = list(islice(sudoku._get_solver().iter_solutions(), 2))
+            if len(solutions) != 1:
+                raise ValueError('Puzzle must have a unique solution, it has {}'.format(
+                    'none' if len(solutions) == 0 else 'several'))
+            if sudoku.solution is not None and sudoku.solution != solutions[0]:
+                raise ValueError('Puzzle solution does not solve the puzzle')
+            difficulty = difficulties[i] if difficulties is not None else None
+            if difficulty is None:
+                difficulty = grade_difficulty(sudoku)
+            assert difficulty in DIFFICULTIES, 'difficulty must be one of {}'.format(', '.join(DIFFICULTIES))
+            clues = sudoku.size * sudoku.size - len(Sudoku._get_empty_cells(sudoku.board))
+            rows.append(((get_variant_name(sudoku), sudoku.minirows, sudoku.minicols, clues, difficulty),
+                         _encode_board(sudoku.board), _encode_board(solutions[0])))
+
+        with self._lock, self._connection:
+            for (bucket, board, solution) in rows:
+                slot = self._get_bucket_count(bucket)
+                self._connection.execute(
+                    'INSERT INTO puzzles VALUES (?, ?, ?, ?, ?, ?, ?, ?)', bucket + (slot, board, solution))
+                self._set_bucket_count(bucket, slot + 1)
+
+    def fill(self, variant: str, minirows: int, minicols: Optional[int] = None, count: int = 1,
+             blank_proportion: Optional[float] = None) -> None:
+        """
+        Generate `count` puzzles with generate_puzzle_board() and add them in one transaction.
+        If blank_proportion is not given, the default of the variant is used.
+        """
+        self.add_many([self._generate(variant, minirows, minicols, blank_proportion) for _ in range(count)])
+
+    @staticmethod
+    def _generate(variant: str, minirows: int, minicols: Optional[int],
+                  blank_proportion: Optional[float]) -> Sudoku:
+        sudoku = make_puzzle(variant, minirows, minicols)
+        if blank_proportion is None:
+            sudoku.generate_puzzle_board()
+        else:
+            sudoku.generate_puzzle_board(blank_proportion)
+        return sudoku
+
+    def get_random(self, variant: str, minirows: int, minicols: Optional[int] = None,
+                   clues: Optional[Union[int, Tuple[int, int]]] = None, difficulty: Optional[str] = None,
+                   remove: bool = False) -> Optional[Sudoku]:
+        """
+        Return a random puzzle of the given variant and shape, with its `solution` set, or
+        None if the bank has no matching puzzle.
+
+        :param clues: Exact number of clues, or a (min, max) range.
+        :param difficulty: One of DIFFICULTIES, or None for any.
+        :param remove: Take the puzzle out of the bank, so it is not served again.
+        """
+        minicols = minicols if minicols else minirows
+        with self._lock, self._connection:
+            buckets = self._get_buckets(variant, minirows, minicols, clues, difficulty)
+            if len(buckets) == 0:
+                return None
+            # choose a bucket with probability proportional to its size, then a slot
+            bucket, count = random.choices(buckets, weights=[count for (_, count) in buckets])[0]
+            slot = random.randrange(count)
+            (board, solution) = self._connection.execute(
+                'SELECT board, solution FROM puzzles WHERE variant = ? AND minirows = ? AND minicols = ? '
+                'AND clues = ? AND difficulty = ? AND slot = ?', bucket + (slot,)).fetchone()
+            if remove:
+                self._remove(bucket, slot, count)
+
+        sudoku = make_puzzle(variant, minirows, minicols, _decode_board(board))
+        sudoku.solution = _decode_board(solution)
+        sudoku.is_solved = True
+        return sudoku
+
+    def count(self, variant: Optional[str] = None, minirows: Optional[int] = None,
+              minicols: Optional[int] = None, clues: Optional[Union[int, Tuple[int, int]]] = None,
+              difficulty: Optional[str] = None) -> int:
+        """
+        Number of puzzles in the bank matching the given filters (None matches anything).
+        """
+        if minirows is not None and minicols is None:
+            minicols = minirows
+        with self._lock:
+            return sum(count for (_, count) in self._get_buckets(variant, minirows, minicols, clues, difficulty))
+
+    def get_buckets(self) -> List[Tuple[Tuple[str, int, int, int, str], int]]:
+        """
+        Return every non-empty bucket as ((variant, minirows, minicols, clues, difficulty), count).
+        """
+        with self._lock:
+            return self._get_buckets(None, None, None, None, None)
+
+    def _get_buckets(self, variant, minirows, minicols, clues, difficulty):
+        conditions, params = ['count > 0'], []
+        for (column, value) in [('variant', variant), ('minirows', minirows), ('minicols', minicols),
+                                ('difficulty', difficulty)]:
+            if value is not None:
+                conditions.append('{} = ?'.format(column))
+                params.append(value)
+        if isinstance(clues, tuple):
+            conditions.append('clues BETWEEN ? AND ?')
+            params.extend(clues)
+        elif clues is not None:
+            conditions.append('clues = ?')
+            params.append(clues)
+        rows = self._connection.execute(
+            'SELECT variant, minirows, minicols, clues, difficulty, count FROM buckets WHERE ' +
+            ' AND '.join(conditions) + ' ORDER BY variant, minirows, minicols, clues, difficulty', params)
+        return [(tuple(row[:5]), row[5]) for row in rows]
+
+    def _get_bucket_count(self, bucket) -> int:
+        row = self._connection.execute(
+            'SELECT count FROM buckets WHERE variant = ? AND minirows = ? AND minicols = ? AND clues = ? '
+            'AND difficulty = ?', bucket).fetchone()
+        return row[0] if row is not None else 0
+
+    def _set_bucket_count(self, bucket, count: int) -> None:
+        self._connection.execute('INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?, ?)', bucket + (count,))
+
+    def _remove(self, bucket, slot: int, count: int) -> None:
+        """
+        Delete the puzzle in `slot` and move the puzzle in the last slot into it, so that slots
+        stay dense.
+        """
+        where = 'variant = ? AND minirows = ? AND minicols = ? AND clues = ? AND difficulty = ?'
+        self._connection.execute('DELETE FROM puzzles WHERE {} AND slot = ?'.format(where), bucket + (slot,))
+        if slot != count - 1:
+            self._connection.execute('UPDATE puzzles SET slot = ? WHERE {} AND slot = ?'.format(where),
+                                     (slot,) + bucket + (count - 1,))
+        self._set_bucket_count(bucket, count - 1)
+
+    def start_refill(self, targets: Dict[RefillTarget, int], blank_proportion: Optional[float] = None,
+                     interval: float = 1.0, max_attempts: int = 50) -> None:
+        """
+        Start a background thread that keeps the bank stocked: for each target
+        (variant, minirows, minicols, difficulty) it generates puzzles until the bank holds at
+        least the given number of matching puzzles (difficulty None counts every difficulty),
+        then checks again every `interval` seconds. Puzzles generated for a difficulty target
+        that turn out to have another difficulty are kept in their own bucket.
+
+        :param max_attempts: Give up on a difficulty target after this many puzzles in a row of
+        other difficulties (e.g. 'hard' 4x4 sudokus, which generate_puzzle_board() practically
+        never makes), so that the bank does not fill up with them. Targets given up on are
+        listed in self.unreachable_targets.
+
+        If generating or storing a puzzle fails, the thread stops and the exception is kept
+        in self.refill_error (see also is_refilling).
+        """
+        assert self._refill_thread is None, 'refill is already running'
+        assert max_attempts >= 1, 'max_attempts must be >= 1'
+        self._refill_stop.clear()
+        self.refill_error = None
+        self._refill_thread = threading.Thread(target=self._refill,
+                                               args=(targets, blank_proportion, interval, max_attempts),
+                                               name='ktaypuzzles-refill', daemon=True)
+        self._refill_thread.start()
+
+    def stop_refill(self) -> None:
+        """
+        Stop the refill thread, interrupting the puzzle it is generating, and wait for it.
+        """
+        if self._refill_thread is None:
+            return
+        self._refill_stop.set()
+        self._refill_thread.join()
+        self._refill_thread = None
+
+    @property
+    def is_refilling(self) -> bool:
+        """
+        True while the refill thread is running, False if it was never started, was stopped or
+        died (then refill_error says why).
+        """
+        return self._refill_thread is not None and self._refill_thread.is_alive()
+
+    def _refill(self, targets: Dict[RefillTarget, int], blank_proportion: Optional[float],
+                interval: float, max_attempts: int) -> None:
+        try:
+            self._keep_stocked(targets, blank_proportion, interval, max_attempts)
+        except Exception as e:
+            self.refill_error = e
+
+    def _keep_stocked(self, targets: Dict[RefillTarget, int], blank_proportion: Optional[float],
+                      interval: float, max_attempts: int) -> None:
+        misses = {target: 0 for target in targets}  # off-target puzzles in a row, per target
+        with cancel_scope(self._refill_stop):
+            while not self._refill_stop.is_set():
+                missing = [target for (target, count) in targets.items()
+                           if target not in self.unreachable_targets
+                           and self.count(target[0], target[1], target[2], difficulty=target[3]) < count]
+                if len(missing) == 0:
+                    self._refill_stop.wait(interval)
+                    continue
+                for target in missing:
+                    (variant, minirows, minicols, difficulty) = target
+                    try:
+                        sudoku = self._generate(variant, minirows, minicols, blank_proportion)
+                        graded = grade_difficulty(sudoku)
+                        self.add(sudoku, graded)
+                    except SearchCancelled:
+                        return
+                    if difficulty is None or graded == difficulty:
+                        misses[target] = 0
+                        continue
+                    misses[target] += 1
+                    if misses[target] >= max_attempts:
+                        self.unreachable_targets.append(target)
+
+    def close(self) -> None:
+        self.stop_refill()
+        self._connection.close()
+
+    def __enter__(self) -> 'PuzzleBank':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,22 +1,37 @@
-from dataclasses import dataclass
-
-@dataclass
 class Rect:
     """
     Rectangle is defined by first and last row index of the rectangle (r1, r2)
     and first and last column index of the rectangle (c1, c2).
     In this implementation, think of each (r,c) index as representing a
     box rather than a point.
+
+    Rects are immutable and hashable, and use __slots__ to stay small, since solvers
+    create one for every candidate rectangle.
     """
-    r1: int
-    r2: int
-    c1: int
-    c2: int
-
-    def __post_init__(self):
-        assert self.r1 <= self.r2, 'r1 ({}) must be <= r2 ({})'.format(self.r1, self.r2)
-        assert self.c1 <= self.c2, 'c1 ({}) must be <= c2 ({})'.format(self.c1, self.c2)
-    
+    __slots__ = ('r1', 'r2', 'c1', 'c2')
+
+    def __init__(self, r1: int, r2: int, c1: int, c2: int):
+        assert r1 <= r2, 'r1 ({}) must be <= r2 ({})'.format(r1, r2)
+        assert c1 <= c2, 'c1 ({}) must be <= c2 ({})'.format(c1, c2)
+        object.__setattr__(self, 'r1', r1)
+        object.__setattr__(self, 'r2', r2)
+        object.__setattr__(self, 'c1', c1)
+        object.__setattr__(self, 'c2', c2)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Rect is immutable')
+
+    def __eq__(self, other):
+        if not isinstance(other, Rect):
+            return NotImplemented
+        return (self.r1, self.r2, self.c1, self.c2) == (other.r1, other.r2, other.c1, other.c2)
+
+    def __hash__(self):
+        return hash((self.r1, self.r2, self.c1, self.c2))
+
+    def __reduce__(self):
+        return (Rect, (self.r1, self.r2, self.c1, self.c2))
+
     def __repr__(self):
         return 'Rect({}, {}, {}, {})'.format(self.r1, self.r2, self.c1, self.c2)
 
@@ -24,9 +39,21 @@ class Rect:
         # check if one rectangle is above the other
         if self.r2 < other.r1 or other.r2 < self.r1:
             return False
-        
+
         # check if one rectangle is to the left of the other
         if self.c2 < other.c1 or other.c2 < self.c1:
             return False
-        
+
         return True
+
+    def get_mask(self, cols: int) -> int:
+        """
+        Return the cells covered by the rectangle on a board with `cols` columns, as a
+        bitmask where cell (r,c) is bit r * cols + c. Two rectangles on the same board
+        overlap if and only if their masks have a bit in common.
+        """
+        row_mask = ((1 << (self.c2 - self.c1 + 1)) - 1) << self.c1
+        mask = 0
+        for r in range(self.r1, self.r2 + 1):
+            mask |= row_mask << (r * cols)
+        return mask
@@ -0,0 +1,109 @@
+import io
+import multiprocessing as mp
+import os
+from typing import Iterable, List, Optional, Tuple, Union
+
+from .shikaku import Shikaku
+from .sudoku import Sudoku
+
+"""
+Headless batch rendering of puzzle images.
+
+The show_as_image() methods go through pyplot, which needs a display backend and creates
+a new figure for every call. BoardRenderer instead draws on a single Agg figure that is
+cleared and reused between boards, so it works without a display and does not accumulate
+figures. render_many() fans a batch of puzzles out over a process pool, with one
+BoardRenderer per worker.
+"""
+Puzzle = Union[Sudoku, Shikaku]
+
+
+class BoardRenderer:
+
+    def __init__(self, figsize: Tuple[float, float] = (6, 6), dpi: int = 100):
+        """
+        Initializes a renderer that owns one reusable figure.
+
+        :param figsize: Size of the image in inches.
+        :param dpi: Resolution of the image.
+        """
+        # import here rather than at module level: matplotlib is slow to import
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+
+    def render(self, puzzle: Puzzle, solution: bool = False, title: str = '',
+               save_path: str = '') -> bytes:
+        """
+        Render a puzzle to PNG. If `solution` is True, the solution is drawn instead of the
+        original board (solved digits in red for Sudoku, rectangles for Shikaku). The PNG is
+        returned as bytes, and also written to save_path if one is given.
+
+        :raises ValueError: If `solution` is True but the puzzle has no solution.
+        """
+        if solution and puzzle.solution is None:
+            raise ValueError('Puzzle has no solution to render; call solve() first')
+
+        self.ax.clear()
+        if isinstance(puzzle, Shikaku):
+            puzzle._draw_board(self.ax, puzzle.solution if solution else None, title=title)
+        elif solution:
+            puzzle._draw_board(self.ax, puzzle.solution, puzzle.board, title=title)
+        else:
+            puzzle._draw_board(self.ax, puzzle.board, title=title)
+
+        buffer = io.BytesIO()
+        self.figure.savefig(buffer, format='png')
+        png = buffer.getvalue()
+        if save_path != '':
+            with open(save_path, 'wb') as f:
+                f.write(png)
+        return png
+
+
+# renderer owned by each worker process of render_many()
+_worker_renderer: Optional[BoardRenderer] = None
+
+
+def _init_worker(figsize: Tuple[float, float], dpi: int) -> None:
+    global _worker_renderer
+    _worker_renderer = BoardRenderer(figsize, dpi)
+
+
+def _render_job(job: Tuple[Puzzle, bool, str, str]) -> Union[bytes, str]:
+    puzzle, solution, title, save_path = job
+    png = _worker_renderer.render(puzzle, solution=solution, title=title, save_path=save_path)
+    return save_path if save_path != '' else png
+
+
+def render_many(puzzles: Iterable[Puzzle], solution: bool = False, title: str = '',
+                out_dir: Optional[str] = None, filename_format: str = '{:05d}.png',
+                processes: Optional[int] = 1, chunksize: int = 16,
+                figsize: Tuple[float, float] = (6, 6), dpi: int = 100) -> List[Union[bytes, str]]:
+    """
+    Render many puzzles to PNG without a display.
+
+    :param puzzles: Sudoku (or variant) and Shikaku objects, in any mix.
+    :param solution: Render the solutions rather than the original boards.
+    :param title: Title drawn above every image.
+    :param out_dir: If given, write image i to out_dir/filename_format.format(i) and return
+    the file paths. Otherwise the PNG bytes are returned.
+    :param processes: Number of worker processes. 1 renders in this process; None uses
+    os.cpu_count().
+    :param chunksize: Number of puzzles sent to a worker at a time.
+    """
+    jobs = []
+    for i, puzzle in enumerate(puzzles):
+        save_path = os.path.join(out_dir, filename_format.format(i)) if out_dir is not None else ''
+        jobs.append((puzzle, solution, title, save_path))
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+
+    if processes == 1 or len(jobs) <= 1:
+        _init_worker(figsize, dpi)
+        return [_render_job(job) for job in jobs]
+
+    with mp.Pool(processes, initializer=_init_worker, initargs=(figsize, dpi)) as pool:
+        return pool.map(_render_job, jobs, chunksize=chunksize)
@@ -0,0 +1,120 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+"""
+Controls shared by the backtracking searches of every puzzle.
+
+Cancellation. A search can be cancelled from another thread: run it inside
+`cancel_scope(event)` and call `event.set()`. The searches call `check_cancelled()` at
+every node, which raises SearchCancelled once the event of the enclosing scope is set.
+Scopes are per thread, so searches running in other threads are unaffected.
+"""
+
+class SearchCancelled(Exception):
+    """
+    Raised inside a search when the event of its cancel_scope() has been set.
+    """
+    pass
+
+
+_local = threading.local()
+
+
+@contextmanager
+def cancel_scope(event: threading.Event) -> Iterator[threading.Event]:
+    """
+    Make every search run by this thread inside the `with` block stop (by raising
+    SearchCancelled) once `event` is set.
+    """
+    previous = getattr(_local, 'cancel_event', None)
+    _local.cancel_event = event
+    try:
+        yield event
+    finally:
+        _local.cancel_event = previous
+
+
+def check_cancelled() -> None:
+    """
+    Raise SearchCancelled if the enclosing cancel_scope() of this thread has been cancelled.
+    """
+    event = getattr(_local, 'cancel_event', None)
+    if event is not None and event.is_set():
+        raise SearchCancelled()
+
+
+"""
+Budgets. A search given a SearchBudget calls `budget.check(nodes)` at every node, which
+raises SearchBudgetExhausted once the node or time limit is reached. The solvers'
+budgeted_solve() methods catch it and report what was found so far in a SearchResult.
+"""
+COMPLETED = 'completed'  # search ran to the end and found at least one solution
+NO_SOLUTION = 'no_solution'  # search ran to the end and proved there is no solution
+NODE_LIMIT = 'node_limit'  # search stopped after max_nodes nodes
+TIME_LIMIT = 'time_limit'  # search stopped after max_seconds seconds
+
+
+class SearchBudgetExhausted(Exception):
+    """
+    Raised inside a search when its budget runs out. `status` is NODE_LIMIT or TIME_LIMIT.
+    """
+    def __init__(self, status: str):
+        super().__init__(status)
+        self.status = status
+
+
+class SearchBudget:
+
+    def __init__(self, max_nodes: Optional[int] = None, max_seconds: Optional[float] = None):
+        """
+        :param max_nodes: Maximum number of search nodes to visit. None for no limit.
+        :param max_seconds: Maximum wall-clock time, counted from start(). None for no limit.
+        """
+        assert max_nodes is None or max_nodes >= 1, 'max_nodes must be >= 1'
+        assert max_seconds is None or max_seconds > 0, 'max_seconds must be > 0'
+        self.max_nodes = max_nodes
+        self.max_seconds = max_seconds
+        self.deadline = None
+
+    def start(self) -> None:
+        if self.max_seconds is not None:
+            self.deadline = time.perf_counter() + self.max_seconds
+
+    def check(self, nodes: int) -> None:
+        """
+        Raise SearchBudgetExhausted if `nodes` exceeds the node limit or the deadline has passed.
+        """
+        if self.max_nodes is not None and nodes > self.max_nodes:
+            raise SearchBudgetExhausted(NODE_LIMIT)
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchBudgetExhausted(TIME_LIMIT)
+
+
+@dataclass
+class SearchResult:
+    """
+    Outcome of a budgeted search.
+
+    status: COMPLETED, NO_SOLUTION, NODE_LIMIT or TIME_LIMIT.
+    solutions: solutions found (all of them if the search completed, else those found
+        before the budget ran out).
+    fixed: assignments forced by constraint propagation alone, before any guessing.
+        For Sudoku this maps (r,c) to a digit, for Shikaku an anchor index to a Rect.
+    nodes: number of search nodes visited.
+    seconds: wall-clock time taken.
+    """
+    status: str
+    solutions: List[Any] = field(default_factory=list)
+    fixed: Dict[Any, Any] = field(default_factory=dict)
+    nodes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def is_complete(self) -> bool:
+        """
+        True if the search ran to the end, i.e. `solutions` holds every solution.
+        """
+        return self.status in (COMPLETED, NO_SOLUTION)
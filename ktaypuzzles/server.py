@@ -0,0 +1,399 @@
+import argparse
+import bisect
+import json
+import multiprocessing as mp
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence
+
+from .batchsolve import Request, Response, solve_one
+
+"""
+Local HTTP/JSON service for solving and generating puzzles. Standard library only; run it with
+
+    python -m ktaypuzzles.server --port 8000 --processes 4
+
+Endpoints:
+    POST /solve      body: a solve request of batchsolve (the "op" key is implied)
+    POST /generate   body: a generate request of batchsolve
+    GET  /metrics    counters and latency histograms, as JSON
+    GET  /health     {"status": "ok"}
+
+Requests are handled as follows. The worker processes are forked once, when the service
+starts and before any thread is started. Each HTTP request is put on a queue. A batcher
+thread takes requests off the queue and groups them into batches of up to `max_batch`
+requests, waiting at most `max_wait` seconds for a batch to fill up, and hands each batch to
+the pool at once. Within a batch every request is a task of its own (batchsolve.solve_one()),
+answered as soon as it completes: the requests of a batch run in parallel on the free
+workers, and a slow request does not hold up the fast ones batched with it. When idle, a
+request waits at most `max_wait` seconds extra before it starts.
+
+Backpressure: at most `max_pending` requests may be queued or running at any time. Beyond
+that, requests are rejected right away with 503 and a Retry-After header, instead of
+queueing up behind work that cannot finish in time.
+
+Time limits: a search in a worker cannot be interrupted from outside, and a 504 does not stop
+it. Every solve and generate request therefore runs with a max_seconds of its own, or
+`default_max_seconds` if it has none, and never more than `max_seconds_limit`.
+
+Status codes: 400 for an invalid request (including a request the worker rejects), 500 if the
+worker failed or the service stopped before answering, 503 and 504 as above.
+"""
+# upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+class ServiceOverloaded(Exception):
+    """
+    Raised by PuzzleService.submit() when max_pending requests are already pending.
+    """
+    pass
+
+
+class Histogram:
+
+    def __init__(self, bounds: Sequence[float]):
+        """
+        Histogram with buckets (-inf, bounds[0]], (bounds[0], bounds[1]], ..., (bounds[-1], inf).
+        """
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the q-quantile as the upper bound of the bucket that contains it (None if the
+        histogram is empty, inf if it is in the last bucket).
+        """
+        with self._lock:
+            if self.count == 0:
+                return None
+            rank, seen = q * self.count, 0
+            for (i, count) in enumerate(self.counts):
+                seen += count
+                if seen >= rank and count > 0:
+                    return self.bounds[i] if i < len(self.bounds) else float('inf')
+            return float('inf')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Buckets are cumulative, as {"le": upper bound, "count": observations <= bound}.
+        """
+        with self._lock:
+            buckets, cumulative = [], 0
+            for (bound, count) in zip(self.bounds + ['+Inf'], self.counts):
+                cumulative += count
+                buckets.append({'le': bound, 'count': cumulative})
+            result = {'count': self.count, 'sum': self.sum, 'buckets': buckets}
+        for q in (0.5, 0.9, 0.99):
+            result['p{}'.format(int(q * 100))] = self.quantile(q)
+        return result
+
+
+class _Pending:
+    """
+    A request waiting for its response.
+    """
+    def __init__(self, request: Request):
+        self.request = request
+        self.response: Optional[Response] = None
+        self.failed = False  # True if the error response comes from the service, not the request
+        self.done = threading.Event()
+        self.start = time.perf_counter()
+
+
+class PuzzleService:
+
+    def __init__(self, processes: Optional[int] = None, max_batch: int = 16, max_wait: float = 0.005,
+                 max_pending: int = 256, default_max_seconds: float = 10, max_seconds_limit: float = 30):
+        """
+        :param processes: Number of worker processes (default: number of CPUs).
+        :param max_batch: Maximum number of requests sent to a worker at once.
+        :param max_wait: Maximum time (seconds) the batcher waits for a batch to fill up.
+        :param max_pending: Maximum number of requests queued or running; more are rejected.
+        :param default_max_seconds: Time limit of requests that do not set max_seconds.
+        :param max_seconds_limit: Largest max_seconds a request may set; larger ones are lowered.
+        """
+        assert max_batch >= 1, 'max_batch must be >= 1'
+        assert max_wait >= 0, 'max_wait must be >= 0'
+        assert max_pending >= 1, 'max_pending must be >= 1'
+        assert 0 < default_max_seconds <= max_seconds_limit, \
+            'default_max_seconds must be > 0 and <= max_seconds_limit'
+        self.processes = processes if processes else mp.cpu_count()
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.default_max_seconds = default_max_seconds
+        self.max_seconds_limit = max_seconds_limit
+        self._queue: 'queue.Queue[Optional[_Pending]]' = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pool = None
+        self._batcher: Optional[threading.Thread] = None
+        self._in_flight: Dict[int, _Pending] = {}  # requests sent to the workers, by id
+        self.counters = {'requests': 0, 'rejected': 0, 'errors': 0, 'batches': 0}
+        self.latency = dict((op, Histogram(LATENCY_BUCKETS)) for op in ('solve', 'generate'))
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+
+    def start(self) -> None:
+        """
+        Fork the worker processes, then start the batcher thread.
+        """
+        assert self._pool is None, 'service already started'
+        self._pool = mp.Pool(self.processes)
+        self._batcher = threading.Thread(target=self._run_batcher, name='ktaypuzzles-batcher', daemon=True)
+        self._batcher.start()
+
+    def stop(self) -> None:
+        """
+        Stop the batcher and the worker processes. Requests still pending are answered with an
+        error.
+        """
+        if self._pool is None:
+            return
+        self._queue.put(None)
+        self._batcher.join()
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+        with self._lock:
+            unfinished = list(self._in_flight.values())
+            self._in_flight.clear()
+        while not self._queue.empty():
+            unfinished.append(self._queue.get_nowait())
+        for pending in unfinished:
+            if pending is not None:
+                self._finish(pending, {'error': 'Service stopped'}, failed=True)
+
+    def submit(self, request: Request) -> _Pending:
+        """
+        Queue a request, with its time limit applied (see _limit_time()). Wait on the returned
+        object's `done` event, then read its `response`.
+
+        :raises ServiceOverloaded: If max_pending requests are already pending.
+        :raises ValueError: If the request sets an invalid max_seconds.
+        """
+        request = self._limit_time(request)
+        with self._lock:
+            self.counters['requests'] += 1
+            if self._pending >= self.max_pending:
+                self.counters['rejected'] += 1
+                raise ServiceOverloaded()
+            self._pending += 1
+        pending = _Pending(request)
+        self._queue.put(pending)
+        return pending
+
+    def _limit_time(self, request: Request) -> Request:
+        """
+        Return a copy of the request with max_seconds set to default_max_seconds if it is
+        missing, and lowered to max_seconds_limit if it is larger.
+        """
+        max_seconds = request.get('max_seconds')
+        if max_seconds is None:
+            max_seconds = self.default_max_seconds
+        elif isinstance(max_seconds, bool) or not isinstance(max_seconds, (int, float)) or max_seconds <= 0:
+            raise ValueError('max_seconds must be a positive number')
+        return dict(request, max_seconds=min(max_seconds, self.max_seconds_limit))
+
+    def handle(self, request: Request, timeout: Optional[float] = None) -> Optional[Response]:
+        """
+        Submit a request and wait for its response (None if `timeout` seconds pass first).
+        """
+        pending = self.submit(request)
+        return pending.response if pending.done.wait(timeout) else None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics: Dict[str, Any] = dict(self.counters)
+            metrics['pending'] = self._pending
+        metrics['queued'] = self._queue.qsize()
+        metrics['processes'] = self.processes
+        metrics['latency_seconds'] = dict((op, histogram.to_dict()) for (op, histogram) in self.latency.items())
+        metrics['batch_size'] = self.batch_size.to_dict()
+        return metrics
+
+    def _run_batcher(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stop = True
+                    break
+                batch.append(pending)
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[_Pending]) -> None:
+        with self._lock:
+            self.counters['batches'] += 1
+            for pending in batch:
+                self._in_flight[id(pending)] = pending
+        self.batch_size.observe(len(batch))
+        for pending in batch:
+            self._send_to_pool(pending)
+
+    def _send_to_pool(self, pending: _Pending) -> None:
+        def on_result(response: Response) -> None:
+            if self._take_in_flight(pending):
+                self._finish(pending, response)
+
+        def on_error(error: BaseException) -> None:
+            if self._take_in_flight(pending):
+                self._finish(pending, {'error': '{}: {}'.format(type(error).__name__, error)}, failed=True)
+
+        self._pool.apply_async(solve_one, (pending.request,), callback=on_result, error_callback=on_error)
+
+    def _take_in_flight(self, pending: _Pending) -> bool:
+        """
+        Mark a request as answered. Returns False if stop() already answered it.
+        """
+        with self._lock:
+            return self._in_flight.pop(id(pending), None) is not None
+
+    def _finish(self, pending: _Pending, response: Response, failed: bool = False) -> None:
+        op = pending.request.get('op', 'solve')
+        if op in self.latency:
+            self.latency[op].observe(time.perf_counter() - pending.start)
+        with self._lock:
+            self._pending -= 1
+            if 'error' in response:
+                self.counters['errors'] += 1
+        pending.response = response
+        pending.failed = failed
+        pending.done.set()
+
+    def __enter__(self) -> 'PuzzleService':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: 'PuzzleServer'
+
+    def do_GET(self) -> None:
+        if self.path == '/metrics':
+            self._send(200, self.server.service.get_metrics())
+        elif self.path == '/health':
+            self._send(200, {'status': 'ok'})
+        else:
+            self._send(404, {'error': 'Not found'})
+
+    def do_POST(self) -> None:
+        ops = {'/solve': 'solve', '/generate': 'generate'}
+        if self.path not in ops:
+            self._send(404, {'error': 'Not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+            assert isinstance(request, dict), 'request body must be a JSON object'
+        except (AssertionError, ValueError) as e:
+            self._send(400, {'error': 'Invalid request: {}'.format(e)})
+            return
+        request['op'] = ops[self.path]
+
+        try:
+            pending = self.server.service.submit(request)
+        except ServiceOverloaded:
+            self._send(503, {'error': 'Service overloaded, retry later'}, {'Retry-After': '1'})
+            return
+        except ValueError as e:
+            self._send(400, {'error': 'Invalid request: {}'.format(e)})
+            return
+        if not pending.done.wait(self.server.request_timeout):
+            self._send(504, {'error': 'Request timed out'})
+            return
+        response = pending.response
+        if pending.failed:
+            self._send(500, response)
+        else:
+            self._send(400 if 'error' in response else 200, response)
+
+    def _send(self, code: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for (key, value) in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class PuzzleServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, service: PuzzleService, host: str = '127.0.0.1', port: int = 8000,
+                 request_timeout: Optional[float] = 60, verbose: bool = False):
+        """
+        HTTP server in front of a started PuzzleService. Port 0 picks a free port (see
+        server_address).
+
+        :param request_timeout: Seconds an HTTP request waits for its response before a 504.
+        """
+        super().__init__((host, port), _RequestHandler)
+        self.service = service
+        self.request_timeout = request_timeout
+        self.verbose = verbose
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Local HTTP/JSON puzzle solving service.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: CPUs)')
+    parser.add_argument('--max-batch', type=int, default=16, help='maximum requests per batch')
+    parser.add_argument('--max-wait', type=float, default=0.005, help='maximum seconds to fill a batch')
+    parser.add_argument('--max-pending', type=int, default=256, help='pending requests before 503s')
+    parser.add_argument('--request-timeout', type=float, default=60, help='seconds before a 504')
+    parser.add_argument('--default-max-seconds', type=float, default=10,
+                        help='time limit of requests without max_seconds')
+    parser.add_argument('--max-seconds-limit', type=float, default=30,
+                        help='largest max_seconds a request may set')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args(argv)
+
+    with PuzzleService(args.processes, args.max_batch, args.max_wait, args.max_pending,
+                       args.default_max_seconds, args.max_seconds_limit) as service:
+        server = PuzzleServer(service, args.host, args.port, args.request_timeout, args.verbose)
+        print('Serving on http://{}:{}'.format(*server.server_address))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+import copy
+from typing import Optional, Set, Tuple
+
+from .sudoku import Board, EMPTY, Sudoku
+
+"""
+Incremental solving session for interactive use.
+
+A SudokuSession is created once per puzzle and then updated move by move. For every cell
+and digit it keeps the number of placed digits that rule the digit out there, so placing
+or erasing a digit only touches the cells that digit constrains (its peers, plus orthogonal
+neighbors for NonConsecSudoku) instead of recomputing the whole board.
+
+Hints and solvability checks warm-start the backtracking solver from the current board and
+candidates. The last solution found is kept, and reused for as long as it agrees with every
+digit on the board, which is the common case while the player is on the right track.
+"""
+Cell = Tuple[int, int]
+
+
+class SudokuSession:
+
+    def __init__(self, sudoku: Sudoku):
+        """
+        Start a session on the current board of `sudoku` (any variant). Digits already on
+        the board are givens and cannot be erased.
+        """
+        self.sudoku = sudoku
+        self.size = sudoku.size
+        self.board: Board = Sudoku.get_empty_board(sudoku.minirows, sudoku.minicols)
+        self.givens: Set[Cell] = set()
+        # _blockers[r][c][v]: number of placed digits that rule out v at (r,c)
+        self._blockers = [[[0] * (self.size + 1) for _ in range(self.size)] for _ in range(self.size)]
+        self._conflict_count = 0  # number of conflicting pairs of placed digits
+        self._solution: Optional[Board] = None  # last solution found, if any
+        for r in range(self.size):
+            for c in range(self.size):
+                if sudoku.board[r][c] is not EMPTY:
+                    self.place(r, c, sudoku.board[r][c])
+                    self.givens.add((r,c))
+
+    def place(self, r: int, c: int, value: int) -> Set[Cell]:
+        """
+        Place `value` at (r,c), replacing any digit the player put there before. Returns the
+        cells whose digits conflict with it (empty if the move is legal).
+
+        :raises ValueError: If (r,c) is a given or value is not a valid digit.
+        """
+        if (r,c) in self.givens:
+            raise ValueError('Cannot overwrite the given at ({}, {})'.format(r, c))
+        if value not in range(1, self.size + 1):
+            raise ValueError('Value must be in 1..{}'.format(self.size))
+        if self.board[r][c] is not EMPTY:
+            self.erase(r, c)
+        self.board[r][c] = value
+        self._update(r, c, value, 1)
+        return self.get_conflicts(r, c)
+
+    def erase(self, r: int, c: int) -> None:
+        """
+        Remove the digit at (r,c), if any.
+
+        :raises ValueError: If (r,c) is a given.
+        """
+        if (r,c) in self.givens:
+            raise ValueError('Cannot erase the given at ({}, {})'.format(r, c))
+        value = self.board[r][c]
+        if value is EMPTY:
+            return
+        self._update(r, c, value, -1)
+        self.board[r][c] = EMPTY
+
+    def _update(self, r: int, c: int, value: int, delta: int) -> None:
+        """
+        Add (delta=1) or remove (delta=-1) the eliminations of `value` at (r,c).
+        """
+        for (i, j, v) in self.sudoku._get_eliminations(r, c, value):
+            self._blockers[i][j][v] += delta
+            if self.board[i][j] == v:
+                self._conflict_count += delta
+
+    def get_candidates(self, r: int, c: int) -> Set[int]:
+        """
+        Digits that can go in (r,c) given the other digits on the board.
+        """
+        blockers = self._blockers[r][c]
+        return set(v for v in range(1, self.size + 1) if blockers[v] == 0)
+
+    def get_conflicts(self, r: int, c: int) -> Set[Cell]:
+        """
+        Cells whose digits conflict with the digit at (r,c).
+        """
+        value = self.board[r][c]
+        if value is EMPTY or self._blockers[r][c][value] == 0:
+            return set()
+        return set((i,j) for (i, j, v) in self.sudoku._get_eliminations(r, c, value)
+                   if self.board[i][j] == v)
+
+    def has_conflicts(self) -> bool:
+        return self._conflict_count > 0
+
+    def is_complete(self) -> bool:
+        """
+        True if every cell is filled and there are no conflicts.
+        """
+        return not self.has_conflicts() and all(cell is not EMPTY for row in self.board for cell in row)
+
+    def is_solvable(self) -> bool:
+        """
+        True if the current board can still be completed to a solution.
+        """
+        return self._find_solution() is not None
+
+    def hint(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Suggest a move (r, c, value), or return None if the board is complete or can no
+        longer be completed. The move is for the empty cell with fewest candidates: if it
+        has a single candidate, that is the hint, otherwise the value comes from a solution
+        of the current board.
+        """
+        empty_cells = sorted(Sudoku._get_empty_cells(self.board))
+        solution = self._find_solution()
+        if len(empty_cells) == 0 or solution is None:
+            return None
+        candidates = dict((cell, self.get_candidates(*cell)) for cell in empty_cells)
+        (r,c) = min(empty_cells, key=lambda cell: len(candidates[cell]))
+        if len(candidates[(r,c)]) == 1:
+            return (r, c, next(iter(candidates[(r,c)])))
+        return (r, c, solution[r][c])
+
+    def _find_solution(self) -> Optional[Board]:
+        """
+        Return a solution that agrees with the current board, reusing the last one found if
+        it still agrees, else warm-starting the solver from the current state.
+        """
+        if self.has_conflicts():
+            return None
+        if self._solution is not None and all(
+                self.board[r][c] in (EMPTY, self._solution[r][c])
+                for r in range(self.size) for c in range(self.size)):
+            return self._solution
+
+        puzzle = copy.copy(self.sudoku)
+        puzzle.board = Sudoku._copy_board(self.board)
+        puzzle.is_valid_board = True
+        candidates_dict = dict((cell, self.get_candidates(*cell))
+                               for cell in Sudoku._get_empty_cells(self.board))
+        solver = puzzle._get_solver()
+        self._solution = next(solver.iter_solutions(candidates_dict), None)
+        return self._solution
@@ -1,7 +1,10 @@
-import copy
-import matplotlib.pyplot as plt
-from typing import Dict, Iterable, List, Optional, Union, Tuple
+import random
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Union, Tuple
+from .exactcover import ExactCover
 from .rect import Rect
+from .search import (COMPLETED, NO_SOLUTION, SearchBudget, SearchBudgetExhausted, SearchResult,
+                     check_cancelled)
 from .utils import get_factors
 
 """
@@ -12,6 +15,7 @@ a number or None (indicating an empty cell).
 Board = List[List[Union[int, None]]]
 Anchor = Tuple[int, int, int, int]  # (anchor_index, r, c, board[r][c])
 State = List[Rect]  # State[i]: rectangle associated with anchor [i]
+Candidate = Tuple[int, Rect]  # (bitmask of the cells covered by the rectangle, rectangle)
 EMPTY = None
 
 class Shikaku:
@@ -43,16 +47,51 @@ class Shikaku:
         self.is_solved = False
         self.solution = None
     
-    def solve(self) -> Optional[State]:
+    def solve(self, method: str = 'backtracking') -> Optional[State]:
         """
         Solve the shikaku board. Solution is saved as self.solution, and also returned.
+
+        :param method: 'backtracking' assigns one anchor at a time; 'exact_cover' solves the
+        board as an exact cover problem over its cells and anchors, branching on whichever
+        cell or anchor has the fewest rectangles left (see _ShikakuSolver.exact_cover_solve()).
+        If the board has several solutions, the two methods may find them in a different order.
         """
+        assert method in ('backtracking', 'exact_cover'), 'Unknown method: {}'.format(method)
         shikaku_solver = _ShikakuSolver(self)
-        solution_list = shikaku_solver.backtracking_solve()
+        if method == 'exact_cover':
+            solution_list = shikaku_solver.exact_cover_solve()
+        else:
+            solution_list = shikaku_solver.backtracking_solve()
         self.is_solved = len(solution_list) > 0
         self.solution = solution_list[0] if self.is_solved else None
-        return solution_list[0]
+        return self.solution
+
+    def solve_with_budget(self, max_nodes: Optional[int] = None,
+                          max_seconds: Optional[float] = None) -> SearchResult:
+        """
+        Solve the shikaku board, giving up after `max_nodes` search nodes or `max_seconds`
+        seconds. The returned SearchResult says whether the search completed, proved that
+        there is no solution or ran out of budget, and holds the solutions found so far and
+        the rectangles fixed by propagation. If a solution was found it is saved as
+        self.solution.
+        """
+        result = _ShikakuSolver(self).budgeted_solve(max_nodes, max_seconds)
+        if len(result.solutions) > 0:
+            self.is_solved = True
+            self.solution = result.solutions[0]
+        return result
     
+    def iter_solutions(self) -> Iterator[State]:
+        """
+        Yield the solutions of the shikaku board one at a time from a suspended search, so
+        that the caller can stop early, page through solutions or stream them elsewhere
+        without holding them all in memory. Unlike solve(), this does not set self.solution.
+        """
+        return self._get_solver().iter_solutions()
+
+    def _get_solver(self) -> '_ShikakuSolver':
+        return _ShikakuSolver(self)
+
     def _is_rect_in_board(self, rect: Rect) -> bool:
         """
         Returns True if a rect is within the bounds of the board, else False.
@@ -121,13 +160,28 @@ class Shikaku:
         Draw an image of the given board.
         If solution is provided, draw the rectangles of the solution too.
         """
+        # matplotlib is slow to import, so only load it when an image is requested
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(figsize=(6, 6))
+        self._draw_board(ax, solution, title=title)
+
+        if save_path != '':
+            plt.savefig(save_path, bbox_inches='tight')
+        
+        plt.show()
+        plt.close(fig)
+
+    def _draw_board(self, ax, solution: Optional[List[Rect]] = None, title: str = '') -> None:
+        """
+        Draw the board on a matplotlib Axes.
+        If solution is provided, draw the rectangles of the solution too.
+        """
+        from matplotlib.collections import LineCollection
 
         # draw main grid
-        for i in range(self.rows+1):
-            ax.plot([0, self.cols], [i, i], color='black', linewidth=0.5)
-        for i in range(self.cols+1):
-            ax.plot([i, i], [0, self.rows], color='black', linewidth=0.5)
+        segments = [[(0, i), (self.cols, i)] for i in range(self.rows+1)] + \
+            [[(i, 0), (i, self.rows)] for i in range(self.cols+1)]
+        ax.add_collection(LineCollection(segments, colors='black', linewidths=0.5))
 
         # add numbers
         for (_, r, c, val) in self.anchors:
@@ -136,15 +190,16 @@ class Shikaku:
             
         # if solution is provided, draw the rectangles
         if solution is not None:
+            rect_segments = []
             for rect in solution:
-                ax.plot([rect.c1, rect.c1], [self.rows-rect.r1, self.rows-rect.r2-1],
-                        color='black', linewidth=3)
-                ax.plot([rect.c2+1, rect.c2+1], [self.rows-rect.r1, self.rows-rect.r2-1],
-                        color='black', linewidth=3)
-                ax.plot([rect.c1, rect.c2+1], [self.rows-rect.r1, self.rows-rect.r1],
-                        color='black', linewidth=3)
-                ax.plot([rect.c1, rect.c2+1], [self.rows-rect.r2-1, self.rows-rect.r2-1],
-                        color='black', linewidth=3)
+                top, bottom = self.rows - rect.r1, self.rows - rect.r2 - 1
+                rect_segments.extend([
+                    [(rect.c1, top), (rect.c1, bottom)],
+                    [(rect.c2+1, top), (rect.c2+1, bottom)],
+                    [(rect.c1, top), (rect.c2+1, top)],
+                    [(rect.c1, bottom), (rect.c2+1, bottom)],
+                ])
+            ax.add_collection(LineCollection(rect_segments, colors='black', linewidths=3))
         
         # set the axis properties
         ax.set_xlim(-1, self.cols+1)
@@ -155,11 +210,6 @@ class Shikaku:
         # add title
         ax.set_title(title, fontsize=20, pad=20)
 
-        if save_path != '':
-            plt.savefig(save_path, bbox_inches='tight')
-        
-        plt.show()
-
 
 class _ShikakuSolver:
     def __init__(self, shikaku: Shikaku):
@@ -169,10 +219,15 @@ class _ShikakuSolver:
         self.board = shikaku.board
         self.anchors = shikaku.anchors
         self.num_anchors = len(self.anchors)
+        self.nodes = 0  # number of search nodes visited by backtracking_solve()
+        self.budget: Optional[SearchBudget] = None  # set by budgeted_solve()
+        # reach[i]: bitmask of the cells covered by some initial candidate of anchor i
+        self.reach: Dict[int, int] = {}
     
-    def _get_valid_rects(self, anchor: Anchor, state: State) -> List[Rect]:
+    def _get_valid_rects(self, anchor: Anchor, covered: int) -> List[Candidate]:
         """
-        Given a board state, return all possible rectangles for a given anchor as a list.
+        Return all possible rectangles for a given anchor as a list of candidates, given the
+        cells already covered by other rectangles as a bitmask (see Rect.get_mask()).
         """
         valid_rect_list = []
         anchor_index, r, c, area = anchor
@@ -183,33 +238,61 @@ class _ShikakuSolver:
                 for col_offset in range(num_cols):
                     r1 = r - row_offset
                     c1 = c - col_offset
+                    if r1 < 0 or r1 + num_rows > self.rows or c1 < 0 or c1 + num_cols > self.cols:
+                        continue  # out of bounds
                     rect = Rect(r1, r1 + num_rows - 1, c1, c1 + num_cols - 1)
-                    if not self.shikaku._is_rect_in_board(rect):  # out of bounds
-                        continue
-                    overlaps = False
-                    for i, s in enumerate(state):
-                        if anchor_index != i and rect.does_rect_overlap(s):
-                            # overlaps with existing rectangle
-                            overlaps = True
-                            break
-                    if not overlaps:
-                        valid_rect_list.append(rect)
+                    mask = rect.get_mask(self.cols)
+                    if mask & covered == 0:  # no overlap with existing rectangles
+                        valid_rect_list.append((mask, rect))
         
         return valid_rect_list
+
+    def _get_candidates_dict(self) -> Dict[int, List[Candidate]]:
+        """
+        For each anchor, find all rectangles that do not cover another anchor.
+        """
+        anchor_cells = [1 << (r * self.cols + c) for (_, r, c, _) in self.anchors]
+        covered = 0
+        for cell in anchor_cells:
+            covered |= cell
+        candidates_dict = {anchor[0]: self._get_valid_rects(anchor, covered & ~anchor_cells[anchor[0]])
+                           for anchor in self.anchors}
+        for (i, candidates) in candidates_dict.items():
+            self.reach[i] = 0
+            for (mask, _) in candidates:
+                self.reach[i] |= mask
+        return candidates_dict
     
     @staticmethod
-    def _prune_candidates_dict(candidates_dict: Dict[int, List[Rect]],
-                               anchor_index_added: int, rect_added: Rect):
-        new_candidates_dict = {}
-        for i, original_candidate_rects in candidates_dict.items():
-            if i == anchor_index_added:
-                new_candidates_dict[i] = candidates_dict[i]
-            else:
-                new_candidates_dict[i] = []
-                for rect in original_candidate_rects:
-                    if not rect.does_rect_overlap(rect_added):
-                        new_candidates_dict[i].append(rect)
-        return new_candidates_dict
+    def _prune_candidates_dict(candidates_dict: Dict[int, List[Candidate]],
+                               anchor_index_added: int, mask_added: int,
+                               trail: Optional[List[Tuple[int, List[Candidate]]]] = None,
+                               reach: Optional[Dict[int, int]] = None) -> None:
+        """
+        Remove the candidate rectangles of the other anchors that overlap the rectangle with
+        mask `mask_added`, in place. Only the lists that lose a rectangle are replaced (lists
+        are never mutated), and if `trail` is given, their previous values are appended to it
+        as (anchor_index, candidates) so that _undo_pruning() can restore them. If `reach` is
+        given, anchors none of whose candidates can touch mask_added are skipped.
+        """
+        for i, candidates in candidates_dict.items():
+            if i == anchor_index_added or (reach is not None and reach[i] & mask_added == 0):
+                continue
+            kept = [candidate for candidate in candidates if not candidate[0] & mask_added]
+            if len(kept) < len(candidates):
+                if trail is not None:
+                    trail.append((i, candidates))
+                candidates_dict[i] = kept
+
+    @staticmethod
+    def _undo_pruning(candidates_dict: Dict[int, List[Candidate]],
+                      trail: List[Tuple[int, List[Candidate]]], mark: int) -> None:
+        """
+        Restore the candidate lists recorded in trail[mark:], most recent first.
+        """
+        while len(trail) > mark:
+            (i, candidates) = trail.pop()
+            candidates_dict[i] = candidates
 
     def backtracking_solve(self) -> List[State]:
         """
@@ -217,48 +300,169 @@ class _ShikakuSolver:
         board admits multiple solutions, all solutions are returned. If there is no solution,
         empty list is returned.
         """
+        return list(self.iter_solutions())
+
+    def exact_cover_solve(self) -> List[State]:
+        """
+        Solve the shikaku puzzle as an exact cover problem and return all its solutions as a
+        list, like backtracking_solve().
+        """
+        return list(self.iter_exact_cover_solutions())
+
+    def iter_exact_cover_solutions(self) -> Iterator[State]:
+        """
+        Yield the solutions of the shikaku puzzle one at a time, found with exactcover.py.
+        Each cell must be covered by exactly one rectangle and each anchor must get exactly
+        one, so the columns are the cells and the anchors, and the rows are the candidate
+        rectangles of each anchor. Algorithm X branches on the most constrained column, which
+        may be a cell that few rectangles can cover rather than an anchor, and it notices as
+        soon as some cell can no longer be covered.
+        """
+        candidates_dict = self._get_candidates_dict()
+        columns = list(range(self.num_anchors)) + \
+            [(r, c) for r in range(self.rows) for c in range(self.cols)]
+        rows = {}
+        for (anchor_index, candidates) in candidates_dict.items():
+            for (_, rect) in candidates:
+                rows[(anchor_index, rect)] = [anchor_index] + \
+                    [(r, c) for r in range(rect.r1, rect.r2 + 1) for c in range(rect.c1, rect.c2 + 1)]
+        exact_cover = ExactCover(columns, rows)
+        exact_cover.budget = self.budget
+        self.nodes = 0
+        try:
+            for cover in exact_cover.iter_solutions():
+                solution = [None] * self.num_anchors
+                for (anchor_index, rect) in cover:
+                    solution[anchor_index] = rect
+                yield solution
+        finally:
+            self.nodes = exact_cover.nodes
+
+    def budgeted_solve(self, max_nodes: Optional[int] = None,
+                       max_seconds: Optional[float] = None) -> SearchResult:
+        """
+        Solve the shikaku puzzle with backtracking, stopping after `max_nodes` search nodes or
+        `max_seconds` seconds (None for no limit). If the budget runs out, the result holds
+        the solutions found until then. In every case it also holds the rectangles fixed by
+        propagation, i.e. anchors left with a single candidate rectangle.
+        """
+        start = time.perf_counter()
+        budget = SearchBudget(max_nodes, max_seconds)
+        budget.start()
+        fixed = self._get_fixed_rects()
+        if fixed is None:
+            # propagation alone reached a contradiction
+            return SearchResult(NO_SOLUTION, seconds=time.perf_counter() - start)
+
+        solution_list = []
+        self.budget = budget
+        try:
+            for solution in self.iter_solutions():
+                solution_list.append(solution)
+            status = COMPLETED if len(solution_list) > 0 else NO_SOLUTION
+        except SearchBudgetExhausted as e:
+            status = e.status
+        finally:
+            self.budget = None
+        return SearchResult(status, solution_list, fixed, self.nodes, time.perf_counter() - start)
+
+    def _get_fixed_rects(self) -> Optional[Dict[int, Rect]]:
+        """
+        Repeatedly assign anchors that have a single candidate rectangle, pruning the other
+        anchors' candidates each time. Returns the rectangles assigned this way as a dict
+        {anchor_index: rect}, or None if some anchor is left with no candidates (so the
+        board has no solution).
+        """
+        candidates_dict = self._get_candidates_dict()
+
+        fixed = {}
+        while True:
+            single = next((i for i, candidates in candidates_dict.items() if len(candidates) <= 1), None)
+            if single is None:
+                return fixed
+            candidates = candidates_dict.pop(single)
+            if len(candidates) == 0:
+                return None
+            (mask, fixed[single]) = candidates[0]
+            _ShikakuSolver._prune_candidates_dict(candidates_dict, single, mask, reach=self.reach)
+
+    def iter_solutions(self) -> Iterator[State]:
+        """
+        Yield the solutions of the shikaku puzzle one at a time, in the same order as
+        backtracking_solve() returns them. The search is suspended between solutions, so
+        the consumer can stop early without the remaining solutions being computed.
+        """
         # initialize board with 1x1 rectangles on each anchor
         current_state = [Rect(r, r, c, c) for (_, r, c, _) in self.anchors]
 
         # for each anchor, find all valid rectangles for it
-        candidates_dict: Dict[int, List[Rect]] = {}
-        for anchor in self.anchors:
-            candidates_dict[anchor[0]] = self._get_valid_rects(anchor, current_state)
+        candidates_dict = self._get_candidates_dict()
         
-        solution_list = []
-        self._do_backtracking(current_state, candidates_dict, solution_list)
-
-        return solution_list
+        self.nodes = 0
+        yield from self._do_backtracking(current_state, candidates_dict, [])
     
-    def _do_backtracking(self, current_state: State, candidates_dict: Dict[int, List[Rect]],
-                         solution_list: List[State]) -> None:
+    def _do_backtracking(self, current_state: State, candidates_dict: Dict[int, List[Candidate]],
+                         trail: List[Tuple[int, List[Candidate]]]) -> Iterator[State]:
+        """
+        Explore the subtree of the current node. The candidates of the unassigned anchors are
+        pruned in place, recording what each branch removes on `trail`, and restored before
+        the next branch, so a branch only costs as much as the lists it changes.
+        """
+        self.nodes += 1
+        check_cancelled()
+        if self.budget is not None:
+            self.budget.check(self.nodes)
         if len(candidates_dict) == 0:
-            # recursion base case: all anchors assigned
-            solution_list.append(copy.deepcopy(current_state))
-            return
+            # recursion base case: all anchors assigned (rects are never mutated, so a
+            # shallow copy of the state is enough)
+            yield list(current_state)
         else:
             # recursive case
-            # assign an anchor (the one with the smallest no of possibilities)
-            candidates_list = sorted(candidates_dict.items(), key=lambda item: len(item[1]))
-            current_anchor_index = candidates_list[0][0]
-            current_candidates = candidates_list[0][1]
-            for candidate in current_candidates:
+            # assign an anchor (the one with the smallest no of possibilities, the first
+            # such anchor on ties)
+            current_anchor_index = min(candidates_dict, key=lambda i: (len(candidates_dict[i]), i))
+            current_candidates = candidates_dict.pop(current_anchor_index)
+            for (mask, rect) in current_candidates:
                 # explore
-                current_state[current_anchor_index] = candidate
-                original_candidates_dict = copy.deepcopy(candidates_dict)
-                del candidates_dict[current_anchor_index]
-                pruned_candidates_dict = _ShikakuSolver._prune_candidates_dict(
-                    candidates_dict, current_anchor_index, candidate)
+                current_state[current_anchor_index] = rect
+                mark = len(trail)
+                _ShikakuSolver._prune_candidates_dict(candidates_dict, current_anchor_index,
+                                                      mask, trail, self.reach)
 
-                self._do_backtracking(current_state, pruned_candidates_dict, solution_list)
+                yield from self._do_backtracking(current_state, candidates_dict, trail)
 
                 # undo recursion
-                candidates_dict = original_candidates_dict
-                current_state[current_anchor_index] = Rect(
-                    self.anchors[current_anchor_index][1],
-                    self.anchors[current_anchor_index][1],
-                    self.anchors[current_anchor_index][2],
-                    self.anchors[current_anchor_index][2])
+                _ShikakuSolver._undo_pruning(candidates_dict, trail, mark)
+            candidates_dict[current_anchor_index] = current_candidates
+            current_state[current_anchor_index] = Rect(
+                self.anchors[current_anchor_index][1],
+                self.anchors[current_anchor_index][1],
+                self.anchors[current_anchor_index][2],
+                self.anchors[current_anchor_index][2])
+
+    def _random_probe(self, rng: random.Random) -> int:
+        """
+        One probe of Knuth's tree-size estimator: follow a random path from the root of the
+        search tree of iter_solutions() to a leaf, choosing uniformly among the children of
+        each node. Returns 1 + d1 + d1*d2 + ..., where d1, d2, ... are the numbers of children
+        of the nodes on the path. Its expected value is the number of nodes of the tree.
+        """
+        candidates_dict = self._get_candidates_dict()
+
+        estimate = weight = 1
+        while len(candidates_dict) > 0:
+            check_cancelled()
+            # same anchor as _do_backtracking() picks
+            anchor_index = min(candidates_dict, key=lambda i: (len(candidates_dict[i]), i))
+            candidates = candidates_dict[anchor_index]
+            if len(candidates) == 0:
+                break
+            weight *= len(candidates)
+            estimate += weight
+            (mask, _) = rng.choice(candidates)
+            del candidates_dict[anchor_index]
+            _ShikakuSolver._prune_candidates_dict(candidates_dict, anchor_index, mask, reach=self.reach)
+        return estimate
 
 if __name__ == '__main__':
 
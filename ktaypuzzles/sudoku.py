@@ -1,7 +1,10 @@
-import cvxpy as cp
-import matplotlib.pyplot as plt
 import random
-from typing import Dict, Iterable, List, Optional, Union, Set, Tuple
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union, Set, Tuple
+
+from .search import (COMPLETED, NO_SOLUTION, SearchBudget, SearchBudgetExhausted, SearchResult,
+                     check_cancelled)
 
 """
 Each Sudoku board is represented by a `Board` object, where board[r][c] is either a number
@@ -98,6 +101,42 @@ class Sudoku:
         self.is_solved = len(solution_board) > 0
         self.solution = solution_board[0] if self.is_solved else None
         return solution_board
+
+    def solve_with_budget(self, max_nodes: Optional[int] = None,
+                          max_seconds: Optional[float] = None) -> SearchResult:
+        """
+        Solve the sudoku board, giving up after `max_nodes` search nodes or `max_seconds`
+        seconds. The returned SearchResult says whether the search completed, proved that
+        there is no solution or ran out of budget, and holds the solutions found so far and
+        the cells fixed by propagation. If a solution was found it is saved as self.solution.
+        """
+        result = self._get_solver().budgeted_solve(max_nodes, max_seconds)
+        if len(result.solutions) > 0:
+            self.is_solved = True
+            self.solution = result.solutions[0]
+        return result
+
+    def iter_solutions(self) -> Iterator[Board]:
+        """
+        Yield the solutions of the sudoku board one at a time from a suspended search, so that
+        the caller can stop early, page through solutions or stream them elsewhere without
+        holding them all in memory. Unlike solve(), this does not set self.solution.
+        """
+        return self._get_solver().iter_solutions()
+
+    def count_solutions(self, limit: Optional[int] = None) -> int:
+        """
+        Return the number of solutions of the sudoku board, or `limit` if there are at least
+        that many (e.g. limit=2 to check that the solution is unique). No solution boards are
+        built.
+        """
+        return self._get_solver().count_solutions(limit)
+
+    def _get_solver(self) -> '_SudokuSolver':
+        """
+        Return a solver for this puzzle. Variants override this to return their own solver.
+        """
+        return _SudokuSolver(self)
     
     @staticmethod
     def _copy_board(board: Board) -> Board:
@@ -122,7 +161,7 @@ class Sudoku:
         Generate a new random sudoku puzzle and save in self.board. We do so in the following way:
         1. Generate a complete board with _generate_complete_board().
         2. Randomly remove `blank_proportion` of the cells.
-        3. Use backtracking_solve() to check if the solution is unique. If not, keeping adding
+        3. Use count_solutions(limit=2) to check if the solution is unique. If not, keeping adding
            cells back until the solution is unique.
         """
         assert blank_proportion > 0 and blank_proportion < 1, 'blank_proportion must be in (0,1)'
@@ -135,20 +174,43 @@ class Sudoku:
         for (r,c) in cells_to_remove:
             puzzle_board[r][c] = EMPTY
 
-        # get solutions for this board, then keeping adding cells until solution is unique
-        sudoku_solver = _SudokuSolver(Sudoku(self.minirows, self.minicols, puzzle_board))
-        solution_list = sudoku_solver.backtracking_solve()
-        while len(solution_list) > 1:
-            r,c = cells_to_remove.pop()
-            puzzle_board[r][c] = complete_board[r][c]
-            solution_list = [board for board in solution_list if board[r][c] == complete_board[r][c]]
+        # add cells back (last removed first) until the solution is unique
+        self._add_back_until_unique(puzzle_board, complete_board, cells_to_remove,
+                                    lambda board: Sudoku(self.minirows, self.minicols, board))
 
         self.board = puzzle_board
         self.is_valid_board = True
         self.blank_count = len(self._get_empty_cells(self.board))
         self.is_solved = True if self.blank_count == 0 and self.is_valid_board else False
         self.solution = self.board if self.is_solved else None
-    
+
+    @staticmethod
+    def _add_back_until_unique(puzzle_board: Board, complete_board: Board, cells_to_remove: List[Tuple[int, int]],
+                               make_puzzle: Callable[[Board], 'Sudoku']) -> None:
+        """
+        Put back into puzzle_board the values of complete_board in the fewest cells from the end
+        of cells_to_remove needed for the solution to be unique, as if they were added back one
+        at a time. Adding cells back never adds solutions, so that number is found by binary
+        search, checking each candidate board with count_solutions(limit=2).
+        """
+        def is_unique(num_cells: int) -> bool:
+            board = Sudoku._copy_board(puzzle_board)
+            for (r,c) in cells_to_remove[len(cells_to_remove) - num_cells:]:
+                board[r][c] = complete_board[r][c]
+            return make_puzzle(board).count_solutions(limit=2) == 1
+
+        low, high = 0, len(cells_to_remove)
+        if not is_unique(low):
+            # is_unique(low) is False and is_unique(high) is True
+            while high - low > 1:
+                middle = (low + high) // 2
+                if is_unique(middle):
+                    high = middle
+                else:
+                    low = middle
+            for (r,c) in cells_to_remove[len(cells_to_remove) - high:]:
+                puzzle_board[r][c] = complete_board[r][c]
+
     def _generate_complete_board(self) -> Board:
         """
         Generate a random complete sudoku board.
@@ -171,6 +233,7 @@ class Sudoku:
 
     def _complete_board_recursion(self, board: Board, candidates_dict: Dict[Tuple[int, int], Set[int]],
                                   solution_list: List[Board]) -> Board:
+        check_cancelled()
         if len(candidates_dict) == 0:
             # recursion base case 1: no more empty cells
             solution_list.append(Sudoku._copy_board(board))
@@ -190,13 +253,9 @@ class Sudoku:
                 # explore
                 original_candidates_dict = {current_cell: current_candidates}
                 board[current_row][current_col] = candidate
-                current_neighbors = self._get_neighbors_for_cell(current_row, current_col)
-                current_neighbors = current_neighbors & set(candidates_dict.keys())
-                for (r,c) in current_neighbors:
-                    original_candidates_dict[(r,c)] = candidates_dict[(r,c)]
-                    candidates_dict[(r,c)] = self._get_candidates_for_cell(r, c, board)
                 del candidates_dict[current_cell]
-                if self._complete_board_recursion(board, candidates_dict, solution_list):
+                if self._assign(candidates_dict, current_cell, candidate, original_candidates_dict) and \
+                        self._complete_board_recursion(board, candidates_dict, solution_list):
                     return True
 
                 # undo recursion
@@ -230,6 +289,104 @@ class Sudoku:
                                     if box_corner_row+row != r or box_corner_col+col != c])
         return row_neighbors | col_neighbors | box_neighbors
 
+    def _get_units(self) -> List[List[Tuple[int, int]]]:
+        """
+        Return the groups of cells in which every number appears exactly once: the rows,
+        columns and boxes.
+        """
+        rows = [[(r, c) for c in range(self.size)] for r in range(self.size)]
+        cols = [[(r, c) for r in range(self.size)] for c in range(self.size)]
+        boxes = [[(box_row + r, box_col + c) for r in range(self.minirows) for c in range(self.minicols)]
+                 for box_row in range(0, self.size, self.minirows)
+                 for box_col in range(0, self.size, self.minicols)]
+        return rows + cols + boxes
+
+    def _get_eliminations(self, r: int, c: int, value: int) -> List[Tuple[int, int, int]]:
+        """
+        Return the (row, col, value) triples that are ruled out by placing `value` at (r,c).
+        """
+        return [(i, j, value) for (i, j) in self._get_neighbors_for_cell(r, c)]
+
+    def _get_elimination_sets(self, r: int, c: int, value: int) -> Dict[Tuple[int, int], Set[int]]:
+        """
+        Return _get_eliminations(r, c, value) grouped by cell, as {(i,j): values ruled out}.
+        Results are cached on the puzzle, as they only depend on its shape and rules.
+        """
+        if not hasattr(self, '_elimination_cache'):
+            self._elimination_cache = {}
+        key = (r, c, value)
+        if key not in self._elimination_cache:
+            eliminations = {}
+            for (i, j, v) in self._get_eliminations(r, c, value):
+                eliminations.setdefault((i,j), set()).add(v)
+            self._elimination_cache[key] = eliminations
+        return self._elimination_cache[key]
+
+    def _assign(self, candidates_dict: Dict[Tuple[int, int], Set[int]], cell: Tuple[int, int], value: int,
+                original_candidates_dict: Dict[Tuple[int, int], Set[int]]) -> bool:
+        """
+        Update the candidates of the empty cells after `value` is placed in `cell` (which must
+        already be removed from candidates_dict), then call _propagate(). The candidates of a
+        cell are saved in original_candidates_dict before they first change, so that the
+        caller can undo. Returns False if some empty cell is left without candidates.
+        """
+        changed = []
+        for (other, values) in self._get_elimination_sets(*cell, value).items():
+            if other in candidates_dict and candidates_dict[other] & values:
+                original_candidates_dict.setdefault(other, candidates_dict[other])
+                candidates_dict[other] = candidates_dict[other] - values
+                changed.append(other)
+        return self._propagate(candidates_dict, changed, original_candidates_dict)
+
+    def _propagate(self, candidates_dict: Dict[Tuple[int, int], Set[int]], cells: List[Tuple[int, int]],
+                   original_candidates_dict: Dict[Tuple[int, int], Set[int]]) -> bool:
+        """
+        Hook for extra pruning after the candidates of `cells` changed, with the same contract
+        as _assign(). Basic sudoku does none: its searches are fastest with plain candidates.
+        Variants with constraints between neighboring cells override this to call
+        _arc_consistency().
+        """
+        return True
+
+    def _arc_consistency(self, candidates_dict: Dict[Tuple[int, int], Set[int]], cells: List[Tuple[int, int]],
+                         original_candidates_dict: Dict[Tuple[int, int], Set[int]]) -> bool:
+        """
+        AC-3 propagation of the constraints between pairs of empty cells, starting from `cells`.
+        A value is removed from the candidates of a cell when every candidate of some neighbor
+        rules it out. For "different numbers" constraints (row, column, box, king and knight
+        moves) this only happens when the neighbor has a single candidate; the non-consecutive
+        constraint also acts when the neighbor has two or three candidates. Cells that lose
+        candidates are queued in turn, until nothing changes.
+        """
+        queue = deque(cells)
+        queued = set(cells)
+        while len(queue) > 0:
+            cell = queue.popleft()
+            queued.discard(cell)
+            if cell not in candidates_dict:
+                continue
+            # values ruled out at each neighbor by every candidate of cell
+            common = None
+            for value in candidates_dict[cell]:
+                eliminations = self._get_elimination_sets(*cell, value)
+                if common is None:
+                    common = eliminations
+                else:
+                    common = dict((other, common[other] & eliminations[other]) for other in common
+                                  if other in eliminations and common[other] & eliminations[other])
+                if len(common) == 0:
+                    break
+            for (other, values) in (common or {}).items():
+                if other in candidates_dict and candidates_dict[other] & values:
+                    original_candidates_dict.setdefault(other, candidates_dict[other])
+                    candidates_dict[other] = candidates_dict[other] - values
+                    if len(candidates_dict[other]) == 0:
+                        return False
+                    if other not in queued:
+                        queue.append(other)
+                        queued.add(other)
+        return True
+
     @staticmethod
     def get_board_ascii(minirows: int = 3, minicols: Optional[int] = None, board: Board = None) -> str:
         minicols = minicols if minicols else minirows
@@ -289,24 +446,39 @@ class Sudoku:
         if board is None:
             print('No board provided, returning')
             return
+
+        # matplotlib is slow to import, so only load it when an image is requested
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(6, 6))
+        self._draw_board(ax, board, original_board, title=title)
+
+        if save_path != '':
+            plt.savefig(save_path, bbox_inches='tight')
+        
+        plt.show()
+        plt.close(fig)
+
+    def _draw_board(self, ax, board: Board, original_board: Board = None, title: str = 'Sudoku') -> None:
+        """
+        Draw the given board on a matplotlib Axes. Digits in both board and original_board are in
+        black, digits in just board are in red.
+        """
+        from matplotlib.collections import LineCollection
         if original_board is None:
             original_board = board
-         
-        fig, ax = plt.subplots(figsize=(6, 6))
-    
-        # draw main grid (horizontal, then vertical)
-        for i in range(self.size+1):
-            lw = 2 if i % self.minirows == 0 else 0.5
-            ax.plot([0, self.size], [i, i], color='black', linewidth=lw)
-        for i in range(self.size+1):
-            lw = 2 if i % self.minicols == 0 else 0.5
-            ax.plot([i, i], [0, self.size], color='black', linewidth=lw)
+
+        # draw main grid (horizontal, then vertical) as a single collection
+        segments = [[(0, i), (self.size, i)] for i in range(self.size+1)] + \
+            [[(i, 0), (i, self.size)] for i in range(self.size+1)]
+        linewidths = [2 if i % self.minirows == 0 else 0.5 for i in range(self.size+1)] + \
+            [2 if i % self.minicols == 0 else 0.5 for i in range(self.size+1)]
+        ax.add_collection(LineCollection(segments, colors='black', linewidths=linewidths))
         
         # add numbers
         for i in range(self.size):
             for j in range(self.size):
-                if board[i][j] in list(range(1, self.size+1)):
-                    fontcolor = 'black' if original_board[i][j] in list(range(1, self.size+1)) else 'red'
+                if board[i][j] in range(1, self.size+1):
+                    fontcolor = 'black' if original_board[i][j] in range(1, self.size+1) else 'red'
                     ax.text(j + 0.5, self.size - 0.5 - i, str(board[i][j]), 
                             ha='center', va='center', fontsize=16, color=fontcolor)
         
@@ -319,11 +491,6 @@ class Sudoku:
         # add title
         ax.set_title(title, fontsize=20, pad=20)
 
-        if save_path != '':
-            plt.savefig(save_path, bbox_inches='tight')
-        
-        plt.show()
-
 
 class _SudokuSolver:
     def __init__(self, sudoku: Sudoku):
@@ -333,6 +500,8 @@ class _SudokuSolver:
         self.sudoku = sudoku
         self.is_valid_board = sudoku.is_valid_board
         self.original_board = sudoku.board
+        self.nodes = 0  # number of search nodes visited by backtracking_solve()
+        self.budget: Optional[SearchBudget] = None  # set by budgeted_solve()
     
     def ip_solve(self) -> Optional[Board]:
         """
@@ -343,6 +512,9 @@ class _SudokuSolver:
         if not self.is_valid_board:
             return None
 
+        # cvxpy is slow to import, so only load it when the IP solver is used
+        import cvxpy as cp
+
         # x[v][r][c]: 1 if value of cell (r,c) is v, 0 otherwise
         x = [cp.Variable((self.size, self.size), integer=True) for _ in range(self.size)]
         constraints = []
@@ -398,52 +570,194 @@ class _SudokuSolver:
         board admits multiple solutions, all solutions are returned. If there is no solution,
         empty list is returned.
         """
-        empty_cells = Sudoku._get_empty_cells(self.original_board)
+        return list(self.iter_solutions())
+
+    def budgeted_solve(self, max_nodes: Optional[int] = None,
+                       max_seconds: Optional[float] = None) -> SearchResult:
+        """
+        Solve the sudoku puzzle with backtracking, stopping after `max_nodes` search nodes or
+        `max_seconds` seconds (None for no limit). If the budget runs out, the result holds
+        the solutions found until then. In every case it also holds the cells fixed by
+        propagating naked singles from the original board.
+        """
+        start = time.perf_counter()
+        budget = SearchBudget(max_nodes, max_seconds)
+        budget.start()
+        fixed = self._get_fixed_cells() if self.is_valid_board else None
+        if fixed is None:
+            # propagation alone reached a contradiction
+            return SearchResult(NO_SOLUTION, seconds=time.perf_counter() - start)
+
+        solution_list = []
+        self.budget = budget
+        try:
+            for solution in self.iter_solutions():
+                solution_list.append(solution)
+            status = COMPLETED if len(solution_list) > 0 else NO_SOLUTION
+        except SearchBudgetExhausted as e:
+            status = e.status
+        finally:
+            self.budget = None
+        return SearchResult(status, solution_list, fixed, self.nodes, time.perf_counter() - start)
+
+    def _get_fixed_cells(self) -> Optional[Dict[Tuple[int, int], int]]:
+        """
+        Starting from the original board, repeatedly fill empty cells that have a single
+        candidate. Returns the cells filled this way as a dict {(r,c): value}, or None if
+        some cell is left with no candidates (so the board has no solution).
+        """
+        board = Sudoku._copy_board(self.original_board)
         candidates_dict = {}
-        for (r,c) in empty_cells:
-            candidates_dict[(r,c)] = self.sudoku._get_candidates_for_cell(
-                r, c, self.original_board)
+        for (r,c) in Sudoku._get_empty_cells(board):
+            candidates_dict[(r,c)] = self.sudoku._get_candidates_for_cell(r, c, board)
+
+        fixed = {}
+        while True:
+            single = next((cell for cell, v in candidates_dict.items() if len(v) <= 1), None)
+            if single is None:
+                return fixed
+            candidates = candidates_dict.pop(single)
+            if len(candidates) == 0:
+                return None
+            (r,c) = single
+            board[r][c] = fixed[single] = next(iter(candidates))
+            for (i,j) in self.sudoku._get_neighbors_for_cell(r, c) & candidates_dict.keys():
+                candidates_dict[(i,j)] = self.sudoku._get_candidates_for_cell(i, j, board)
+
+    def iter_solutions(self, candidates_dict: Optional[Dict[Tuple[int, int], Set[int]]] = None
+                       ) -> Iterator[Board]:
+        """
+        Yield the solutions of the sudoku puzzle one at a time, in the same order as
+        backtracking_solve() returns them. The search is suspended between solutions, so
+        the consumer can stop early without the remaining solutions being computed.
+
+        :param candidates_dict: Optional candidates of every empty cell of the original board,
+        to warm-start the search when they are already known. It is modified by the search.
+        """
+        if candidates_dict is None:
+            empty_cells = Sudoku._get_empty_cells(self.original_board)
+            candidates_dict = {}
+            for (r,c) in empty_cells:
+                candidates_dict[(r,c)] = self.sudoku._get_candidates_for_cell(
+                    r, c, self.original_board)
         
-        solution_list = []
         current_board = Sudoku._copy_board(self.original_board)
-        self._do_backtracking(current_board, candidates_dict, solution_list)
-
-        return solution_list
+        self.nodes = 0
+        if self.sudoku._propagate(candidates_dict, list(candidates_dict.keys()), {}):
+            yield from self._do_backtracking(current_board, candidates_dict)
     
-    def _do_backtracking(self, current_board: Board, candidates_dict: Dict[Tuple[int, int], Set[int]],
-                         solution_list: List[Board]) -> None:
+    def count_solutions(self, limit: Optional[int] = None) -> int:
+        """
+        Count the solutions of the sudoku puzzle, stopping at `limit`. Full counts of standard
+        sudoku, and bounded counts up to 9x9, use the memoized engine of counting.py, which is
+        far faster on boards with many solutions. Otherwise (variants, or bounded counts on
+        larger boards, where the search for the first few solutions benefits most from
+        choosing the most constrained cell) this is the search of iter_solutions(), counting
+        instead of copying boards.
+        """
+        assert limit is None or limit >= 1, 'limit must be >= 1'
+        if type(self.sudoku) is Sudoku and (limit is None or self.size <= 9):
+            # counting.py imports this module
+            from .counting import count_completions
+            return count_completions(self.sudoku, limit)
+        if not self.is_valid_board:
+            return 0
+        candidates_dict = {}
+        for (r,c) in Sudoku._get_empty_cells(self.original_board):
+            candidates_dict[(r,c)] = self.sudoku._get_candidates_for_cell(r, c, self.original_board)
+        self.nodes = 0
+        if not self.sudoku._propagate(candidates_dict, list(candidates_dict.keys()), {}):
+            return 0
+        return self._do_count(candidates_dict, limit)
+
+    def _do_count(self, candidates_dict: Dict[Tuple[int, int], Set[int]], limit: Optional[int]) -> int:
+        self.nodes += 1
+        check_cancelled()
+        if self.budget is not None:
+            self.budget.check(self.nodes)
+        if len(candidates_dict) == 0:
+            return 1
+        current_cell = min(candidates_dict, key=lambda cell: len(candidates_dict[cell]))
+        current_candidates = candidates_dict.pop(current_cell)
+        count = 0
+        for candidate in current_candidates:
+            original_candidates_dict = {}
+            if self.sudoku._assign(candidates_dict, current_cell, candidate, original_candidates_dict):
+                count += self._do_count(candidates_dict, None if limit is None else limit - count)
+            candidates_dict.update(original_candidates_dict)
+            if limit is not None and count >= limit:
+                break
+        candidates_dict[current_cell] = current_candidates
+        return count
+
+    def _do_backtracking(self, current_board: Board,
+                         candidates_dict: Dict[Tuple[int, int], Set[int]]) -> Iterator[Board]:
+        self.nodes += 1
+        check_cancelled()
+        if self.budget is not None:
+            self.budget.check(self.nodes)
         if len(candidates_dict) == 0:
             # recursion base case 1: no more empty cells
-            solution_list.append(Sudoku._copy_board(current_board))
-            return
+            yield Sudoku._copy_board(current_board)
         elif 0 in [len(v) for v in candidates_dict.values()]:
             # recursion base case 2: at least one remaiing empty cell has no candidates
             return
         else:
             # recursive case
-            # pick an empty cell and fill it (choose a cell with fewest candidates)
+            # pick an empty cell and fill it (choose a cell with fewest candidates, breaking ties
+            # by position, as the order of candidates_dict changes as it backtracks)
             # update the candidates dictionary
-            candidates_list = sorted(candidates_dict.items(), key=lambda item: len(item[1]))
-            current_cell = candidates_list[0][0]
+            current_cell = min(candidates_dict, key=lambda k: (len(candidates_dict[k]), k))
             (current_row, current_col) = current_cell
-            current_candidates = candidates_list[0][1]
+            current_candidates = candidates_dict[current_cell]
             for candidate in current_candidates:
                 # explore
                 original_candidates_dict = {current_cell: current_candidates}
                 current_board[current_row][current_col] = candidate
-                current_neighbors = self.sudoku._get_neighbors_for_cell(current_row, current_col)
-                current_neighbors = current_neighbors & set(candidates_dict.keys())
-                for (r,c) in current_neighbors:
-                    original_candidates_dict[(r,c)] = candidates_dict[(r,c)]
-                    candidates_dict[(r,c)] = self.sudoku._get_candidates_for_cell(r, c, current_board)
                 del candidates_dict[current_cell]
-                self._do_backtracking(current_board, candidates_dict, solution_list)
+                if self.sudoku._assign(candidates_dict, current_cell, candidate, original_candidates_dict):
+                    yield from self._do_backtracking(current_board, candidates_dict)
 
                 # undo recursion
                 current_board[current_row][current_col] = EMPTY
                 for cell in original_candidates_dict:
                     candidates_dict[cell] = original_candidates_dict[cell]
 
+    def _random_probe(self, rng: random.Random) -> int:
+        """
+        One probe of Knuth's tree-size estimator: follow a random path from the root of the
+        search tree of iter_solutions() to a leaf, choosing uniformly among the children of
+        each node. Returns 1 + d1 + d1*d2 + ..., where d1, d2, ... are the numbers of children
+        of the nodes on the path. Its expected value is the number of nodes of the tree.
+        """
+        candidates_dict = {}
+        for (r,c) in Sudoku._get_empty_cells(self.original_board):
+            candidates_dict[(r,c)] = self.sudoku._get_candidates_for_cell(r, c, self.original_board)
+        if not self.sudoku._propagate(candidates_dict, list(candidates_dict.keys()), {}):
+            return 0
+
+        estimate = weight = 1
+        while len(candidates_dict) > 0:
+            check_cancelled()
+            # the cell _do_backtracking() picks
+            cell = min(candidates_dict, key=lambda k: (len(candidates_dict[k]), k))
+            candidates = candidates_dict[cell]
+            children = []
+            for candidate in candidates:
+                child = dict(candidates_dict)
+                del child[cell]
+                if self.sudoku._assign(child, cell, candidate, {}):
+                    children.append(candidate)
+            if len(children) == 0:
+                break
+            weight *= len(children)
+            estimate += weight
+            # assign the chosen value again, as it must be the last one assigned to the cell
+            # (KillerSudoku records it)
+            del candidates_dict[cell]
+            self.sudoku._assign(candidates_dict, cell, rng.choice(children), {})
+        return estimate
+
 
 if __name__ == '__main__':
 
@@ -0,0 +1,142 @@
+from html import escape
+from typing import List, Optional, Union
+
+from .rect import Rect
+from .shikaku import Shikaku
+from .sudoku import Board, Sudoku
+
+"""
+SVG rendering of puzzles, built as plain strings.
+
+The output matches the matplotlib images of show_as_image() and show_solution_as_image()
+(thick box borders, given digits in black and solved digits in red, Shikaku rectangles as
+thick outlines), but needs no plotting library and takes well under a millisecond per
+board, so it suits web pages and bulk export. Sizes are in pixels of the SVG's own
+coordinate system; the image scales freely when displayed.
+"""
+Puzzle = Union[Sudoku, Shikaku]
+
+GIVEN_COLOR = 'black'
+SOLVED_COLOR = 'red'
+
+
+def to_svg(puzzle: Puzzle, solution: bool = False, title: str = '', cell_size: int = 40,
+           save_path: str = '') -> str:
+    """
+    Render a Sudoku (or variant) or Shikaku puzzle as an SVG document. If `solution` is True,
+    the solution is drawn instead of the original board (solved digits in red for Sudoku,
+    rectangles for Shikaku). The SVG is returned, and also written to save_path if one is
+    given.
+
+    :raises ValueError: If `solution` is True but the puzzle has no solution.
+    """
+    if solution and puzzle.solution is None:
+        raise ValueError('Puzzle has no solution to render; call solve() first')
+    if isinstance(puzzle, Shikaku):
+        svg = shikaku_to_svg(puzzle, puzzle.solution if solution else None, title, cell_size)
+    elif solution:
+        svg = sudoku_to_svg(puzzle, puzzle.solution, puzzle.board, title, cell_size)
+    else:
+        svg = sudoku_to_svg(puzzle, puzzle.board, title=title, cell_size=cell_size)
+    if save_path != '':
+        with open(save_path, 'w') as f:
+            f.write(svg)
+    return svg
+
+
+def sudoku_to_svg(sudoku: Sudoku, board: Board, original_board: Optional[Board] = None,
+                  title: str = '', cell_size: int = 40) -> str:
+    """
+    Render `board` on the grid of `sudoku`. Digits in both board and original_board are in
+    black, digits in just board are in red.
+    """
+    if original_board is None:
+        original_board = board
+    size = sudoku.size
+    margin = cell_size // 2
+    top = margin + (cell_size if title else 0)
+    width = size * cell_size
+
+    parts = _header(width + 2 * margin, top + width + margin, title, margin + width / 2, top - margin / 2,
+                    cell_size)
+    # thin lines first, so that the box borders are drawn over them
+    thin, thick = [], []
+    for i in range(size + 1):
+        (thick if i % sudoku.minirows == 0 else thin).append(
+            'M{} {}h{}'.format(margin, top + i * cell_size, width))
+        (thick if i % sudoku.minicols == 0 else thin).append(
+            'M{} {}v{}'.format(margin + i * cell_size, top, width))
+    parts.append(_path(thin, cell_size / 40))
+    parts.append(_path(thick, cell_size / 16))
+
+    given, solved = [], []
+    for i in range(size):
+        for j in range(size):
+            value = board[i][j]
+            if value in range(1, size + 1):
+                text = _text(margin + (j + 0.5) * cell_size, top + (i + 0.5) * cell_size, value)
+                (given if original_board[i][j] in range(1, size + 1) else solved).append(text)
+    parts.append(_group(given, GIVEN_COLOR, cell_size * 0.5))
+    parts.append(_group(solved, SOLVED_COLOR, cell_size * 0.5))
+    parts.append('</svg>\n')
+    return ''.join(parts)
+
+
+def shikaku_to_svg(shikaku: Shikaku, solution: Optional[List[Rect]] = None, title: str = '',
+                   cell_size: int = 40) -> str:
+    """
+    Render the board of `shikaku`, with the rectangles of `solution` outlined if given.
+    """
+    margin = cell_size
+    top = margin + (cell_size if title else 0)
+    width, height = shikaku.cols * cell_size, shikaku.rows * cell_size
+
+    parts = _header(width + 2 * margin, top + height + margin, title, margin + width / 2, top - margin / 2,
+                    cell_size)
+    grid = ['M{} {}h{}'.format(margin, top + i * cell_size, width) for i in range(shikaku.rows + 1)] + \
+        ['M{} {}v{}'.format(margin + i * cell_size, top, height) for i in range(shikaku.cols + 1)]
+    parts.append(_path(grid, cell_size / 40))
+
+    numbers = [_text(margin + (c + 0.5) * cell_size, top + (r + 0.5) * cell_size, val)
+               for (_, r, c, val) in shikaku.anchors]
+    parts.append(_group(numbers, GIVEN_COLOR, cell_size * 0.4))
+
+    if solution is not None:
+        outlines = ['M{} {}h{}v{}h-{}z'.format(margin + rect.c1 * cell_size, top + rect.r1 * cell_size,
+                                               (rect.c2 - rect.c1 + 1) * cell_size,
+                                               (rect.r2 - rect.r1 + 1) * cell_size,
+                                               (rect.c2 - rect.c1 + 1) * cell_size)
+                    for rect in solution]
+        parts.append(_path(outlines, cell_size * 3 / 40))
+    parts.append('</svg>\n')
+    return ''.join(parts)
+
+
+def _header(width: float, height: float, title: str, title_x: float, title_y: float,
+            cell_size: int) -> List[str]:
+    parts = ['<svg xmlns="http://www.w3.org/2000/svg" width="{0:g}" height="{1:g}" viewBox="0 0 {0:g} {1:g}">\n'
+             .format(width, height),
+             '<rect width="100%" height="100%" fill="white"/>\n']
+    if title:
+        parts.append('<text x="{:g}" y="{:g}" text-anchor="middle" dominant-baseline="central" '
+                     'font-family="sans-serif" font-size="{:g}">{}</text>\n'
+                     .format(title_x, title_y, cell_size * 0.6, escape(title)))
+    return parts
+
+
+def _path(commands: List[str], stroke_width: float) -> str:
+    if len(commands) == 0:
+        return ''
+    return '<path d="{}" fill="none" stroke="black" stroke-width="{:g}" stroke-linecap="square"/>\n'.format(
+        ''.join(commands), stroke_width)
+
+
+def _text(x: float, y: float, value: int) -> str:
+    return '<text x="{:g}" y="{:g}">{}</text>'.format(x, y, value)
+
+
+def _group(texts: List[str], color: str, font_size: float) -> str:
+    if len(texts) == 0:
+        return ''
+    return ('<g fill="{}" font-family="sans-serif" font-size="{:g}" text-anchor="middle" '
+            'dominant-baseline="central">{}</g>\n').format(color, font_size, ''.join(texts))
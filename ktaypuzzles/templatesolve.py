@@ -0,0 +1,170 @@
+from typing import Iterator, List, Optional, Tuple
+
+from .search import check_cancelled
+from .sudoku import Board, Sudoku
+
+"""
+Template solver for the standard 9x9 Sudoku.
+
+A template is one valid placement of a single digit: nine cells, one in each row, column and
+box. There are 46,656 of them, stored as 81-bit ints with bit 9*r+c set for cell (r,c), and
+computed once on first use. For each digit, only the templates that cover all of its givens
+and none of the other givens are kept. A solution is then one template per digit with no
+two templates overlapping, which is found by depth-first search using bitwise ANDs only:
+take the digit with the fewest compatible templates left, try each of them, and drop the
+templates of the other digits that overlap it.
+
+This only applies to plain 9x9 Sudoku (not the variants, which add constraints between
+digits, nor other sizes). For those boards it is a fast alternative to _SudokuSolver for
+batch solving and for counting solutions.
+"""
+NUM_TEMPLATES = 46656
+
+_templates: Optional[List[int]] = None
+_templates_by_cell: Optional[List[List[int]]] = None  # templates covering each cell
+
+
+def get_templates() -> List[int]:
+    """
+    Return the 46,656 placements of a digit on a 9x9 board, as 81-bit ints.
+    """
+    global _templates, _templates_by_cell
+    if _templates is None:
+        templates = []
+        _add_templates(0, 0, 0, templates)
+        assert len(templates) == NUM_TEMPLATES
+        by_cell = [[] for _ in range(81)]
+        for t in templates:
+            for i in _cells(t):
+                by_cell[i].append(t)
+        _templates, _templates_by_cell = templates, by_cell
+    return _templates
+
+
+def _add_templates(r: int, used_cols: int, template: int, templates: List[int]) -> None:
+    if r == 9:
+        templates.append(template)
+        return
+    band_start = r - r % 3
+    for c in range(9):
+        if used_cols >> c & 1:
+            continue
+        # the box (band, c // 3) must not already hold the digit in an earlier row of the band
+        if any(template >> (9 * i + c - c % 3) & 0b111 for i in range(band_start, r)):
+            continue
+        _add_templates(r + 1, used_cols | 1 << c, template | 1 << (9 * r + c), templates)
+
+
+def _cells(template: int) -> Iterator[int]:
+    """
+    Yield the indices 9*r+c of the cells of a template.
+    """
+    while template:
+        low = template & -template
+        yield low.bit_length() - 1
+        template ^= low
+
+
+def _check_sudoku(sudoku: Sudoku) -> None:
+    assert type(sudoku) is Sudoku and sudoku.minirows == 3 and sudoku.minicols == 3, \
+        'The template solver only applies to standard 9x9 Sudoku'
+
+
+def _get_candidate_templates(board: Board) -> Optional[List[List[int]]]:
+    """
+    For each digit 1..9, the templates compatible with the givens of `board`. Returns None if
+    some digit has none.
+    """
+    givens = [0] * 10
+    given_cells = [-1] * 10  # one cell holding each digit, if any
+    for r in range(9):
+        for c in range(9):
+            if board[r][c]:  # skip EMPTY (or 0)
+                givens[board[r][c]] |= 1 << (9 * r + c)
+                given_cells[board[r][c]] = 9 * r + c
+    all_givens = sum(givens)
+    all_templates = get_templates()
+    candidates = []
+    for value in range(1, 10):
+        own, others = givens[value], all_givens & ~givens[value]
+        # only a ninth of the templates cover any one given
+        pool = _templates_by_cell[given_cells[value]] if given_cells[value] >= 0 else all_templates
+        templates = [t for t in pool if t & own == own and not t & others]
+        if len(templates) == 0:
+            return None
+        candidates.append(templates)
+    return candidates
+
+
+def iter_template_solutions(sudoku: Sudoku) -> Iterator[Board]:
+    """
+    Yield the solutions of a 9x9 Sudoku one at a time, in no particular order.
+    """
+    _check_sudoku(sudoku)
+    if not sudoku.is_valid_board:
+        return
+    candidates = _get_candidate_templates(sudoku.board)
+    if candidates is None:
+        return
+    for choice in _search(list(range(1, 10)), candidates):
+        solution = Sudoku.get_empty_board(3, 3)
+        for (value, template) in choice:
+            for i in _cells(template):
+                solution[i // 9][i % 9] = value
+        yield solution
+
+
+def _search(values: List[int], candidates: List[List[int]]) -> Iterator[List[Tuple[int, int]]]:
+    """
+    Yield every choice of one template per value, with no two templates overlapping.
+    candidates[i] are the templates left for values[i], none of which overlaps a template
+    already chosen.
+    """
+    check_cancelled()
+    if len(values) == 0:
+        yield []
+        return
+    i = min(range(len(values)), key=lambda k: len(candidates[k]))
+    rest_values = values[:i] + values[i+1:]
+    rest_candidates = candidates[:i] + candidates[i+1:]
+    for template in candidates[i]:
+        filtered = []
+        for templates in rest_candidates:
+            templates = [t for t in templates if not t & template]
+            if len(templates) == 0:
+                break
+            filtered.append(templates)
+        else:
+            for choice in _search(rest_values, filtered):
+                yield [(values[i], template)] + choice
+
+
+def template_solve(sudoku: Sudoku) -> List[Board]:
+    """
+    Return all solutions of a 9x9 Sudoku (the same set as backtracking_solve()). As with
+    Sudoku.solve(), the first one is saved as sudoku.solution.
+    """
+    solutions = list(iter_template_solutions(sudoku))
+    sudoku.is_solved = len(solutions) > 0
+    sudoku.solution = solutions[0] if sudoku.is_solved else None
+    return solutions
+
+
+def template_count(sudoku: Sudoku, limit: Optional[int] = None) -> int:
+    """
+    Return the number of solutions of a 9x9 Sudoku, or `limit` if there are at least that
+    many (e.g. limit=2 to check that the solution is unique). Solutions are never built.
+    """
+    _check_sudoku(sudoku)
+    assert limit is None or limit >= 1, 'limit must be >= 1'
+    if not sudoku.is_valid_board:
+        return 0
+    candidates = _get_candidate_templates(sudoku.board)
+    if candidates is None:
+        return 0
+    count = 0
+    for _ in _search(list(range(1, 10)), candidates):
+        count += 1
+        if count == limit:
+            break
+    return count
@@ -0,0 +1,67 @@
+import math
+import random
+import statistics
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+from .shikaku import Shikaku
+from .sudoku import Sudoku
+
+"""
+Estimating the size of the backtracking search tree without searching it.
+
+Knuth's random-probe method: walk from the root to a leaf, picking a child uniformly at
+random at every node, and sum the products d1, d1*d2, ... of the branching factors along the
+way (plus 1 for the root). This is an unbiased estimate of the number of nodes in the tree,
+i.e. of the `nodes` count backtracking_solve() would report, at the cost of one path instead
+of the whole tree. Averaging many probes narrows it down. The probes branch on the same cell
+(or anchor) as the search at every node, breaking ties between equally constrained ones by
+position: a probe that broke them differently would estimate the tree of another search,
+which on hard puzzles can be several times smaller or larger.
+
+The estimates are heavy-tailed: a rare probe that goes down a bushy subtree can be far
+larger than the rest, so the confidence interval (from the normal approximation) is only a
+rough guide for small numbers of probes. They are still good for ranking candidate puzzles,
+or rejecting ones whose tree is orders of magnitude too large, for a few milliseconds each.
+"""
+Puzzle = Union[Sudoku, Shikaku]
+
+
+@dataclass
+class TreeSizeEstimate:
+    """
+    Estimated size of a backtracking search tree.
+
+    nodes: estimated number of search nodes (the mean of the probes).
+    low, high: confidence interval for the number of nodes.
+    probes: number of random probes made.
+    std_error: standard error of the mean.
+    """
+    nodes: float
+    low: float
+    high: float
+    probes: int
+    std_error: float
+
+
+def estimate_tree_size(puzzle: Puzzle, probes: int = 100, confidence: float = 0.95,
+                       seed: Optional[int] = None) -> TreeSizeEstimate:
+    """
+    Estimate the number of nodes backtracking_solve() would visit on `puzzle` (any Sudoku
+    variant, or Shikaku) from `probes` random probes.
+
+    :param confidence: Coverage of the confidence interval.
+    :param seed: Seed for the random probes, for reproducible estimates.
+    """
+    assert probes >= 1, 'probes must be >= 1'
+    assert 0 < confidence < 1, 'confidence must be in (0,1)'
+    rng = random.Random(seed)
+    solver = puzzle._get_solver()
+    samples: List[int] = [solver._random_probe(rng) for _ in range(probes)]
+
+    mean = statistics.fmean(samples)
+    std_error = statistics.stdev(samples) / math.sqrt(probes) if probes > 1 else math.inf
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    # the root is always visited
+    low = max(mean - z * std_error, min(mean, 1))
+    return TreeSizeEstimate(mean, low, mean + z * std_error, probes, std_error)
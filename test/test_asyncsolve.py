@@ -0,0 +1,56 @@
+import asyncio
+import random
+import time
+import pytest
+from ktaypuzzles.asyncsolve import AsyncSolver
+from ktaypuzzles.kingsudoku import KingSudoku
+from ktaypuzzles.shikaku import Shikaku
+from ktaypuzzles.sudoku import Sudoku
+
+VALID_BOARD_2 = [
+    [3,4,0,0,0,0],
+    [0,0,6,0,0,0],
+    [4,0,0,2,0,0],
+    [1,5,0,0,0,0],
+    [0,0,0,0,6,5],
+    [0,0,0,3,0,0]
+]
+
+def test_solve():
+    async def main():
+        async with AsyncSolver(max_concurrent=2) as solver:
+            sudoku = Sudoku(2, 3, board=VALID_BOARD_2)
+            shikaku = Shikaku([[0, 4, 0, 0], [0, 0, 0, 4], [0, 4, 4, 0], [0, 0, 0, 0]])
+            return await asyncio.gather(solver.solve(sudoku), solver.solve(shikaku)), sudoku, shikaku
+    (sudoku_solutions, shikaku_solution), sudoku, shikaku = asyncio.run(main())
+    assert len(sudoku_solutions) == 1
+    assert sudoku.solution == sudoku_solutions[0]
+    assert shikaku.solution == shikaku_solution
+
+def test_generate():
+    async def main():
+        async with AsyncSolver() as solver:
+            sudoku = KingSudoku(2, 3)
+            await solver.generate(sudoku, blank_proportion=0.5)
+            return sudoku
+    random.seed(1)
+    sudoku = asyncio.run(main())
+    assert sudoku.blank_count > 0
+    assert len(sudoku.solve()) == 1
+
+def test_solve_timeout():
+    # an empty 16x16 board has far too many solutions to enumerate
+    async def main():
+        async with AsyncSolver(max_concurrent=1) as solver:
+            sudoku = Sudoku(4)
+            start = time.perf_counter()
+            with pytest.raises(asyncio.TimeoutError):
+                await solver.solve(sudoku, timeout=0.2)
+            # the worker has actually stopped, so the only slot is free again
+            small = Sudoku(2, 3, board=VALID_BOARD_2)
+            await solver.solve(small, timeout=5)
+            return sudoku, small, time.perf_counter() - start
+    sudoku, small, elapsed = asyncio.run(main())
+    assert sudoku.solution is None
+    assert small.is_solved
+    assert elapsed < 5
@@ -0,0 +1,71 @@
+import numpy as np
+from ktaypuzzles.batchsolve import SOLUTION_LIMIT, SOLVED, solve_boards_shared, solve_many
+from ktaypuzzles.kingsudoku import KingSudoku
+from ktaypuzzles.search import COMPLETED, NO_SOLUTION, TIME_LIMIT
+from ktaypuzzles.sudoku import Sudoku
+
+VALID_BOARD_2 = [
+    [3,4,0,0,0,0],
+    [0,0,6,0,0,0],
+    [4,0,0,2,0,0],
+    [1,5,0,0,0,0],
+    [0,0,0,0,6,5],
+    [0,0,0,3,0,0]
+]
+
+def test_solve_many():
+    responses = solve_many([
+        {'variant': 'sudoku', 'minirows': 2, 'minicols': 3, 'board': VALID_BOARD_2, 'max_solutions': 2},
+        {'variant': 'sudoku', 'minirows': 2, 'board': [[0] * 4] * 4, 'max_solutions': 3},
+        {'variant': 'sudoku', 'minirows': 2, 'board': [[1, 1, 0, 0]] + [[0] * 4] * 3},
+        {'variant': 'shikaku', 'board': [[0, 4, 0, 0], [0, 0, 0, 4], [0, 4, 4, 0], [0, 0, 0, 0]],
+         'max_solutions': 2},
+    ])
+    assert responses[0] == {'status': COMPLETED,
+                            'solutions': Sudoku(2, 3, board=VALID_BOARD_2).solve()}
+    assert responses[1]['status'] == SOLUTION_LIMIT
+    assert len(responses[1]['solutions']) == 3
+    assert responses[2] == {'status': NO_SOLUTION, 'solutions': []}
+    assert responses[3]['status'] == SOLUTION_LIMIT
+    assert responses[3]['solutions'][0] == [[0, 0, 0, 3], [1, 1, 0, 3], [2, 3, 0, 1], [2, 3, 2, 3]]
+    assert len(responses[3]['solutions']) == 2
+
+def test_generate():
+    (response,) = solve_many([{'op': 'generate', 'variant': 'king', 'minirows': 2, 'minicols': 3}])
+    assert KingSudoku(2, 3, board=response['solution']).is_solved
+    puzzle = KingSudoku(2, 3, board=response['board'])
+    assert puzzle.solve() == [response['solution']]
+
+def test_time_limit():
+    responses = solve_many([
+        {'variant': 'sudoku', 'minirows': 3, 'board': [[0] * 9] * 9, 'max_solutions': 10**9,
+         'max_seconds': 0.1},
+        {'op': 'generate', 'variant': 'nonconsec', 'minirows': 3, 'max_seconds': 0.1},
+    ])
+    assert responses[0]['status'] == TIME_LIMIT
+    assert len(responses[0]['solutions']) > 0
+    assert responses[1] == {'status': TIME_LIMIT}
+
+def test_errors():
+    responses = solve_many([
+        {'variant': 'hexagon', 'minirows': 3, 'board': []},
+        {'variant': 'sudoku', 'board': [[0] * 4] * 4},
+        {'op': 'explode'},
+        {'variant': 'sudoku', 'minirows': 3, 'board': [[0] * 4] * 4},
+    ])
+    assert all('error' in response for response in responses)
+
+def test_solve_boards_shared():
+    invalid = [[3,3,0,0,0,0]] + VALID_BOARD_2[1:]
+    unsolvable = [[0,0,0,0,1,2],[3,4,5,0,0,0]] + [[0] * 6] * 4
+    boards = [VALID_BOARD_2, invalid, unsolvable, [[0] * 6] * 6] * 5
+    solutions, statuses = solve_boards_shared('sudoku', 2, boards, minicols=3, processes=2, chunk_size=3)
+    assert solutions.shape == (20, 6, 6)
+    assert statuses == [SOLVED, NO_SOLUTION, NO_SOLUTION, SOLVED] * 5
+    assert solutions[0].tolist() == Sudoku(2, 3, board=VALID_BOARD_2).solve()[0]
+    assert not solutions[1].any() and not solutions[2].any()
+    assert Sudoku(2, 3, board=solutions[3].tolist()).is_solved
+
+    same, _ = solve_boards_shared('sudoku', 2, np.array(boards, dtype=np.uint8), minicols=3, processes=1)
+    assert (same == solutions).all()
+    assert solve_boards_shared('king', 2, [])[1] == []
@@ -0,0 +1,65 @@
+import json
+import pytest
+from ktaypuzzles.checkpoint import CheckpointedSearch, split_checkpoint
+from ktaypuzzles.kingsudoku import KingSudoku
+from ktaypuzzles.sudoku import Sudoku
+
+VALID_BOARD_2 = [
+    [3,4,0,0,0,0],
+    [0,0,6,0,0,0],
+    [4,0,0,2,0,0],
+    [1,5,0,0,0,0],
+    [0,0,0,0,6,5],
+    [0,0,0,3,0,0]
+]
+
+def sorted_solutions(solutions):
+    return sorted(solutions, key=lambda board: [cell for row in board for cell in row])
+
+def test_count(tmp_path):
+    path = str(tmp_path / 'search.json')
+    search = CheckpointedSearch(Sudoku(2), path)
+    assert search.count() == 288
+    assert search.is_complete
+    with open(path) as f:
+        assert json.load(f)['is_complete']
+    assert CheckpointedSearch(Sudoku(2, 3, board=VALID_BOARD_2), path).count() == 1
+    assert CheckpointedSearch(Sudoku(2, board=[[1, 1, 0, 0]] + [[0] * 4] * 3), path).count() == 0
+
+def test_resume(tmp_path):
+    path = str(tmp_path / 'search.json')
+    board = [[1, 3, 0, 0, 0, 0]] + [[0] * 6] * 5
+    all_solutions = list(CheckpointedSearch(KingSudoku(2, 3, board=board), path).iter_solutions())
+    assert sorted_solutions(all_solutions) == sorted_solutions(KingSudoku(2, 3, board=board).solve())
+
+    search = CheckpointedSearch(KingSudoku(2, 3, board=board), path, interval=0)
+    first = []
+    for solution in search.iter_solutions():
+        first.append(solution)
+        if len(first) == 5:
+            break
+    # the last solution was found after the last checkpoint, so it is found again
+    resumed = CheckpointedSearch.resume(path)
+    assert type(resumed.sudoku) is KingSudoku and resumed.solutions == 4
+    assert first[:4] + list(resumed.iter_solutions()) == all_solutions
+    assert resumed.solutions == len(all_solutions) and resumed.is_complete
+    assert list(CheckpointedSearch.resume(path).iter_solutions()) == []
+
+def test_split(tmp_path):
+    path = str(tmp_path / 'search.json')
+    board = [[1, 2, 3, 4, 5, 6], [4, 5, 6, 1, 2, 3]] + [[0] * 6] * 4
+    search = CheckpointedSearch(Sudoku(2, 3, board=board), path, interval=0)
+    for i, _ in enumerate(search.iter_solutions()):
+        if i == 100:
+            break
+    outputs = [str(tmp_path / 'part{}.json'.format(k)) for k in range(3)]
+    written = split_checkpoint(path, outputs)
+    assert written == outputs
+    total = sum(CheckpointedSearch.resume(part).count() for part in written)
+    assert total == len(Sudoku(2, 3, board=board).solve())
+
+def test_invalid_checkpoint(tmp_path):
+    path = tmp_path / 'search.json'
+    path.write_text(json.dumps({'version': 0}))
+    with pytest.raises(ValueError):
+        CheckpointedSearch.resume(str(path))
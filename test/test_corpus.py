@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from ktaypuzzles.corpus import HEADER, VARIANT_IDS, Corpus, unpack_cells, write_corpus
+from ktaypuzzles.kingsudoku import KingSudoku
+from ktaypuzzles.puzzlebank import VARIANTS
+from ktaypuzzles.sudoku import Sudoku
+
+VALID_BOARD_1 = [
+    [0,0,0,0,0,3,5,0,0],
+    [0,7,0,0,0,0,0,8,1],
+    [0,0,0,1,0,8,9,0,0],
+    [4,0,0,9,2,0,3,0,0],
+    [7,0,0,0,0,4,0,0,0],
+    [1,0,0,0,0,0,6,9,0],
+    [6,0,0,4,0,9,0,0,0],
+    [0,0,0,6,0,0,0,0,3],
+    [0,3,0,0,0,0,2,0,0]
+]
+
+def test_write_and_read(tmp_path):
+    path = str(tmp_path / 'corpus.bin')
+    solution = Sudoku(board=VALID_BOARD_1).solve()[0]
+    empty = Sudoku.get_empty_board()
+    assert write_corpus(path, 'sudoku', 3, [VALID_BOARD_1, solution, empty],
+                        solutions=[solution, solution, solution]) == 3
+    with Corpus(path) as corpus:
+        assert (len(corpus), corpus.variant, corpus.size, corpus.has_solutions) == (3, 'sudoku', 9, True)
+        sudoku = corpus[0]
+        assert type(sudoku) is Sudoku
+        assert [[cell or 0 for cell in row] for row in sudoku.board] == VALID_BOARD_1
+        assert sudoku.solution == solution
+        assert corpus.get_board(-1) == empty
+        assert corpus.get_solution(1) == solution
+        with pytest.raises(IndexError):
+            corpus.get_board(3)
+
+        boards, solutions = corpus.boards, corpus.solutions
+        assert boards.shape == (3, 9, 9) and not boards.flags.writeable
+        assert boards[0].tolist() == VALID_BOARD_1
+        assert (solutions == np.array(solution)).all()
+        del boards, solutions
+
+def test_packed(tmp_path):
+    path = str(tmp_path / 'corpus.bin')
+    random_boards = []
+    for _ in range(5):
+        puzzle = KingSudoku(2, 3)
+        puzzle.generate_puzzle_board(0.5)
+        random_boards.append(puzzle.board)
+    write_corpus(path, 'king', 2, random_boards, minicols=3, packed=True)
+    with Corpus(path) as corpus:
+        assert corpus.packed and not corpus.has_solutions and corpus.record_size == 18
+        assert type(corpus[2]) is KingSudoku
+        assert [corpus.get_board(i) for i in range(5)] == random_boards
+        unpacked = unpack_cells(corpus.boards, corpus.size)
+        assert unpacked[4].tolist() == [[cell or 0 for cell in row] for row in random_boards[4]]
+        with pytest.raises(ValueError):
+            corpus.get_solution(0)
+
+def test_sample_and_shard(tmp_path):
+    path = str(tmp_path / 'corpus.bin')
+    write_corpus(path, 'sudoku', 2, np.zeros((10, 4, 4), dtype=np.uint8))
+    with Corpus(path) as corpus:
+        assert sorted(corpus.sample(10, seed=0)) == list(range(10))
+        assert corpus.sample(3, seed=1) == corpus.sample(3, seed=1)
+        shards = [corpus.shard(i, 3) for i in range(3)]
+        assert [list(s) for s in shards] == [[0, 1, 2], [3, 4, 5], [6, 7, 8, 9]]
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / 'corpus.bin'
+    path.write_bytes(b'not a corpus' * 10)
+    with pytest.raises(ValueError):
+        Corpus(str(path))
+    write_corpus(str(path), 'sudoku', 2, [Sudoku.get_empty_board(2)] * 4)
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        Corpus(str(path))
+
+def test_variant_ids(tmp_path):
+    assert sorted(VARIANT_IDS) == sorted(VARIANTS)
+    assert len(set(VARIANT_IDS.values())) == len(VARIANT_IDS)
+    path = tmp_path / 'corpus.bin'
+    write_corpus(str(path), 'knight', 3, [Sudoku.get_empty_board()])
+    data = path.read_bytes()
+    assert HEADER.unpack_from(data)[2] == VARIANT_IDS['knight'] == 3
+    with Corpus(str(path)) as corpus:
+        assert corpus.variant == 'knight'
+    # variant id 5 is not assigned
+    path.write_bytes(data[:5] + bytes([5]) + data[6:])
+    with pytest.raises(ValueError):
+        Corpus(str(path))
@@ -0,0 +1,45 @@
+import pytest
+from ktaypuzzles.counting import count_completions
+from ktaypuzzles.kingsudoku import KingSudoku
+from ktaypuzzles.sudoku import Sudoku
+
+VALID_BOARD_1 = [
+    [0,0,0,0,0,3,5,0,0],
+    [0,7,0,0,0,0,0,8,1],
+    [0,0,0,1,0,8,9,0,0],
+    [4,0,0,9,2,0,3,0,0],
+    [7,0,0,0,0,4,0,0,0],
+    [1,0,0,0,0,0,6,9,0],
+    [6,0,0,4,0,9,0,0,0],
+    [0,0,0,6,0,0,0,0,3],
+    [0,3,0,0,0,0,2,0,0]
+]
+
+def test_count_empty_boards():
+    assert count_completions(Sudoku(2)) == 288
+    assert count_completions(Sudoku(2, 3)) == 28200960
+    assert count_completions(Sudoku(3, 2)) == 28200960
+
+def test_count_partial_boards():
+    assert count_completions(Sudoku(board=VALID_BOARD_1)) == 1
+    board = [row[:] for row in VALID_BOARD_1]
+    for (r,c) in [(1,1), (3,0)]:
+        board[r][c] = 0
+    count = len(Sudoku(board=board).solve())
+    assert count > 2
+    assert count_completions(Sudoku(board=board)) == count
+    assert count_completions(Sudoku(board=board), limit=2) == 2
+    board[0][0] = 3
+    assert count_completions(Sudoku(board=board)) == 0
+
+def test_count_solutions():
+    board = [[1,3,0,0,0,0]] + [[0] * 6] * 5
+    assert KingSudoku(2, 3, board=board).count_solutions() == len(KingSudoku(2, 3, board=board).solve())
+    assert KingSudoku(2, 3, board=board).count_solutions(limit=5) == 5
+    assert Sudoku(4).count_solutions(limit=3) == 3
+    assert Sudoku(2, board=[[1, 1, 0, 0]] + [[0] * 4] * 3).count_solutions() == 0
+    assert Sudoku(2, 3).count_solutions() == 28200960
+
+def test_only_standard_sudoku():
+    with pytest.raises(AssertionError):
+        count_completions(KingSudoku(2))
@@ -0,0 +1,40 @@
+import pytest
+from ktaypuzzles.exactcover import ExactCover
+from ktaypuzzles.search import SearchBudget, SearchBudgetExhausted
+
+# Knuth's example from the Dancing Links paper
+COLUMNS = 'ABCDEFG'
+ROWS = {
+    1: ['C', 'E', 'F'],
+    2: ['A', 'D', 'G'],
+    3: ['B', 'C', 'F'],
+    4: ['A', 'D'],
+    5: ['B', 'G'],
+    6: ['D', 'E', 'G'],
+}
+
+def test_iter_solutions():
+    exact_cover = ExactCover(COLUMNS, ROWS)
+    solutions = list(exact_cover.iter_solutions())
+    assert [sorted(solution) for solution in solutions] == [[1, 4, 5]]
+    assert exact_cover.nodes >= 4
+    # the matrix is restored after the search
+    assert [sorted(solution) for solution in exact_cover.iter_solutions()] == [[1, 4, 5]]
+
+def test_multiple_solutions():
+    exact_cover = ExactCover([0, 1, 2], {'a': [0], 'b': [1, 2], 'c': [0, 1], 'd': [2], 'e': [1]})
+    solutions = sorted(sorted(solution) for solution in exact_cover.iter_solutions())
+    assert solutions == [['a', 'b'], ['a', 'd', 'e'], ['c', 'd']]
+
+def test_no_solution():
+    # column 'C' is covered by no row
+    assert list(ExactCover('ABC', {1: ['A', 'B']}).iter_solutions()) == []
+    # the only row covering 'A' conflicts with the only row covering 'C'
+    assert list(ExactCover('ABC', {1: ['A', 'B'], 2: ['B', 'C']}).iter_solutions()) == []
+
+def test_budget():
+    exact_cover = ExactCover(COLUMNS, ROWS)
+    exact_cover.budget = SearchBudget(max_nodes=2)
+    exact_cover.budget.start()
+    with pytest.raises(SearchBudgetExhausted):
+        list(exact_cover.iter_solutions())
@@ -0,0 +1,59 @@
+import random
+from ktaypuzzles.killersudoku import KillerSudoku, get_cage_table
+from ktaypuzzles.sudoku import Sudoku
+
+SOLUTION = [
+    [1,2,3,4],
+    [3,4,1,2],
+    [2,1,4,3],
+    [4,3,2,1]
+]
+CAGES = [
+    (3, [(0,0), (0,1)]),
+    (7, [(0,2), (0,3)]),
+    (7, [(1,0), (1,1)]),
+    (7, [(2,2), (3,2), (3,3)]),
+]
+
+def matches_cages(board, cages):
+    return all(sum(board[r][c] for (r,c) in cells) == total and len(set(board[r][c] for (r,c) in cells)) == len(cells)
+               for (total, cells) in cages)
+
+def test_cage_table():
+    table = get_cage_table(9)
+    assert table[(2, 3)] == [0b11]
+    assert table[(3, 24)] == [0b111000000]
+    assert sorted(table[(2, 10)]) == sorted([0b100000001, 0b10000010, 0b1000100, 0b101000])
+    assert (2, 18) not in table and (10, 55) not in table
+    assert table[(9, 45)] == [0b111111111]
+
+def test_valid_board():
+    assert KillerSudoku(2, board=SOLUTION, cages=CAGES).is_valid_board
+    assert KillerSudoku(2, board=[[1,2,0,0]] + [[0] * 4] * 3, cages=CAGES).is_valid_board
+
+def test_invalid_board():
+    assert KillerSudoku(2, board=[[1,2,0,0]] + [[0] * 4] * 3, cages=[(4, [(0,0), (0,1)])]).is_valid_board is False
+    assert KillerSudoku(2, board=[[0,0,3,0]] + [[0] * 4] * 3, cages=[(5, [(0,2), (1,2)])]).is_valid_board is True
+    assert KillerSudoku(2, board=[[0,0,3,0]] + [[0] * 4] * 3, cages=[(9, [(0,2), (1,2)])]).is_valid_board is False
+    assert KillerSudoku(2, board=[[0,0,0,0], [0,0,0,0], [1,0,0,0], [0,1,0,0]],
+                        cages=[(2, [(2,0), (3,1)])]).is_valid_board is False
+
+def test_solve():
+    sudoku = KillerSudoku(2, cages=CAGES)
+    solutions = sudoku.solve()
+    expected = [board for board in Sudoku(2).solve() if matches_cages(board, CAGES)]
+    assert sorted(solutions) == sorted(expected)
+    assert sudoku.count_solutions() == len(expected)
+    assert sudoku.count_solutions(limit=1) == 1
+    assert KillerSudoku(2, board=[[2,0,0,0]] + [[0] * 4] * 3, cages=CAGES).solve()[0][0][1] == 1
+
+def test_generate_puzzle_board():
+    random.seed(0)
+    sudoku = KillerSudoku(2, 3)
+    sudoku.generate_puzzle_board()
+    covered = [cell for (_, cells) in sudoku.cages for cell in cells]
+    assert sorted(covered) == [(r,c) for r in range(6) for c in range(6)]
+    solutions = sudoku.solve()
+    assert len(solutions) == 1
+    assert matches_cages(solutions[0], sudoku.cages)
+    assert Sudoku(2, 3, board=solutions[0]).is_solved
@@ -73,4 +73,29 @@ def test_backtracking_solve():
         [8,7,2,9,3,6,5,1,4],
         [5,3,1,8,2,4,9,6,7]
     ]]
-    assert actual_solution == expected_solution
\ No newline at end of file
+    assert actual_solution == expected_solution
+
+def test_solve_with_budget():
+    # the king constraint is respected when propagating singles
+    sudoku = KingSudoku(board=[
+        [0,0,0,0,0,2,0,0,0],
+        [0,0,0,4,0,0,8,0,0],
+        [0,0,0,0,0,9,7,0,0],
+        [4,0,5,0,0,0,0,2,0],
+        [0,0,9,0,0,0,1,0,0],
+        [0,8,0,0,0,0,4,0,6],
+        [0,0,4,1,0,0,0,0,0],
+        [0,0,2,0,0,6,0,0,0],
+        [0,0,0,8,0,0,0,0,0]
+    ])
+    result = sudoku.solve_with_budget(max_nodes=10000)
+    assert result.is_complete and len(result.solutions) == 1
+    for (r,c), value in result.fixed.items():
+        assert result.solutions[0][r][c] == value
+
+def test_arc_consistency():
+    sudoku = KingSudoku(2, 3)
+    candidates_dict = {(0,0): {1}, (1,1): {1,2}, (2,2): {2,3}, (3,3): {1,2,3}}
+    assert sudoku._arc_consistency(candidates_dict, [(0,0)], {})
+    # (1,1) is a king's move from (0,0), then (2,2) from (1,1)
+    assert candidates_dict == {(0,0): {1}, (1,1): {2}, (2,2): {3}, (3,3): {1,2}}
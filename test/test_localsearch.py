@@ -0,0 +1,72 @@
+import random
+import pytest
+from ktaypuzzles.kingsudoku import KingSudoku
+from ktaypuzzles.localsearch import local_search_solve
+from ktaypuzzles.search import COMPLETED, NO_SOLUTION, TIME_LIMIT
+from ktaypuzzles.sudoku import Sudoku
+
+VALID_BOARD_1 = [
+    [0,0,0,0,0,3,5,0,0],
+    [0,7,0,0,0,0,0,8,1],
+    [0,0,0,1,0,8,9,0,0],
+    [4,0,0,9,2,0,3,0,0],
+    [7,0,0,0,0,4,0,0,0],
+    [1,0,0,0,0,0,6,9,0],
+    [6,0,0,4,0,9,0,0,0],
+    [0,0,0,6,0,0,0,0,3],
+    [0,3,0,0,0,0,2,0,0]
+]
+
+def test_local_search_solve():
+    sudoku = Sudoku(3, board=VALID_BOARD_1)
+    result = local_search_solve(sudoku, max_seconds=60, seed=0)
+    assert result.status == COMPLETED and result.cost == 0
+    assert result.solution == Sudoku(3, board=VALID_BOARD_1).solve()[0]
+    assert sudoku.solution == result.solution
+
+def test_local_search_empty_board():
+    result = local_search_solve(Sudoku(4), max_seconds=60, seed=1)
+    assert result.status == COMPLETED
+    assert Sudoku(4, board=result.solution).is_solved
+
+def test_local_search_25x25_with_givens():
+    # a known solution (a shuffled pattern), with 90% of the cells removed
+    rng = random.Random(0)
+    digits = rng.sample(range(1, 26), 25)
+    rows = [band * 5 + r for band in rng.sample(range(5), 5) for r in rng.sample(range(5), 5)]
+    cols = [stack * 5 + c for stack in rng.sample(range(5), 5) for c in rng.sample(range(5), 5)]
+    solution = [[digits[(5 * (r % 5) + r // 5 + c) % 25] for c in cols] for r in rows]
+    cells = [(r, c) for r in range(25) for c in range(25)]
+    givens = set(rng.sample(cells, 62))
+    board = [[solution[r][c] if (r, c) in givens else 0 for c in range(25)] for r in range(25)]
+
+    result = local_search_solve(Sudoku(5, board=board), max_seconds=300, seed=0)
+    assert result.status == COMPLETED
+    assert Sudoku(5, board=result.solution).is_solved
+    assert all(result.solution[r][c] == solution[r][c] for (r, c) in givens)
+
+def test_local_search_time_limit():
+    sudoku = Sudoku(5)
+    result = local_search_solve(sudoku, max_seconds=0.01, seed=0)
+    assert result.status == TIME_LIMIT
+    assert result.solution is None and sudoku.solution is None
+    assert result.cost > 0
+    # boxes are always complete
+    for box_r in range(0, 25, 5):
+        for box_c in range(0, 25, 5):
+            assert sorted(result.best_board[r][c] for r in range(box_r, box_r + 5)
+                          for c in range(box_c, box_c + 5)) == list(range(1, 26))
+
+def test_local_search_no_solution():
+    invalid = [row[:] for row in VALID_BOARD_1]
+    invalid[0][0] = 3
+    assert local_search_solve(Sudoku(3, board=invalid), max_seconds=1).status == NO_SOLUTION
+    # valid givens, but 1 has no place left in the first box
+    board = [[0] * 9 for _ in range(9)]
+    board[0][3], board[1][6], board[2][0], board[2][1], board[2][2] = 1, 1, 2, 3, 4
+    board[3][0], board[6][1] = 1, 1
+    assert local_search_solve(Sudoku(3, board=board), max_seconds=1).status == NO_SOLUTION
+
+def test_local_search_only_standard_sudoku():
+    with pytest.raises(AssertionError):
+        local_search_solve(KingSudoku(3))
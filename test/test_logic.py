@@ -0,0 +1,170 @@
+from ktaypuzzles.diagonalsudoku import DiagonalSudoku
+from ktaypuzzles.kingsudoku import KingSudoku
+from ktaypuzzles.logic import TECHNIQUES, LogicSolver, logic_solve, next_step
+from ktaypuzzles.nonconsecsudoku import NonConsecSudoku
+from ktaypuzzles.sudoku import Sudoku
+
+VALID_BOARD_1 = [
+    [0,0,0,0,0,3,5,0,0],
+    [0,7,0,0,0,0,0,8,1],
+    [0,0,0,1,0,8,9,0,0],
+    [4,0,0,9,2,0,3,0,0],
+    [7,0,0,0,0,4,0,0,0],
+    [1,0,0,0,0,0,6,9,0],
+    [6,0,0,4,0,9,0,0,0],
+    [0,0,0,6,0,0,0,0,3],
+    [0,3,0,0,0,0,2,0,0]
+]
+
+# needs an XY-Wing
+XY_WING_BOARD = [
+    [5,0,0,0,0,1,0,0,0],
+    [0,6,0,0,0,4,0,0,0],
+    [0,3,0,0,0,0,0,4,0],
+    [0,0,0,0,8,0,9,0,7],
+    [0,0,5,0,6,0,3,0,0],
+    [0,4,0,0,0,3,6,0,0],
+    [0,0,0,0,7,0,0,0,0],
+    [0,1,0,0,0,8,7,0,6],
+    [9,0,3,0,0,0,0,0,2]
+]
+
+# logic alone gets stuck after an XY-Chain
+HARD_BOARD = [
+    [0,0,0,0,0,0,0,0,0],
+    [0,5,8,0,0,3,0,7,0],
+    [0,9,0,6,0,0,0,3,2],
+    [9,0,5,4,0,0,0,1,0],
+    [0,0,4,0,0,0,0,0,8],
+    [0,0,0,0,1,0,9,2,0],
+    [0,0,2,8,0,0,0,0,0],
+    [3,0,7,0,2,5,0,8,0],
+    [0,0,0,0,0,4,0,0,3]
+]
+
+# needs an XY-Chain that uses the diagonals
+DIAGONAL_BOARD = [
+    [4,0,0,9,0,1,0,0,8],
+    [0,0,0,0,7,0,0,1,0],
+    [0,0,0,0,0,0,0,4,0],
+    [5,0,3,0,0,0,6,9,0],
+    [0,0,0,0,9,0,4,7,0],
+    [0,7,0,0,5,0,0,0,0],
+    [0,0,0,0,8,0,2,0,0],
+    [0,0,0,0,0,0,0,0,0],
+    [0,0,0,0,0,4,0,0,0]
+]
+
+NONCONSEC_BOARD = [
+    [0,0,0,0,0,0,0,0,0],
+    [0,0,0,0,5,0,0,0,0],
+    [0,0,1,0,3,0,2,0,0],
+    [0,0,0,6,0,3,0,0,0],
+    [0,7,4,0,0,0,3,6,0],
+    [0,0,0,4,0,1,0,0,0],
+    [0,0,3,0,4,0,9,0,0],
+    [0,0,0,0,9,0,0,0,0],
+    [0,0,0,0,0,0,0,0,0]
+]
+
+# 6x6, needs the non-consecutive rule to get started
+NONCONSEC_BOARD_2 = [
+    [0,0,0,0,4,0],
+    [0,0,0,0,0,0],
+    [0,0,0,0,0,0],
+    [0,0,1,0,0,0],
+    [0,3,0,0,0,0],
+    [0,0,0,0,0,0]
+]
+
+KING_BOARD = [
+    [0,0,0,0,0,2,0,0,0],
+    [0,0,0,4,0,0,8,0,0],
+    [0,0,0,0,0,9,7,0,0],
+    [4,0,5,0,0,0,0,2,0],
+    [0,0,9,0,0,0,1,0,0],
+    [0,8,0,0,0,0,4,0,6],
+    [0,0,4,1,0,0,0,0,0],
+    [0,0,2,0,0,6,0,0,0],
+    [0,0,0,8,0,0,0,0,0]
+]
+
+def check_sound(sudoku, result):
+    """
+    Every deduction agrees with the unique solution of the puzzle.
+    """
+    solutions = sudoku._get_solver().backtracking_solve()
+    assert len(solutions) == 1
+    solution = solutions[0]
+    assert not result.is_contradiction
+    for step in result.steps:
+        assert step.technique in TECHNIQUES
+        assert all(solution[r][c] == v for (r, c, v) in step.placements)
+        assert all(solution[r][c] != v for (r, c, v) in step.eliminations)
+    if result.is_solved:
+        assert result.board == solution
+
+def test_logic_solve():
+    sudoku = Sudoku(board=VALID_BOARD_1)
+    result = logic_solve(sudoku)
+    assert result.is_solved
+    assert result.techniques[0] in ('Naked Single', 'Hidden Single')
+    assert len(result.techniques) == len(result.steps)
+    check_sound(sudoku, result)
+
+def test_xy_wing():
+    sudoku = Sudoku(board=XY_WING_BOARD)
+    result = logic_solve(sudoku)
+    assert result.is_solved
+    assert 'XY-Wing' in result.techniques
+    assert result.hardest_technique == 'XY-Wing'
+    check_sound(sudoku, result)
+
+def test_stuck():
+    sudoku = Sudoku(board=HARD_BOARD)
+    result = logic_solve(sudoku)
+    assert not result.is_solved
+    assert 'XY-Chain' in result.techniques
+    check_sound(sudoku, result)
+    # no further step once stuck
+    solver = LogicSolver(sudoku)
+    solver.solve()
+    assert solver.step() is None
+
+def test_max_steps():
+    solver = LogicSolver(Sudoku(board=VALID_BOARD_1))
+    result = solver.solve(max_steps=5)
+    assert len(result.steps) == 5
+    assert not result.is_solved
+    assert solver.solve().is_solved
+
+def test_next_step():
+    sudoku = Sudoku(board=VALID_BOARD_1)
+    step = next_step(sudoku)
+    assert step.technique in ('Naked Single', 'Hidden Single')
+    assert len(step.placements) == 1
+    (r, c, v) = step.placements[0]
+    assert sudoku.board[r][c] is None
+    assert next_step(Sudoku(board=sudoku.solve()[0])) is None
+
+def test_contradiction():
+    # valid board, but (0,0) has no candidates left
+    board = [
+        [0,1,2,0],
+        [0,4,0,0],
+        [3,0,0,0],
+        [0,0,0,0]
+    ]
+    result = logic_solve(Sudoku(2, board=board))
+    assert result.is_contradiction
+    assert not result.is_solved
+    assert len(result.steps) == 0
+
+def test_variants():
+    for sudoku in [DiagonalSudoku(board=DIAGONAL_BOARD), NonConsecSudoku(board=NONCONSEC_BOARD),
+                   NonConsecSudoku(2, 3, board=NONCONSEC_BOARD_2), KingSudoku(board=KING_BOARD)]:
+        result = logic_solve(sudoku)
+        assert result.is_solved
+        check_sound(sudoku, result)
+    assert 'XY-Chain' in logic_solve(DiagonalSudoku(board=DIAGONAL_BOARD)).techniques
+    assert logic_solve(NonConsecSudoku(2, 3, board=NONCONSEC_BOARD_2)).techniques[0] == 'Neighbour Forcing'
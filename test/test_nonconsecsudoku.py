@@ -59,4 +59,20 @@ def test_backtracking_solve():
     sudoku_solver = _NonConsecSudokuSolver(sudoku)
     actual_solution = sudoku_solver.backtracking_solve()
     expected_solution = [VALID_BOARD_2]
-    assert actual_solution == expected_solution
\ No newline at end of file
+    assert actual_solution == expected_solution
+
+def test_arc_consistency():
+    sudoku = NonConsecSudoku(2, 3)
+    candidates_dict = {(0,0): {2,3}, (0,1): {1,2,3,4}, (1,0): {1,2,3,4,5,6}, (5,5): {1,2}}
+    original_candidates_dict = {}
+    assert sudoku._arc_consistency(candidates_dict, [(0,0)], original_candidates_dict)
+    # 2 and 3 both rule out 2 and 3 in orthogonal neighbors
+    assert candidates_dict == {(0,0): {2,3}, (0,1): {1,4}, (1,0): {1,4,5,6}, (5,5): {1,2}}
+    assert original_candidates_dict == {(0,1): {1,2,3,4}, (1,0): {1,2,3,4,5,6}}
+
+    candidates_dict = {(0,0): {2}, (0,1): {1,3}}
+    assert not sudoku._arc_consistency(candidates_dict, [(0,0)], {})
+
+def test_generate_complete_board():
+    board = NonConsecSudoku(2, 3)._generate_complete_board()
+    assert NonConsecSudoku(2, 3, board=board).is_valid_board
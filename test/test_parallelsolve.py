@@ -0,0 +1,68 @@
+from ktaypuzzles.kingsudoku import KingSudoku
+from ktaypuzzles.parallelsolve import parallel_count, parallel_find_first, parallel_solve, split_search
+from ktaypuzzles.sudoku import Sudoku, _SudokuSolver
+
+VALID_BOARD_1 = [
+    [0,0,0,0,0,3,5,0,0],
+    [0,7,0,0,0,0,0,8,1],
+    [0,0,0,1,0,8,9,0,0],
+    [4,0,0,9,2,0,3,0,0],
+    [7,0,0,0,0,4,0,0,0],
+    [1,0,0,0,0,0,6,9,0],
+    [6,0,0,4,0,9,0,0,0],
+    [0,0,0,6,0,0,0,0,3],
+    [0,3,0,0,0,0,2,0,0]
+]
+
+def test_split_search():
+    sudoku = Sudoku(2)
+    boards = split_search(sudoku, 10)
+    assert len(boards) >= 10
+    # subproblems partition the solutions of the original puzzle
+    solutions = [solution for board in boards
+                 for solution in _SudokuSolver(Sudoku(2, board=board)).backtracking_solve()]
+    assert len(solutions) == 288
+    assert len(set(str(solution) for solution in solutions)) == 288
+
+def test_split_search_variant():
+    # the expansion uses the variant's propagation, and still partitions the solutions
+    board = [[1,2,3,4,5,6]] + [[0] * 6 for _ in range(5)]
+    boards = split_search(KingSudoku(2, 3, board=board), 8)
+    assert len(boards) >= 8
+    solutions = [solution for board in boards for solution in KingSudoku(2, 3, board=board).iter_solutions()]
+    assert sorted(solutions) == sorted(KingSudoku(2, 3, board=board).iter_solutions())
+    assert len(solutions) == 103
+
+def test_split_search_invalid():
+    assert split_search(Sudoku(2, board=[[1,1,0,0],[0,0,0,0],[0,0,0,0],[0,0,0,0]]), 4) == []
+
+def test_parallel_solve():
+    sudoku = Sudoku(2, board=[
+        [1,2,3,0],
+        [3,4,1,0],
+        [2,0,0,0],
+        [0,0,0,0]
+    ])
+    solutions = parallel_solve(sudoku, processes=2)
+    assert sorted(solutions) == sorted(_SudokuSolver(sudoku).backtracking_solve())
+
+def test_parallel_count():
+    assert parallel_count(Sudoku(2), processes=2) == 288
+
+def test_parallel_find_first():
+    solution = parallel_find_first(Sudoku(board=VALID_BOARD_1), processes=2)
+    assert solution == _SudokuSolver(Sudoku(board=VALID_BOARD_1)).backtracking_solve()[0]
+
+def test_parallel_find_first_variant():
+    sudoku = KingSudoku(board=[
+        [0,0,0,0,0,2,0,0,0],
+        [0,0,0,4,0,0,8,0,0],
+        [0,0,0,0,0,9,7,0,0],
+        [4,0,5,0,0,0,0,2,0],
+        [0,0,9,0,0,0,1,0,0],
+        [0,8,0,0,0,0,4,0,6],
+        [0,0,4,1,0,0,0,0,0],
+        [0,0,2,0,0,6,0,0,0],
+        [0,0,0,8,0,0,0,0,0]
+    ])
+    assert parallel_find_first(sudoku, processes=2) == sudoku.solve()[0]
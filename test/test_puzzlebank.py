@@ -0,0 +1,112 @@
+import time
+import pytest
+from ktaypuzzles.kingsudoku import KingSudoku
+from ktaypuzzles.puzzlebank import DIFFICULTIES, PuzzleBank, grade_difficulty
+from ktaypuzzles.sudoku import Sudoku
+
+VALID_BOARD_1 = [
+    [0,0,0,0,0,3,5,0,0],
+    [0,7,0,0,0,0,0,8,1],
+    [0,0,0,1,0,8,9,0,0],
+    [4,0,0,9,2,0,3,0,0],
+    [7,0,0,0,0,4,0,0,0],
+    [1,0,0,0,0,0,6,9,0],
+    [6,0,0,4,0,9,0,0,0],
+    [0,0,0,6,0,0,0,0,3],
+    [0,3,0,0,0,0,2,0,0]
+]
+
+def test_add_and_get(tmp_path):
+    with PuzzleBank(str(tmp_path / 'bank.db')) as bank:
+        assert bank.get_random('sudoku', 3) is None
+        bank.add(Sudoku(board=VALID_BOARD_1))
+        assert bank.count() == 1
+        assert bank.get_buckets() == [(('sudoku', 3, 3, 24, 'medium'), 1)]
+        sudoku = bank.get_random('sudoku', 3, difficulty='medium')
+        assert [[cell or 0 for cell in row] for row in sudoku.board] == VALID_BOARD_1
+        assert sudoku.solution == Sudoku(board=VALID_BOARD_1).solve()[0]
+        assert bank.get_random('sudoku', 3, difficulty='easy') is None
+        assert bank.get_random('sudoku', 3, clues=(20, 30)) is not None
+        assert bank.get_random('king', 3) is None
+
+def test_add_not_unique(tmp_path):
+    with PuzzleBank(str(tmp_path / 'bank.db')) as bank:
+        with pytest.raises(ValueError):
+            bank.add(Sudoku(2))
+        assert bank.count() == 0
+
+def test_add_checks_uniqueness(tmp_path):
+    with PuzzleBank(str(tmp_path / 'bank.db')) as bank:
+        # a solution that is already set does not skip the check
+        sudoku = Sudoku(2)
+        sudoku.solution = next(Sudoku(2).iter_solutions())
+        with pytest.raises(ValueError):
+            bank.add(sudoku)
+        sudoku = Sudoku(board=VALID_BOARD_1)
+        sudoku.solution = Sudoku(board=VALID_BOARD_1).solve()[0]
+        sudoku.solution[0][0], sudoku.solution[0][1] = sudoku.solution[0][1], sudoku.solution[0][0]
+        with pytest.raises(ValueError):
+            bank.add(sudoku)
+        assert bank.count() == 0
+
+def test_fill_and_remove(tmp_path):
+    path = str(tmp_path / 'bank.db')
+    with PuzzleBank(path) as bank:
+        bank.fill('sudoku', 2, count=10)
+        bank.fill('king', 2, 3, count=3)
+        assert bank.count() == 13
+        assert bank.count('sudoku', 2) == 10
+        assert bank.count('king', 2, 3) == 3
+    # stored on disk
+    with PuzzleBank(path) as bank:
+        assert bank.count() == 13
+        for _ in range(10):
+            sudoku = bank.get_random('sudoku', 2, remove=True)
+            assert Sudoku(2, board=sudoku.solution).is_solved
+        assert bank.get_random('sudoku', 2) is None
+        assert bank.count() == 3
+        assert isinstance(bank.get_random('king', 2, 3), KingSudoku)
+
+def test_refill(tmp_path):
+    with PuzzleBank(str(tmp_path / 'bank.db')) as bank:
+        bank.start_refill({('sudoku', 2, 2, None): 5, ('diagonal', 2, 2, None): 2}, interval=0.05)
+        deadline = time.time() + 30
+        while (bank.count('sudoku', 2) < 5 or bank.count('diagonal', 2) < 2) and time.time() < deadline:
+            time.sleep(0.05)
+        bank.get_random('sudoku', 2, remove=True)
+        time.sleep(0.5)
+        bank.stop_refill()
+        assert bank.count('sudoku', 2) >= 5
+        assert bank.count('diagonal', 2) >= 2
+
+def test_refill_unreachable_difficulty(tmp_path):
+    with PuzzleBank(str(tmp_path / 'bank.db')) as bank:
+        # 4x4 sudokus are practically never 'hard'
+        target = ('sudoku', 2, 2, 'hard')
+        bank.start_refill({target: 1}, interval=0.05, max_attempts=5)
+        deadline = time.time() + 30
+        while len(bank.unreachable_targets) == 0 and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.2)
+        bank.stop_refill()
+        assert bank.unreachable_targets == [target]
+        # the off-target puzzles are kept, but only up to max_attempts of them
+        assert bank.count('sudoku', 2) == 5
+
+def test_grade_difficulty():
+    assert grade_difficulty(Sudoku(board=VALID_BOARD_1)) == 'medium'
+    solution = Sudoku(board=VALID_BOARD_1).solve()[0]
+    assert grade_difficulty(Sudoku(board=solution)) == 'easy'
+    assert set(DIFFICULTIES) == {'easy', 'medium', 'hard', 'expert'}
+
+def test_refill_error_stops_refill(tmp_path):
+    with PuzzleBank(str(tmp_path / 'bank.db')) as bank:
+        bank.start_refill({('sudoku', 0, 2, None): 1}, interval=0.05)
+        deadline = time.time() + 30
+        while bank.is_refilling and time.time() < deadline:
+            time.sleep(0.05)
+        assert not bank.is_refilling
+        assert isinstance(bank.refill_error, AssertionError)
+        bank.stop_refill()
+        bank.start_refill({('sudoku', 2, 2, None): 1}, interval=0.05)
+        assert bank.refill_error is None and bank.is_refilling
@@ -23,4 +23,23 @@ def test_does_rect_overlap2():
     B = Rect(2, 5, 0, 2)
     C = Rect(0, 2, 2, 5)
     assert A.does_rect_overlap(B)
-    assert A.does_rect_overlap(C)
\ No newline at end of file
+    assert A.does_rect_overlap(C)
+
+def test_rect_is_hashable_and_immutable():
+    A = Rect(0, 2, 0, 2)
+    assert A == Rect(0, 2, 0, 2)
+    assert len({A, Rect(0, 2, 0, 2), Rect(0, 2, 0, 3)}) == 2
+    with pytest.raises(AttributeError):
+        A.r1 = 1
+    assert not hasattr(A, '__dict__')
+
+def test_get_mask():
+    # on a 3x4 board, cell (r,c) is bit 4*r + c
+    assert Rect(0, 0, 0, 0).get_mask(4) == 0b1
+    assert Rect(1, 2, 1, 2).get_mask(4) == (0b0110 << 4) | (0b0110 << 8)
+    # masks overlap exactly when the rectangles do
+    rects = [Rect(r1, r2, c1, c2) for r1 in range(3) for r2 in range(r1, 3)
+             for c1 in range(4) for c2 in range(c1, 4)]
+    for A in rects:
+        for B in rects:
+            assert (A.get_mask(4) & B.get_mask(4) != 0) == A.does_rect_overlap(B)
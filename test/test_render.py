@@ -0,0 +1,52 @@
+import os
+import pytest
+from ktaypuzzles.render import BoardRenderer, render_many
+from ktaypuzzles.shikaku import Shikaku
+from ktaypuzzles.sudoku import Sudoku
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+SUDOKU_BOARD = [
+    [3,4,0,0,0,0],
+    [0,0,6,0,0,0],
+    [4,0,0,2,0,0],
+    [1,5,0,0,0,0],
+    [0,0,0,0,6,5],
+    [0,0,0,3,0,0]
+]
+
+SHIKAKU_BOARD = [
+    [0, 4, 0, 0],
+    [0, 0, 0, 4],
+    [0, 4, 4, 0],
+    [0, 0, 0, 0]
+]
+
+def test_render():
+    sudoku = Sudoku(2, 3, board=SUDOKU_BOARD)
+    sudoku.solve()
+    renderer = BoardRenderer()
+    assert renderer.render(sudoku).startswith(PNG_SIGNATURE)
+    assert renderer.render(sudoku, solution=True, title='Sudoku').startswith(PNG_SIGNATURE)
+
+def test_render_shikaku(tmp_path):
+    shikaku = Shikaku(SHIKAKU_BOARD)
+    shikaku.solve()
+    save_path = str(tmp_path / 'shikaku.png')
+    png = BoardRenderer().render(shikaku, solution=True, save_path=save_path)
+    with open(save_path, 'rb') as f:
+        assert f.read() == png
+
+def test_render_unsolved():
+    with pytest.raises(ValueError):
+        BoardRenderer().render(Shikaku(SHIKAKU_BOARD), solution=True)
+
+def test_render_many(tmp_path):
+    puzzles = [Sudoku(2, 3, board=SUDOKU_BOARD), Shikaku(SHIKAKU_BOARD), Sudoku(2)]
+    pngs = render_many(puzzles)
+    assert len(pngs) == 3
+    assert all(png.startswith(PNG_SIGNATURE) for png in pngs)
+
+    paths = render_many(puzzles, out_dir=str(tmp_path), processes=2, chunksize=1)
+    assert paths == [os.path.join(str(tmp_path), '{:05d}.png'.format(i)) for i in range(3)]
+    assert all(os.path.getsize(path) > 0 for path in paths)
@@ -0,0 +1,31 @@
+import threading
+import pytest
+from ktaypuzzles.search import SearchCancelled, cancel_scope, check_cancelled
+
+def test_check_cancelled():
+    # no scope: never cancelled
+    check_cancelled()
+
+    event = threading.Event()
+    with cancel_scope(event):
+        check_cancelled()
+        event.set()
+        with pytest.raises(SearchCancelled):
+            check_cancelled()
+    # scope is restored on exit
+    check_cancelled()
+
+def test_cancel_scope_is_per_thread():
+    event = threading.Event()
+    event.set()
+    errors = []
+    def other_thread():
+        try:
+            check_cancelled()
+        except SearchCancelled as e:
+            errors.append(e)
+    with cancel_scope(event):
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        thread.join()
+    assert errors == []
@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import pytest
+from ktaypuzzles.server import Histogram, PuzzleServer, PuzzleService, ServiceOverloaded
+from ktaypuzzles.sudoku import Sudoku
+
+VALID_BOARD_2 = [
+    [3,4,0,0,0,0],
+    [0,0,6,0,0,0],
+    [4,0,0,2,0,0],
+    [1,5,0,0,0,0],
+    [0,0,0,0,6,5],
+    [0,0,0,3,0,0]
+]
+
+@pytest.fixture
+def server():
+    with PuzzleService(processes=2, max_batch=8, max_wait=0.01) as service:
+        server = PuzzleServer(service, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+def request(server, path, body=None):
+    url = 'http://{}:{}{}'.format(*server.server_address, path)
+    data = json.dumps(body).encode() if body is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_solve_and_generate(server):
+    status, body = request(server, '/solve', {'variant': 'sudoku', 'minirows': 2, 'minicols': 3,
+                                              'board': VALID_BOARD_2, 'max_solutions': 2})
+    assert status == 200
+    assert body == {'status': 'completed', 'solutions': Sudoku(2, 3, board=VALID_BOARD_2).solve()}
+
+    status, body = request(server, '/generate', {'variant': 'sudoku', 'minirows': 2})
+    assert status == 200
+    assert Sudoku(2, board=body['board']).solve() == [body['solution']]
+
+    assert request(server, '/solve', {'variant': 'hexagon'})[0] == 400
+    assert request(server, '/solve', {'variant': 'sudoku', 'max_seconds': -1})[0] == 400
+    assert request(server, '/nothing', {})[0] == 404
+    assert request(server, '/health') == (200, {'status': 'ok'})
+
+def test_batching_and_metrics(server):
+    results = []
+    def client():
+        results.append(request(server, '/solve', {'variant': 'sudoku', 'minirows': 2, 'minicols': 3,
+                                                  'board': VALID_BOARD_2}))
+    threads = [threading.Thread(target=client) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(status == 200 for (status, _) in results)
+
+    status, metrics = request(server, '/metrics')
+    assert status == 200
+    assert metrics['requests'] == 20
+    assert metrics['pending'] == 0
+    assert metrics['batches'] <= 20
+    assert metrics['batch_size']['sum'] == 20
+    latency = metrics['latency_seconds']['solve']
+    assert latency['count'] == 20
+    assert latency['buckets'][-1] == {'le': '+Inf', 'count': 20}
+
+def test_backpressure():
+    with PuzzleService(processes=1, max_pending=1) as service:
+        slow = service.submit({'variant': 'sudoku', 'minirows': 3, 'board': [[0] * 9] * 9,
+                               'max_solutions': 10**9, 'max_seconds': 1})
+        with pytest.raises(ServiceOverloaded):
+            service.submit({'variant': 'sudoku', 'minirows': 2, 'board': [[0] * 4] * 4})
+        assert slow.done.wait(30)
+        assert slow.response['status'] == 'time_limit'
+        assert service.handle({'variant': 'sudoku', 'minirows': 2, 'board': [[0] * 4] * 4},
+                              timeout=30)['status'] == 'solution_limit'
+        assert service.get_metrics()['rejected'] == 1
+
+def test_batch_answers_each_request_when_done():
+    with PuzzleService(processes=2, max_batch=2, max_wait=1) as service:
+        slow = service.submit({'variant': 'sudoku', 'minirows': 3, 'board': [[0] * 9] * 9,
+                               'max_solutions': 10**9, 'max_seconds': 5})
+        fast = service.submit({'variant': 'sudoku', 'minirows': 2, 'minicols': 3, 'board': VALID_BOARD_2,
+                               'max_solutions': 2})
+        assert fast.done.wait(4)
+        assert fast.response['status'] == 'completed'
+        assert not slow.done.is_set()
+        assert service.get_metrics()['batches'] == 1
+        assert slow.done.wait(30)
+        assert slow.response['status'] == 'time_limit'
+
+def test_time_limits():
+    with PuzzleService(processes=1, default_max_seconds=0.5, max_seconds_limit=1) as service:
+        empty = {'variant': 'sudoku', 'minirows': 3, 'board': [[0] * 9] * 9, 'max_solutions': 10**9}
+        pending = service.submit(empty)
+        assert pending.request['max_seconds'] == 0.5
+        assert pending.done.wait(30)
+        assert pending.response['status'] == 'time_limit'
+        assert service.submit(dict(empty, max_seconds=1000)).request['max_seconds'] == 1
+        assert service.submit(dict(empty, max_seconds=0.25)).request['max_seconds'] == 0.25
+        with pytest.raises(ValueError):
+            service.submit(dict(empty, max_seconds='forever'))
+
+def test_service_failure_is_500():
+    service = PuzzleService(processes=1)
+    service.start()
+    server = PuzzleServer(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    results = []
+    client = threading.Thread(target=lambda: results.append(request(
+        server, '/solve', {'variant': 'sudoku', 'minirows': 3, 'board': [[0] * 9] * 9,
+                           'max_solutions': 10**9, 'max_seconds': 30})))
+    client.start()
+    deadline = time.time() + 30
+    while service._in_flight == {} and time.time() < deadline:
+        time.sleep(0.01)
+    # the request is answered by the service, not by the worker
+    service.stop()
+    client.join()
+    server.shutdown()
+    server.server_close()
+    assert results == [(500, {'error': 'Service stopped'})]
+
+def test_histogram():
+    histogram = Histogram([1, 2, 5])
+    for value in [0.5, 1.5, 1.5, 3, 10]:
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 2
+    assert histogram.quantile(0.99) == float('inf')
+    assert [bucket['count'] for bucket in histogram.to_dict()['buckets']] == [1, 3, 4, 5]
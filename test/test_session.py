@@ -0,0 +1,88 @@
+import pytest
+from ktaypuzzles.nonconsecsudoku import NonConsecSudoku
+from ktaypuzzles.session import SudokuSession
+from ktaypuzzles.sudoku import Sudoku
+
+VALID_BOARD_1 = [
+    [0,0,0,0,0,3,5,0,0],
+    [0,7,0,0,0,0,0,8,1],
+    [0,0,0,1,0,8,9,0,0],
+    [4,0,0,9,2,0,3,0,0],
+    [7,0,0,0,0,4,0,0,0],
+    [1,0,0,0,0,0,6,9,0],
+    [6,0,0,4,0,9,0,0,0],
+    [0,0,0,6,0,0,0,0,3],
+    [0,3,0,0,0,0,2,0,0]
+]
+
+SOLUTION_1 = [
+    [9, 8, 1, 7, 4, 3, 5, 2, 6],
+    [3, 7, 5, 2, 9, 6, 4, 8, 1],
+    [2, 4, 6, 1, 5, 8, 9, 3, 7],
+    [4, 6, 8, 9, 2, 1, 3, 7, 5],
+    [7, 5, 9, 3, 6, 4, 8, 1, 2],
+    [1, 2, 3, 8, 7, 5, 6, 9, 4],
+    [6, 1, 2, 4, 3, 9, 7, 5, 8],
+    [5, 9, 7, 6, 8, 2, 1, 4, 3],
+    [8, 3, 4, 5, 1, 7, 2, 6, 9]
+]
+
+def test_candidates():
+    sudoku = Sudoku(board=VALID_BOARD_1)
+    session = SudokuSession(sudoku)
+    for (r,c) in [(2,8), (0,0), (8,8)]:
+        assert session.get_candidates(r, c) == sudoku._get_candidates_for_cell(r, c, VALID_BOARD_1)
+    session.place(2, 8, 7)
+    assert 7 not in session.get_candidates(2, 7)
+    session.erase(2, 8)
+    assert session.get_candidates(2, 8) == {2, 4, 6, 7}
+
+def test_place_and_conflicts():
+    session = SudokuSession(Sudoku(board=VALID_BOARD_1))
+    assert not session.has_conflicts()
+    # 5 is already in row 0
+    assert session.place(0, 0, 5) == {(0,6)}
+    assert session.has_conflicts()
+    assert not session.is_solvable()
+    assert session.hint() is None
+    # overwriting the cell clears the conflict
+    assert session.place(0, 0, 9) == set()
+    assert not session.has_conflicts()
+    session.erase(0, 0)
+    assert session.board[0][0] is None
+
+def test_givens_cannot_change():
+    session = SudokuSession(Sudoku(board=VALID_BOARD_1))
+    with pytest.raises(ValueError):
+        session.place(0, 5, 4)
+    with pytest.raises(ValueError):
+        session.erase(0, 5)
+    with pytest.raises(ValueError):
+        session.place(0, 0, 10)
+
+def test_hint_and_solvable():
+    session = SudokuSession(Sudoku(board=VALID_BOARD_1))
+    assert session.is_solvable()
+    # follow hints to the end
+    while not session.is_complete():
+        (r, c, value) = session.hint()
+        assert SOLUTION_1[r][c] == value
+        session.place(r, c, value)
+    assert session.board == SOLUTION_1
+
+def test_not_solvable_without_conflicts():
+    session = SudokuSession(Sudoku(board=VALID_BOARD_1))
+    # legal placement that does not lead to a solution
+    assert session.place(0, 0, 2) == set()
+    assert not session.is_solvable()
+    assert session.hint() is None
+    session.place(0, 0, 9)
+    assert session.is_solvable()
+
+def test_nonconsec_session():
+    session = SudokuSession(NonConsecSudoku(2, 3))
+    session.place(0, 0, 3)
+    assert session.get_candidates(0, 1) == {1, 5, 6}
+    assert session.place(1, 0, 4) == {(0,0)}
+    session.erase(1, 0)
+    assert not session.has_conflicts()
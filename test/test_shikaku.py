@@ -1,4 +1,5 @@
 from ktaypuzzles.rect import Rect
+from ktaypuzzles.search import COMPLETED, NO_SOLUTION, NODE_LIMIT
 from ktaypuzzles.shikaku import Shikaku, _ShikakuSolver
 
 VALID_SHIKAKU_BOARD = [
@@ -41,25 +42,45 @@ def test_is_rect_in_board():
 def test_get_valid_rects():
     shikaku = Shikaku(VALID_SHIKAKU_BOARD)
     shikaku_solver = _ShikakuSolver(shikaku)
-    state = [Rect(r, r, c, c) for (_, r, c, _) in shikaku.anchors]
-    actual_rects = shikaku_solver._get_valid_rects((0, 0, 1, 4), state)
+    covered = 0
+    for (_, r, c, _) in shikaku.anchors[1:]:
+        covered |= Rect(r, r, c, c).get_mask(shikaku.cols)
+    actual_rects = shikaku_solver._get_valid_rects((0, 0, 1, 4), covered)
     expected_rects = [Rect(0, 0, 1, 4), Rect(0, 0, 0, 3), Rect(0, 1, 1, 2), Rect(0, 3, 1, 1)]
-    assert actual_rects == expected_rects
+    assert actual_rects == [(rect.get_mask(shikaku.cols), rect) for rect in expected_rects]
 
 def test_get_valid_rects2():
     shikaku = Shikaku(VALID_SHIKAKU_BOARD)
     shikaku_solver = _ShikakuSolver(shikaku)
-    state = [Rect(r, r, c, c) for (_, r, c, _) in shikaku.anchors]
-    state[1] = Rect(0, 0, 4, 5)
-    actual_rects = shikaku_solver._get_valid_rects((0, 0, 1, 4), state)
+    covered = Rect(0, 0, 4, 5).get_mask(shikaku.cols)
+    for (_, r, c, _) in shikaku.anchors[2:]:
+        covered |= Rect(r, r, c, c).get_mask(shikaku.cols)
+    actual_rects = shikaku_solver._get_valid_rects((0, 0, 1, 4), covered)
     expected_rects = [Rect(0, 0, 0, 3), Rect(0, 1, 1, 2), Rect(0, 3, 1, 1)]
-    assert actual_rects == expected_rects
+    assert [rect for (_, rect) in actual_rects] == expected_rects
+
+def test_get_candidates_dict():
+    shikaku = Shikaku(VALID_SHIKAKU_BOARD_3)
+    candidates_dict = _ShikakuSolver(shikaku)._get_candidates_dict()
+    assert sorted(candidates_dict) == [0, 1, 2, 3]
+    # anchor 0 at (0,1): rectangles of area 4 that contain no other anchor
+    assert [rect for (_, rect) in candidates_dict[0]] == [Rect(0, 0, 0, 3), Rect(0, 1, 1, 2), Rect(0, 1, 0, 1)]
 
 def test_prune_candidates_dict():
-    candidates_dict = {0: [Rect(0,0,0,3), Rect(0,1,0,1), Rect(0,1,1,2)]}
-    pruned_candidates_dict = _ShikakuSolver._prune_candidates_dict(candidates_dict, 1, Rect(0,3,3,3))
-    expected_dict = {0: [Rect(0,1,0,1), Rect(0,1,1,2)]}
-    assert pruned_candidates_dict == expected_dict
+    candidates = [(Rect(0,0,0,3).get_mask(4), Rect(0,0,0,3)), (Rect(0,1,0,1).get_mask(4), Rect(0,1,0,1)),
+                  (Rect(0,1,1,2).get_mask(4), Rect(0,1,1,2))]
+    other = [(Rect(2,2,0,0).get_mask(4), Rect(2,2,0,0))]
+    candidates_dict = {0: candidates, 2: other}
+    trail = []
+    _ShikakuSolver._prune_candidates_dict(candidates_dict, 1, Rect(0,3,3,3).get_mask(4), trail)
+    assert candidates_dict == {0: candidates[1:], 2: other}
+    # only the list that changed is recorded, and it is not mutated
+    assert trail == [(0, candidates)]
+    assert len(candidates) == 3
+
+    _ShikakuSolver._undo_pruning(candidates_dict, trail, 0)
+    assert candidates_dict == {0: candidates, 2: other}
+    assert trail == []
 
 def test_backtracking_solve():
     shikaku = Shikaku(VALID_SHIKAKU_BOARD_2)
@@ -81,4 +102,66 @@ def test_backtracking_solve2():
         [Rect(0, 1, 0, 1), Rect(0, 1, 2, 3), Rect(2, 3, 0, 1), Rect(2, 3, 2, 3)],
         [Rect(0, 1, 0, 1), Rect(0, 3, 3, 3), Rect(2, 3, 0, 1), Rect(0, 3, 2, 2)]
     ]
-    assert actual_solution == expected_solution
\ No newline at end of file
+    assert actual_solution == expected_solution
+
+def test_backtracking_solve_counts_nodes():
+    shikaku_solver = _ShikakuSolver(Shikaku(VALID_SHIKAKU_BOARD_3))
+    shikaku_solver.backtracking_solve()
+    # every anchor is assigned on the way to each of the 3 solutions
+    assert shikaku_solver.nodes >= len(shikaku_solver.anchors) + 1
+
+
+def test_solve_with_budget():
+    shikaku = Shikaku(VALID_SHIKAKU_BOARD_2)
+    result = shikaku.solve_with_budget(max_nodes=1000)
+    assert result.status == COMPLETED
+    assert result.solutions == [shikaku.solution]
+    # this board is solved by propagation alone
+    assert [result.fixed[i] for i in range(len(shikaku.anchors))] == shikaku.solution
+
+def test_solve_with_budget_limits():
+    shikaku = Shikaku(VALID_SHIKAKU_BOARD_3)
+    result = shikaku.solve_with_budget(max_nodes=7)
+    assert result.status == NODE_LIMIT
+    assert result.solutions == _ShikakuSolver(Shikaku(VALID_SHIKAKU_BOARD_3)).backtracking_solve()[:2]
+    assert result.fixed == {}
+
+    result = Shikaku([[0, 3], [3, 0]]).solve_with_budget(max_nodes=10)
+    assert result.status == NO_SOLUTION
+
+def test_iter_solutions():
+    shikaku = Shikaku(VALID_SHIKAKU_BOARD_3)
+    solutions = shikaku.iter_solutions()
+    assert next(solutions) == [Rect(0, 0, 0, 3), Rect(1, 1, 0, 3), Rect(2, 3, 0, 1), Rect(2, 3, 2, 3)]
+    assert len(list(solutions)) == 2
+
+def test_prune_candidates_dict_reach():
+    rect = Rect(0, 0, 0, 1)
+    candidates_dict = {0: [(rect.get_mask(4), rect)]}
+    # the anchor cannot reach the added rectangle, so its candidates are not even looked at
+    _ShikakuSolver._prune_candidates_dict(candidates_dict, 1, rect.get_mask(4), reach={0: 0})
+    assert candidates_dict == {0: [(rect.get_mask(4), rect)]}
+    _ShikakuSolver._prune_candidates_dict(candidates_dict, 1, rect.get_mask(4), reach={0: rect.get_mask(4)})
+    assert candidates_dict == {0: []}
+
+def test_exact_cover_solve():
+    shikaku_solver = _ShikakuSolver(Shikaku(VALID_SHIKAKU_BOARD_2))
+    assert shikaku_solver.exact_cover_solve() == _ShikakuSolver(Shikaku(VALID_SHIKAKU_BOARD_2)).backtracking_solve()
+    assert shikaku_solver.nodes > 0
+
+    # same solutions, possibly in another order
+    actual_solutions = _ShikakuSolver(Shikaku(VALID_SHIKAKU_BOARD_3)).exact_cover_solve()
+    expected_solutions = _ShikakuSolver(Shikaku(VALID_SHIKAKU_BOARD_3)).backtracking_solve()
+    assert sorted(map(repr, actual_solutions)) == sorted(map(repr, expected_solutions))
+
+    assert _ShikakuSolver(Shikaku([[0, 3], [3, 0]])).exact_cover_solve() == []
+
+def test_solve_method():
+    shikaku = Shikaku(VALID_SHIKAKU_BOARD)
+    solution = shikaku.solve(method='exact_cover')
+    assert shikaku.is_solved
+    assert solution == shikaku.solution == Shikaku(VALID_SHIKAKU_BOARD).solve()
+
+    shikaku = Shikaku([[0, 3], [3, 0]])
+    assert shikaku.solve(method='exact_cover') is None
+    assert shikaku.is_solved is False
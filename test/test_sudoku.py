@@ -1,4 +1,8 @@
+import itertools
 import random
+import subprocess
+import sys
+from ktaypuzzles.search import COMPLETED, NO_SOLUTION, NODE_LIMIT, TIME_LIMIT
 from ktaypuzzles.sudoku import Board, EMPTY, Sudoku, _SudokuSolver
 
 # Reused constants
@@ -164,4 +168,68 @@ def test_get_neighbors_for_cell():
         (0,4), (1,4), (3,4), (4,4), (5,4),
         (3,3), (3,5)
     }
-    assert actual_neighbors == expected_neighbors
\ No newline at end of file
+    assert actual_neighbors == expected_neighbors
+
+def test_backtracking_solve_counts_nodes():
+    sudoku = Sudoku(minirows=2, minicols=3, board=VALID_BOARD_2)
+    sudoku_solver = _SudokuSolver(sudoku)
+    assert sudoku_solver.nodes == 0
+    sudoku_solver.backtracking_solve()
+    # one node per filled cell on the path to the unique solution, at least
+    assert sudoku_solver.nodes >= sudoku_solver.sudoku.blank_count + 1
+
+
+def test_import_does_not_load_heavy_dependencies():
+    # cvxpy and matplotlib should only be imported by ip_solve() and the image methods
+    code = ('import sys, ktaypuzzles.sudoku, ktaypuzzles.nonconsecsudoku, ktaypuzzles.shikaku; '
+            'print(sorted(m for m in ("cvxpy", "matplotlib") if m in sys.modules))')
+    output = subprocess.check_output([sys.executable, '-c', code]).decode().strip()
+    assert output == '[]'
+
+
+def test_solve_with_budget():
+    sudoku = Sudoku(minirows=2, minicols=3, board=VALID_BOARD_2)
+    result = sudoku.solve_with_budget(max_nodes=1000, max_seconds=10)
+    assert result.status == COMPLETED and result.is_complete
+    assert result.solutions == [sudoku.solution]
+    assert result.nodes == _SudokuSolver(sudoku).budgeted_solve().nodes
+    # cells fixed by naked singles agree with the solution
+    assert len(result.fixed) > 0
+    for (r,c), value in result.fixed.items():
+        assert VALID_BOARD_2[r][c] == 0 and sudoku.solution[r][c] == value
+
+def test_solve_with_budget_limits():
+    # an empty 4x4 board has 288 solutions
+    sudoku = Sudoku(2)
+    result = sudoku.solve_with_budget(max_nodes=30)
+    assert result.status == NODE_LIMIT and not result.is_complete
+    assert result.nodes == 31
+    assert 0 < len(result.solutions) < 288
+    assert sudoku.solution == result.solutions[0]
+    assert len(sudoku.solve_with_budget().solutions) == 288
+
+    result = Sudoku(4).solve_with_budget(max_seconds=0.05)
+    assert result.status == TIME_LIMIT
+
+def test_solve_with_budget_no_solution():
+    result = Sudoku(board=INVALID_BOARD_1).solve_with_budget(max_nodes=10)
+    assert result.status == NO_SOLUTION and result.is_complete
+    assert result.solutions == []
+
+def test_iter_solutions():
+    sudoku = Sudoku(minirows=2, minicols=2, board=[
+        [1,2,3,0],
+        [3,4,1,0],
+        [2,0,0,0],
+        [0,0,0,0]
+    ])
+    assert list(sudoku.iter_solutions()) == _SudokuSolver(sudoku).backtracking_solve()
+    assert sudoku.solution is None
+
+def test_iter_solutions_is_lazy():
+    # an empty 9x9 board has ~6.7e21 solutions; taking a few must not enumerate them
+    sudoku_solver = _SudokuSolver(Sudoku())
+    first_three = list(itertools.islice(sudoku_solver.iter_solutions(), 3))
+    assert len(first_three) == 3
+    assert len(set(str(board) for board in first_three)) == 3
+    assert sudoku_solver.nodes < 1000
@@ -0,0 +1,61 @@
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+import pytest
+from ktaypuzzles.shikaku import Shikaku
+from ktaypuzzles.sudoku import Sudoku
+from ktaypuzzles.svg import to_svg
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+SUDOKU_BOARD = [
+    [3,4,0,0,0,0],
+    [0,0,6,0,0,0],
+    [4,0,0,2,0,0],
+    [1,5,0,0,0,0],
+    [0,0,0,0,6,5],
+    [0,0,0,3,0,0]
+]
+
+SHIKAKU_BOARD = [
+    [0, 4, 0, 0],
+    [0, 0, 0, 4],
+    [0, 4, 4, 0],
+    [0, 0, 0, 0]
+]
+
+def digits_by_color(root):
+    return dict((group.get('fill'), [text.text for text in group.iter(SVG + 'text')])
+                for group in root.iter(SVG + 'g'))
+
+def test_sudoku_svg():
+    sudoku = Sudoku(2, 3, board=SUDOKU_BOARD)
+    root = ET.fromstring(to_svg(sudoku))
+    assert digits_by_color(root) == {'black': ['3', '4', '6', '4', '2', '1', '5', '6', '5', '3']}
+
+    sudoku.solve()
+    root = ET.fromstring(to_svg(sudoku, solution=True, title='<Sudoku>'))
+    digits = digits_by_color(root)
+    assert len(digits['black']) == 10 and len(digits['red']) == 26
+    assert root.find(SVG + 'text').text == '<Sudoku>'
+    # box borders after every 2 rows and every 3 columns
+    (thin, thick) = root.findall(SVG + 'path')
+    assert thick.get('d').count('h') == 4 and thick.get('d').count('v') == 3
+
+def test_shikaku_svg(tmp_path):
+    shikaku = Shikaku(SHIKAKU_BOARD)
+    with pytest.raises(ValueError):
+        to_svg(shikaku, solution=True)
+    assert len(ET.fromstring(to_svg(shikaku)).findall(SVG + 'path')) == 1
+
+    shikaku.solve()
+    save_path = str(tmp_path / 'shikaku.svg')
+    svg = to_svg(shikaku, solution=True, save_path=save_path)
+    with open(save_path) as f:
+        assert f.read() == svg
+    (_, outlines) = ET.fromstring(svg).findall(SVG + 'path')
+    assert outlines.get('d').count('z') == len(shikaku.solution)
+
+def test_svg_does_not_load_matplotlib():
+    code = 'import sys, ktaypuzzles.svg; print("matplotlib" in sys.modules)'
+    assert subprocess.check_output([sys.executable, '-c', code]).decode().strip() == 'False'
@@ -0,0 +1,61 @@
+import pytest
+from ktaypuzzles.diagonalsudoku import DiagonalSudoku
+from ktaypuzzles.sudoku import Sudoku, _SudokuSolver
+from ktaypuzzles.templatesolve import (NUM_TEMPLATES, get_templates, iter_template_solutions,
+                                       template_count, template_solve)
+
+VALID_BOARD_1 = [
+    [0,0,0,0,0,3,5,0,0],
+    [0,7,0,0,0,0,0,8,1],
+    [0,0,0,1,0,8,9,0,0],
+    [4,0,0,9,2,0,3,0,0],
+    [7,0,0,0,0,4,0,0,0],
+    [1,0,0,0,0,0,6,9,0],
+    [6,0,0,4,0,9,0,0,0],
+    [0,0,0,6,0,0,0,0,3],
+    [0,3,0,0,0,0,2,0,0]
+]
+
+def test_templates():
+    templates = get_templates()
+    assert len(set(templates)) == NUM_TEMPLATES
+    for t in templates[::997]:
+        cells = [(i // 9, i % 9) for i in range(81) if t >> i & 1]
+        assert sorted(r for (r, c) in cells) == list(range(9))
+        assert sorted(c for (r, c) in cells) == list(range(9))
+        assert sorted(r // 3 * 3 + c // 3 for (r, c) in cells) == list(range(9))
+
+def test_template_solve():
+    sudoku = Sudoku(3, board=VALID_BOARD_1)
+    solutions = template_solve(sudoku)
+    assert solutions == _SudokuSolver(Sudoku(3, board=VALID_BOARD_1)).backtracking_solve()
+    assert sudoku.solution == solutions[0]
+    assert Sudoku(3, board=solutions[0]).is_solved
+
+def test_template_count():
+    board = [row[:] for row in VALID_BOARD_1]
+    board[0][5] = board[1][7] = board[3][0] = 0
+    expected = len(_SudokuSolver(Sudoku(3, board=board)).backtracking_solve())
+    assert expected > 2
+    assert template_count(Sudoku(3, board=board)) == expected
+    assert sorted(iter_template_solutions(Sudoku(3, board=board))) == \
+        sorted(_SudokuSolver(Sudoku(3, board=board)).backtracking_solve())
+    assert template_count(Sudoku(3, board=board), limit=2) == 2
+    assert template_count(Sudoku(3, board=VALID_BOARD_1), limit=2) == 1
+
+def test_template_no_solution():
+    invalid = [row[:] for row in VALID_BOARD_1]
+    invalid[0][0] = 3
+    assert template_solve(Sudoku(3, board=invalid)) == []
+    # valid givens, but 1 cannot go anywhere in the first box
+    board = [[0] * 9 for _ in range(9)]
+    board[0][3], board[1][6], board[2][0], board[2][1], board[2][2] = 1, 1, 2, 3, 4
+    board[3][0], board[6][1] = 1, 1
+    assert template_count(Sudoku(3, board=board)) == 0
+    assert _SudokuSolver(Sudoku(3, board=board)).backtracking_solve() == []
+
+def test_template_only_standard_9x9():
+    with pytest.raises(AssertionError):
+        template_solve(DiagonalSudoku(3))
+    with pytest.raises(AssertionError):
+        template_count(Sudoku(2))
@@ -0,0 +1,63 @@
+import math
+from ktaypuzzles.kingsudoku import KingSudoku
+from ktaypuzzles.shikaku import Shikaku
+from ktaypuzzles.sudoku import Sudoku
+from ktaypuzzles.treesize import estimate_tree_size
+
+VALID_BOARD_2 = [
+    [3,4,0,0,0,0],
+    [0,0,6,0,0,0],
+    [4,0,0,2,0,0],
+    [1,5,0,0,0,0],
+    [0,0,0,0,6,5],
+    [0,0,0,3,0,0]
+]
+
+# a hard 9x9, on which the search breaks many ties between equally constrained cells
+HARD_9X9 = '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..'
+
+SHIKAKU_BOARD = [
+    [2, 0, 0, 2],
+    [0, 0, 0, 0],
+    [2, 0, 0, 2],
+    [0, 0, 0, 0]
+]
+
+def node_count(puzzle):
+    solver = puzzle._get_solver()
+    solver.backtracking_solve()
+    return solver.nodes
+
+def test_estimate_sudoku():
+    sudoku = Sudoku(2)
+    estimate = estimate_tree_size(sudoku, probes=4000, seed=1)
+    assert node_count(sudoku) == 2273
+    assert estimate.low <= 2273 <= estimate.high
+    assert abs(estimate.nodes - 2273) < 50
+    assert estimate == estimate_tree_size(sudoku, probes=4000, seed=1)
+
+def test_estimate_hard_sudoku():
+    board = [[int(ch) if ch != '.' else 0 for ch in HARD_9X9[r * 9:(r + 1) * 9]] for r in range(9)]
+    estimate = estimate_tree_size(Sudoku(3, board=board), probes=500, seed=1)
+    assert estimate.low <= node_count(Sudoku(3, board=board)) <= estimate.high
+
+def test_estimate_without_branching():
+    # every node on the way to the unique solution has a single child
+    sudoku = Sudoku(2, 3, board=VALID_BOARD_2)
+    estimate = estimate_tree_size(sudoku, probes=10, seed=0)
+    assert estimate.nodes == estimate.low == estimate.high == node_count(sudoku)
+    assert estimate.std_error == 0
+
+def test_estimate_variant_and_shikaku():
+    king = KingSudoku(2, 3, board=[[1,3,4,6,5,2]] + [[0] * 6] * 5)
+    estimate = estimate_tree_size(king, probes=1000, seed=1)
+    assert estimate.low <= node_count(king) <= estimate.high
+
+    shikaku = Shikaku(SHIKAKU_BOARD)
+    estimate = estimate_tree_size(shikaku, probes=500, seed=1)
+    assert estimate.low <= node_count(shikaku) <= estimate.high
+
+def test_single_probe():
+    estimate = estimate_tree_size(Sudoku(2), probes=1, seed=1)
+    assert estimate.probes == 1
+    assert estimate.high == math.inf and estimate.std_error == math.inf